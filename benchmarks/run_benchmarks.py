@@ -0,0 +1,316 @@
+"""
+Benchmarks for the widget wrapping hot path.
+
+Measures:
+- widget_call: ``UrlAwareWidget.__call__`` overhead per widget type, against raw ``st.*``
+- handler_sync: ``sync_query_params`` per handler when a link is loaded
+- to_url_value: conversion of widget values to URL values
+- blind_parse_value: parsing of number, date and time URL values of unknown type
+- compression: ``compress_text``/``decompress_text`` throughput
+- serialize_df: DataFrame serialization by number of rows
+- app_rerun: reruns of pages with 10/100/1000 permalinked widgets
+
+Results are written as JSON, so runs can be compared to track regressions:
+
+    python benchmarks/run_benchmarks.py -o results.json
+    python benchmarks/run_benchmarks.py -o new.json --compare results.json
+
+``--quick`` runs small sizes only, e.g. as a smoke test.
+"""
+
+import argparse
+from datetime import date, datetime, time as dt_time, timezone
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink as stp
+from streamlit_permalink.dataframe_codecs import serialize_df
+from streamlit_permalink.handlers import HANDLERS
+from streamlit_permalink.utils import compress_text, decompress_text, to_url_value
+from streamlit_permalink.value_parsing import blind_parse_value
+
+# widget call (without the label) and a URL value for each widget type
+WIDGETS = {
+    "checkbox": ("", "True"),
+    "toggle": ("", "True"),
+    "radio": ("options=['a', 'b', 'c']", "b"),
+    "selectbox": ("options=['a', 'b', 'c']", "b"),
+    "multiselect": ("options=['a', 'b', 'c']", ["a", "c"]),
+    "pills": ("options=['a', 'b', 'c']", "b"),
+    "segmented_control": ("options=['a', 'b', 'c']", "b"),
+    "select_slider": ("options=['a', 'b', 'c']", "b"),
+    "slider": ("min_value=0, max_value=100", "42"),
+    "number_input": ("value=0", "42"),
+    "text_input": ("", "hello"),
+    "text_area": ("", "hello"),
+    "date_input": ("value=None", "2024-01-01"),
+    "time_input": ("value=None", "12:30"),
+    "color_picker": ("", "#FF0000"),
+}
+
+
+def measure(func: Callable[[], Any], repeat: int, number: int = 1) -> Dict[str, float]:
+    """
+    Time ``func``, in seconds per call.
+    """
+    timings = [t / number for t in timeit.Timer(func).repeat(repeat=repeat, number=number)]
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+    }
+
+
+def result(name: str, params: Dict[str, Any], timings: Dict[str, float], **extra) -> Dict[str, Any]:
+    return {"name": name, "params": params, "unit": "s", **timings, **extra}
+
+
+def _widget_page(module: str, widget: str, count: int, url_keys: bool) -> str:
+    args, _ = WIDGETS[widget]
+    args = f", {args}" if args else ""
+    url_key = ", url_key=f'w{i}'" if url_keys else ", key=f'w{i}'"
+    return (
+        f"import streamlit as st\nimport streamlit_permalink as stp\n"
+        f"for i in range({count}):\n"
+        f"    {module}.{widget}(f'Widget {{i}}'{args}{url_key})\n"
+    )
+
+
+def _run_page(script: str, query_params: Optional[Dict[str, Any]] = None) -> None:
+    at = AppTest.from_string(script)
+    if query_params:
+        at.query_params.update(query_params)
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def bench_widget_call(count: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for widget in WIDGETS:
+        if not hasattr(st, widget):
+            continue
+        raw = measure(lambda: _run_page(_widget_page("st", widget, count, False)), repeat)
+        wrapped = measure(lambda: _run_page(_widget_page("stp", widget, count, True)), repeat)
+        overhead = {k: max(wrapped[k] - raw[k], 0.0) / count for k in raw}
+        results.append(
+            result(
+                "widget_call",
+                {"widget": widget, "widgets": count},
+                overhead,
+                raw_page=raw["median"],
+                wrapped_page=wrapped["median"],
+            )
+        )
+    return results
+
+
+def bench_handler_sync(count: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for widget, (_, url_value) in WIDGETS.items():
+        if widget not in HANDLERS:
+            continue
+        handler = HANDLERS[widget]
+        sync = handler.sync_query_params
+        timings = []
+
+        def timed_sync(self):
+            start = time.perf_counter()
+            sync(self)
+            timings.append(time.perf_counter() - start)
+
+        handler.sync_query_params = timed_sync
+        try:
+            script = _widget_page("stp", widget, count, True)
+            for _ in range(repeat):
+                _run_page(script, {f"w{i}": url_value for i in range(count)})
+        finally:
+            handler.sync_query_params = sync
+        if timings:
+            results.append(
+                result(
+                    "handler_sync",
+                    {"widget": widget},
+                    {
+                        "min": min(timings),
+                        "median": statistics.median(timings),
+                        "mean": statistics.mean(timings),
+                    },
+                    calls=len(timings),
+                )
+            )
+    return results
+
+
+def bench_to_url_value(repeat: int) -> List[Dict[str, Any]]:
+    values = {
+        "bool": True,
+        "int": 42,
+        "str": "hello world",
+        "list": ["a", "b", "c"] * 10,
+        "date": date(2024, 1, 1),
+        "time": dt_time(12, 30),
+        "dataframe": pd.DataFrame({"a": range(100), "b": ["x"] * 100}),
+    }
+    number = 1000
+    return [
+        result("to_url_value", {"type": name}, measure(lambda: to_url_value(value), repeat, number))
+        for name, value in values.items()
+    ]
+
+
+def bench_blind_parse_value(repeat: int) -> List[Dict[str, Any]]:
+    values = {
+        "int": "42",
+        "float": "1.5",
+        "date": "2024-01-01",
+        "datetime": "2024-01-01T12:30:00",
+        "time": "12:30",
+        "compact": "_t3ieYrI",
+    }
+    number = 1000
+    return [
+        result("blind_parse_value", {"type": name}, measure(lambda: blind_parse_value(value), repeat, number))
+        for name, value in values.items()
+    ]
+
+
+def bench_compression(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        text = ("".join(f'{{"row":{i},"value":"item {i % 97}"}},' for i in range(size)))[:size]
+        compressed = compress_text(text)
+        for name, func in (
+            ("compress_text", lambda: compress_text(text)),
+            ("decompress_text", lambda: decompress_text(compressed)),
+        ):
+            timings = measure(func, repeat, 10)
+            results.append(
+                result(
+                    name,
+                    {"bytes": size},
+                    timings,
+                    mb_per_s=size / timings["median"] / 1e6,
+                )
+            )
+    return results
+
+
+def bench_serialize_df(rows: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for count in rows:
+        df = pd.DataFrame(
+            {
+                "int": range(count),
+                "float": [i / 3 for i in range(count)],
+                "str": [f"item {i}" for i in range(count)],
+                "date": [date(2024, 1, 1)] * count,
+                "datetime": [datetime(2024, 1, 1, 12, 30)] * count,
+            }
+        )
+        results.append(result("serialize_df", {"rows": count}, measure(lambda: serialize_df(df), repeat)))
+    return results
+
+
+def bench_app_rerun(counts: List[int], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for count in counts:
+        script = (
+            "import streamlit_permalink as stp\n"
+            f"for i in range({count}):\n"
+            "    if i % 3 == 0:\n"
+            "        stp.checkbox(f'Check {i}', url_key=f'c{i}')\n"
+            "    elif i % 3 == 1:\n"
+            "        stp.slider(f'Slide {i}', 0, 100, url_key=f's{i}')\n"
+            "    else:\n"
+            "        stp.selectbox(f'Select {i}', ['a', 'b', 'c'], url_key=f'b{i}')\n"
+        )
+        at = AppTest.from_string(script, default_timeout=600)
+        at.run()
+        results.append(result("app_rerun", {"widgets": count}, measure(at.run, repeat)))
+    return results
+
+
+def run(quick: bool = False) -> Dict[str, Any]:
+    """
+    Run all benchmarks and return the results with metadata.
+    """
+    repeat = 3 if quick else 7
+    results = []
+    results += bench_widget_call(10 if quick else 50, repeat)
+    results += bench_handler_sync(5 if quick else 50, repeat)
+    results += bench_to_url_value(repeat)
+    results += bench_blind_parse_value(repeat)
+    results += bench_compression([1_000] if quick else [1_000, 10_000, 100_000], repeat)
+    results += bench_serialize_df([100] if quick else [100, 1_000, 10_000, 100_000], repeat)
+    results += bench_app_rerun([10] if quick else [10, 100, 1_000], repeat)
+    return {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": st.__version__,
+            "pandas": pd.__version__,
+            "streamlit_permalink": stp.__version__,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def _result_key(entry: Dict[str, Any]) -> str:
+    return f"{entry['name']}{json.dumps(entry['params'], sort_keys=True)}"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 1.2) -> List[str]:
+    """
+    Benchmarks whose median got slower than ``threshold`` times the baseline.
+    """
+    previous = {_result_key(e): e for e in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        old = previous.get(_result_key(entry))
+        if old is None or old["median"] <= 0:
+            continue
+        ratio = entry["median"] / old["median"]
+        if ratio > threshold:
+            regressions.append(f"{_result_key(entry)}: {ratio:.2f}x slower")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("-o", "--output", help="JSON file for the results (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown reported as regression")
+    args = parser.parse_args(argv)
+
+    results = run(quick=args.quick)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
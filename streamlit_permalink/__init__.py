@@ -16,8 +16,35 @@ __version__ = "1.5.0"
 from typing import Any
 
 # Import all streamlit_permalink modules
+from . import widgets
 from .widgets import *
 from .utils import get_page_url, get_query_params, to_url_value, create_url
+from .query_params import (
+    batch_url_updates,
+    disable_chunked_values,
+    disable_elide_defaults,
+    disable_state_blob,
+    enable_chunked_values,
+    enable_elide_defaults,
+    enable_state_blob,
+    flush_url_values,
+)
+from .decode_cache import configure_decode_cache
+from .url_updates import flush_deferred_url_updates, pending_url_updates
+from .codec import PermalinkCodec, WidgetSpec
+from .schema import Field, PermalinkSchema
+from .url_templates import UrlTemplate, url_template
+from .instrumentation import (
+    add_metrics_callback,
+    disable_instrumentation,
+    enable_instrumentation,
+    get_widget_metrics,
+    log_metrics,
+    openmetrics_text,
+    render_debug_panel,
+    reset_metrics,
+)
+from .state_store import MemoryStore, RedisStore, SQLiteStore, StateStore, set_default_store
 from .constants import (
     EMPTY_LIST_URL_VALUE,
     NONE_URL_VALUE,
@@ -27,6 +54,8 @@ from .constants import (
 )
 
 def __getattr__(name: str) -> Any:
+    if name == "option_menu" and widgets.HAS_OPTION_MENU:
+        return widgets.option_menu
     try:
         return getattr(st, name)
     except AttributeError as err:
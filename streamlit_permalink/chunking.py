@@ -0,0 +1,218 @@
+"""
+Splitting long URL values across numbered query parameters.
+
+Some proxies truncate or reject query values longer than a few KB. With
+``enable_chunked_values`` a value longer than the chunk size is written as
+``key.0``, ``key.1``, ... and ``key`` holds a manifest with the number of
+chunks and a CRC32 checksum of the whole value, e.g.
+``?table=_STREAMLIT_PERMALINK_CHUNKS_3_8f1d2c4a&table.0=...&table.1=...``.
+
+Reassembled values are ``ChunkedValue`` objects that keep their chunks, so
+compressed values can be checksummed, cached and decompressed chunk by chunk
+(see ``compression.decompress_chunks``) without building the joined string.
+Written values that start like a manifest are escaped with
+``LITERAL_URL_VALUE_PREFIX``, so they are never read as one.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import zlib
+
+from .constants import CHUNKED_URL_VALUE_PREFIX, LITERAL_URL_VALUE_PREFIX
+
+DEFAULT_CHUNK_SIZE = 4096
+
+_MANIFEST = re.compile(rf"^{re.escape(CHUNKED_URL_VALUE_PREFIX)}(\d+)_([0-9a-f]{{8}})$")
+
+# values starting with these are escaped when written, so they are read back literally
+_RESERVED_PREFIXES = (CHUNKED_URL_VALUE_PREFIX, LITERAL_URL_VALUE_PREFIX)
+
+
+class ChunkedValue:
+    """
+    A URL value reassembled from chunks.
+
+    The chunks are kept as a list and only joined when the value is needed
+    as a ``str`` (``str(value)``). Checksums, cache keys and decompression
+    (see ``compression.decompress_chunks``) go over the chunks one by one.
+    """
+
+    __slots__ = ("chunks", "_joined")
+
+    def __init__(self, chunks: List[str]) -> None:
+        self.chunks = list(chunks)
+        self._joined: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._joined is None:
+            self._joined = "".join(self.chunks)
+        return self._joined
+
+    def __repr__(self) -> str:
+        return f"ChunkedValue({len(self.chunks)} chunks, {len(self)} characters)"
+
+    def __len__(self) -> int:
+        return sum(map(len, self.chunks))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ChunkedValue):
+            if self.chunks == other.chunks:
+                return True
+            other = str(other)
+        if not isinstance(other, str) or len(other) != len(self):
+            return False
+        start = 0
+        for chunk in self.chunks:
+            if other[start : start + len(chunk)] != chunk:
+                return False
+            start += len(chunk)
+        return True
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def _head(self, length: int) -> Tuple[str, int]:
+        # the first chunks joined until they hold ``length`` characters, and how many were used
+        head, used = "", 0
+        while used < len(self.chunks) and len(head) < length:
+            head += self.chunks[used]
+            used += 1
+        return head, used
+
+    def startswith(self, prefix: str) -> bool:
+        return self._head(len(prefix))[0].startswith(prefix)
+
+    def removeprefix(self, prefix: str) -> "ChunkedValue":
+        if not prefix:
+            return self
+        head, used = self._head(len(prefix))
+        if not head.startswith(prefix):
+            return self
+        return ChunkedValue([head[len(prefix) :], *self.chunks[used:]])
+
+    def partition(self, sep: str) -> Tuple[str, str, Union[str, "ChunkedValue"]]:
+        """
+        Like ``str.partition``, the part after ``sep`` keeps its chunks.
+        """
+        head = ""
+        for used, chunk in enumerate(self.chunks, 1):
+            head += chunk
+            before, found, after = head.partition(sep)
+            if found:
+                return before, found, ChunkedValue([after, *self.chunks[used:]])
+        return str(self), "", ""
+
+    def encode(self, encoding: str = "utf-8") -> bytes:
+        return str(self).encode(encoding)
+
+
+def value_chunks(url_value: Union[str, ChunkedValue]) -> List[str]:
+    """
+    The chunks of a URL value, a plain string is a single chunk.
+    """
+    return url_value.chunks if isinstance(url_value, ChunkedValue) else [url_value]
+
+
+def checksum(value: Union[str, ChunkedValue]) -> str:
+    """
+    CRC32 of a URL value as 8 hex digits, computed chunk by chunk.
+    """
+    crc = 0
+    for chunk in value_chunks(value):
+        crc = zlib.crc32(chunk.encode("utf-8"), crc)
+    return f"{crc & 0xFFFFFFFF:08x}"
+
+
+def escape_url_value(url_value: str) -> str:
+    """
+    Escape a value that would otherwise be read as a chunk manifest or an escaped value.
+    """
+    if isinstance(url_value, str) and url_value.startswith(_RESERVED_PREFIXES):
+        return f"{LITERAL_URL_VALUE_PREFIX}{url_value}"
+    return url_value
+
+
+def unescape_url_value(url_value: str) -> str:
+    """
+    Undo ``escape_url_value``.
+    """
+    if isinstance(url_value, str) and url_value.startswith(LITERAL_URL_VALUE_PREFIX):
+        return url_value[len(LITERAL_URL_VALUE_PREFIX) :]
+    return url_value
+
+
+def escape_url_values(url_value: Union[None, str, List[str]]) -> Union[None, str, List[str]]:
+    """
+    ``escape_url_value`` for a single value or each value of a list.
+    """
+    if url_value is None or isinstance(url_value, str):
+        return escape_url_value(url_value)
+    return [escape_url_value(v) for v in url_value]
+
+
+def join_chunks(url_value: Union[str, ChunkedValue]) -> str:
+    """
+    A URL value as a ``str``, joining its chunks if it has any.
+    """
+    return str(url_value) if isinstance(url_value, ChunkedValue) else url_value
+
+
+def chunk_key(url_key: str, index: int) -> str:
+    """
+    Name of the query parameter holding chunk ``index`` of ``url_key``.
+    """
+    return f"{url_key}.{index}"
+
+
+def parse_manifest(url_value: str) -> Optional[Tuple[int, str]]:
+    """
+    Number of chunks and checksum of a chunk manifest, None for other values.
+    """
+    match = _MANIFEST.match(url_value) if isinstance(url_value, str) else None
+    if match is None:
+        return None
+    return int(match.group(1)), match.group(2)
+
+
+def split_url_value(url_key: str, url_value: str, chunk_size: int) -> Dict[str, str]:
+    """
+    Query parameters for a URL value, split into chunks if it's longer than ``chunk_size``.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"Invalid chunk size: {chunk_size}. Expected a positive number.")
+    if len(url_value) <= chunk_size:
+        return {url_key: escape_url_value(url_value)}
+
+    chunks = [url_value[i : i + chunk_size] for i in range(0, len(url_value), chunk_size)]
+    params = {url_key: f"{CHUNKED_URL_VALUE_PREFIX}{len(chunks)}_{checksum(url_value)}"}
+    for index, chunk in enumerate(chunks):
+        params[chunk_key(url_key, index)] = chunk
+    return params
+
+
+def join_url_value(
+    url_key: str, manifest: str, get_chunk: Callable[[str], Optional[str]]
+) -> ChunkedValue:
+    """
+    Reassemble a chunked URL value and verify its checksum.
+
+    Args:
+        url_key: Query parameter holding the manifest
+        manifest: The manifest
+        get_chunk: Returns the value of a query parameter, None if missing
+
+    Raises:
+        ValueError: If a chunk is missing or the checksum doesn't match
+    """
+    count, expected = parse_manifest(manifest)
+    chunks = []
+    for index in range(count):
+        chunk = get_chunk(chunk_key(url_key, index))
+        if chunk is None:
+            raise ValueError(f"Missing chunk '{chunk_key(url_key, index)}' of {count}.")
+        chunks.append(chunk)
+
+    value = ChunkedValue(chunks)
+    if checksum(value) != expected:
+        raise ValueError("Checksum mismatch, the URL may have been truncated.")
+    return value
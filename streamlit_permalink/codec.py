@@ -0,0 +1,360 @@
+"""
+Headless encoding and decoding of permalinks, without a Streamlit script run.
+
+A ``PermalinkCodec`` is built from the widget declarations of a page, written
+like the widget calls themselves:
+
+.. code-block:: python
+
+    codec = PermalinkCodec(
+        [
+            WidgetSpec("selectbox", "Country", ["FR", "DE"], url_key="country"),
+            WidgetSpec("slider", "Range", 0, 100, (20, 80), url_key="range"),
+            WidgetSpec("text_area", "Notes", url_key="notes", compress=True),
+        ]
+    )
+    codec.decode("https://app.example.com/?country=DE&range=10&range=30")
+    # {"country": "DE", "range": (10, 30), "notes": None}
+    codec.encode({"country": "FR", "range": (0, 50)})
+    # "country=FR&range=0&range=50"
+
+URL values are parsed and validated by the same handlers as in a running app.
+``decode_many`` decodes large numbers of URLs, e.g. from access logs, into
+pandas DataFrames batch by batch, optionally in a process pool.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import inspect
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import streamlit as st
+
+from .chunking import escape_url_values, join_url_value, parse_manifest, unescape_url_value
+from .exceptions import UrlParamError
+from .handlers import HANDLERS
+from .query_params import DEFAULT_STATE_BLOB_PARAM, decode_state_blob
+from .state_store import StateStore, get_state_store, wrap_with_store
+from .utils import (
+    _compress_list,
+    _decompress_list,
+    cached_decompress_text,
+    get_compressor,
+    to_url_value,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# handlers set these arguments instead of ``value``
+_INDEX_ARGUMENTS = {"radio": "index", "selectbox": "index", "option_menu": "default_index"}
+_DEFAULT_ARGUMENTS = ("multiselect", "pills", "segmented_control")
+
+ERRORS = ("raise", "ignore")
+
+
+def _base_widget(widget: str) -> Any:
+    if widget == "option_menu":
+        from streamlit_option_menu import option_menu
+
+        return option_menu
+    return getattr(st, widget)
+
+
+def _identity(value: str) -> str:
+    return value
+
+
+# codec of a worker process of decode_many, sent once instead of with every batch
+_worker_codec: Optional["PermalinkCodec"] = None
+
+
+def _init_worker(codec: "PermalinkCodec") -> None:
+    global _worker_codec
+    _worker_codec = codec
+
+
+def _decode_worker_batch(urls: List[str], errors: str) -> Dict[str, List[Any]]:
+    return _worker_codec._decode_batch(urls, errors)
+
+
+class WidgetSpec:
+    """
+    Declaration of a permalinked widget, with the arguments of the widget call.
+
+    Args:
+        widget: Name of the widget function, e.g. "slider"
+        *args: Positional arguments of the widget call
+        url_key: Query parameter of the widget, defaults to ``key`` or the label
+        compress: Compression of the URL value, like the widget's ``compress``
+        compact: Compact typed values, like the widget's ``compact``
+        store: State store holding the values of a widget with ``store``
+        **kwargs: Keyword arguments of the widget call
+    """
+
+    def __init__(
+        self,
+        widget: str,
+        *args: Any,
+        url_key: Optional[str] = None,
+        compress: Union[bool, str] = False,
+        compact: bool = False,
+        store: Union[None, bool, StateStore] = None,
+        **kwargs: Any,
+    ) -> None:
+        if widget not in HANDLERS or widget == "data_editor":
+            raise ValueError(f"Unsupported widget for headless decoding: {widget}")
+        if compact and not HANDLERS[widget].supports_compact:
+            raise ValueError(f"compact is not supported by {widget}.")
+
+        self.widget = widget
+        self.args = args
+        self.kwargs = kwargs
+        self.compress = compress
+        self.compact = compact
+        self.store = store
+
+        self.base_widget = _base_widget(widget)
+        self.signature = inspect.signature(self.base_widget)
+        self.arguments = self.signature.bind_partial(*args, **kwargs).arguments
+
+        if url_key is None:
+            url_key = self.arguments.get("key") or self.arguments.get("label")
+            if url_key is None:
+                raise ValueError("url_key or key is required")
+        self.url_key = url_key
+
+        compressor = get_compressor(compress) if compress else _identity
+        decompressor = partial(cached_decompress_text, url_key) if compress else _identity
+        if store:
+            compressor, decompressor = wrap_with_store(
+                get_state_store(store), compressor, decompressor
+            )
+        self.compressor = partial(_compress_list, compressor)
+        self.decompressor = partial(_decompress_list, decompressor)
+
+    def __reduce__(self):
+        # rebuilt from the declaration, e.g. in worker processes
+        kwargs = dict(
+            self.kwargs,
+            url_key=self.url_key,
+            compress=self.compress,
+            compact=self.compact,
+            store=self.store,
+        )
+        return (partial(WidgetSpec, self.widget, *self.args, **kwargs), ())
+
+    def __repr__(self) -> str:
+        return f"WidgetSpec({self.widget!r}, url_key={self.url_key!r})"
+
+    def decode(self, url_value: List[str]) -> Any:
+        """
+        Typed value of the widget for its raw URL value(s).
+
+        Raises:
+            UrlParamError: If the URL value is invalid for the widget
+        """
+        # handlers may change the arguments (e.g. options), each decode gets its own copies
+        arguments = {
+            name: list(value) if isinstance(value, list) else value
+            for name, value in self.arguments.items()
+        }
+        bound_args = inspect.BoundArguments(self.signature, arguments)
+        handler = HANDLERS[self.widget](
+            self.base_widget,
+            self.url_key,
+            url_value,
+            bound_args,
+            compressor=self.compressor,
+            decompressor=self.decompressor,
+            init_url=False,
+            compact=self.compact,
+        )
+        handler.sync_query_params()
+        return self._widget_value(bound_args.arguments)
+
+    def _widget_value(self, arguments: Dict[str, Any]) -> Any:
+        # the value the widget returns for the arguments set by its handler
+        if self.widget in _INDEX_ARGUMENTS:
+            index = arguments[_INDEX_ARGUMENTS[self.widget]]
+            return None if index is None else list(arguments["options"])[index]
+        if self.widget in _DEFAULT_ARGUMENTS:
+            values = arguments["default"]
+            if self.widget != "multiselect" and arguments.get("selection_mode", "single") == "single":
+                return values[0] if values else None
+            return values
+        value = arguments["value"]
+        if isinstance(value, list):
+            return tuple(value)
+        return value
+
+    def encode(self, value: Any) -> Union[str, List[str]]:
+        """
+        Raw URL value(s) of a widget value.
+        """
+        return self.compressor(to_url_value(value, compact=self.compact))
+
+
+def _query_params(url: str) -> Dict[str, List[str]]:
+    query = urlsplit(url).query if "?" in url else url
+    return parse_qs(query, keep_blank_values=True)
+
+
+class PermalinkCodec:
+    """
+    Encodes widget values to query strings and decodes them back, without Streamlit.
+
+    Args:
+        widgets: Widget declarations of the page
+        state_blob: Query parameter of the state blob, if the page uses
+            ``enable_state_blob``. True for the default parameter
+    """
+
+    def __init__(
+        self, widgets: Iterable[WidgetSpec], state_blob: Union[None, bool, str] = None
+    ) -> None:
+        self.widgets = {spec.url_key: spec for spec in widgets}
+        if state_blob is True:
+            state_blob = DEFAULT_STATE_BLOB_PARAM
+        self.state_blob = state_blob or None
+
+    def __reduce__(self):
+        return (PermalinkCodec, (list(self.widgets.values()), self.state_blob))
+
+    def _raw_values(self, params: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        def get_chunk(key):
+            value = params.get(key)
+            return value[-1] if value else None
+
+        values = {}
+        for key, value in params.items():
+            if value and parse_manifest(value[-1]) is not None:
+                try:
+                    value = [join_url_value(key, value[-1], get_chunk)]
+                except ValueError as err:
+                    raise UrlParamError(
+                        message=f"Invalid chunked value: {err}", url_key=key, url_value=value[-1]
+                    ) from err
+            else:
+                value = [unescape_url_value(v) for v in value]
+            values[key] = value
+
+        if self.state_blob is not None and values.get(self.state_blob):
+            blob = values[self.state_blob][-1]
+            try:
+                state = decode_state_blob(blob)
+            except Exception as err:
+                raise UrlParamError(
+                    message=f"Invalid state blob: {err}", url_key=self.state_blob, url_value=blob
+                ) from err
+            for url_key, value in state.items():
+                values[url_key] = [value] if isinstance(value, str) else list(value)
+        return values
+
+    def decode(self, url: str, errors: str = "raise") -> Dict[str, Any]:
+        """
+        Typed values of all declared widgets in a URL or query string.
+
+        Widgets without a URL value are None.
+
+        Args:
+            url: A URL or its query string
+            errors: "raise" to raise UrlParamError for invalid values, "ignore" to return None
+        """
+        if errors not in ERRORS:
+            raise ValueError(f"Invalid errors: {errors}. Expected one of: {ERRORS}")
+        try:
+            values = self._raw_values(_query_params(url))
+        except UrlParamError:
+            if errors == "raise":
+                raise
+            values = {}
+
+        decoded = {}
+        for url_key, spec in self.widgets.items():
+            url_value = values.get(url_key)
+            if not url_value:
+                decoded[url_key] = None
+                continue
+            try:
+                decoded[url_key] = spec.decode(url_value)
+            except (UrlParamError, ValueError):
+                if errors == "raise":
+                    raise
+                decoded[url_key] = None
+        return decoded
+
+    def encode(self, values: Dict[str, Any]) -> str:
+        """
+        Query string for widget values by URL key.
+        """
+        params = {}
+        for url_key, value in values.items():
+            spec = self.widgets.get(url_key)
+            if spec is None:
+                raise KeyError(f"Unknown url_key: {url_key}")
+            params[url_key] = escape_url_values(spec.encode(value))
+        return urlencode(params, doseq=True)
+
+    def _decode_batch(self, urls: List[str], errors: str) -> Dict[str, List[Any]]:
+        columns = {url_key: [] for url_key in self.widgets}
+        for url in urls:
+            for url_key, value in self.decode(url, errors).items():
+                columns[url_key].append(value)
+        return columns
+
+    def decode_many(
+        self,
+        urls: Iterable[str],
+        batch_size: int = 10_000,
+        processes: Optional[int] = None,
+        errors: str = "raise",
+    ) -> Iterator["pd.DataFrame"]:
+        """
+        Decode URLs into DataFrames of ``batch_size`` rows, one column per widget.
+
+        URLs are read lazily, so any iterable (e.g. the lines of a log file)
+        can be streamed. With ``processes`` batches are decoded in a process
+        pool; DataFrames are still yielded in the order of the URLs.
+
+        Args:
+            urls: URLs or query strings
+            batch_size: Number of URLs per DataFrame
+            processes: Number of worker processes, None to decode in this process
+            errors: "raise" or "ignore", see ``decode``
+        """
+        import pandas as pd
+
+        if errors not in ERRORS:
+            raise ValueError(f"Invalid errors: {errors}. Expected one of: {ERRORS}")
+        urls = iter(urls)
+        batches = iter(lambda: list(islice(urls, batch_size)), [])
+
+        if not processes:
+            for batch in batches:
+                yield pd.DataFrame(self._decode_batch(batch, errors), columns=list(self.widgets))
+            return
+
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self,)) as executor:
+            # a few batches per worker are in flight, not the whole input
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(_decode_worker_batch, batch, errors))
+                if len(pending) >= processes * 2:
+                    yield pd.DataFrame(pending.popleft().result(), columns=list(self.widgets))
+            while pending:
+                yield pd.DataFrame(pending.popleft().result(), columns=list(self.widgets))
+
+    def decode_frame(self, urls: Iterable[str], **kwargs: Any) -> "pd.DataFrame":
+        """
+        Decode all URLs into a single DataFrame, see ``decode_many``.
+        """
+        import pandas as pd
+
+        frames = list(self.decode_many(urls, **kwargs))
+        if not frames:
+            return pd.DataFrame(columns=list(self.widgets))
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,203 @@
+"""
+Compact typed encoding of numbers, dates and times in URL values.
+
+A compact value is ``_`` followed by a one letter type tag and a short payload:
+
+- ``_i``: int, zigzag encoded in base62
+- ``_f``: float, the IEEE 754 bytes in URL-safe base64 without trailing zero bytes
+- ``_d``: date, days since 1970-01-01 in base62
+- ``_t``: datetime, seconds since 1970-01-01 in base62
+- ``_u``: datetime with microseconds, microseconds since 1970-01-01 in base62
+- ``_h``: time, seconds since midnight in base62
+
+e.g. ``datetime(2024, 1, 1, 12, 30)`` is ``_t3ieYrI`` instead of
+``2024-01-01T12:30:00``. Values are decoded with a single lookup on the tag.
+
+Widgets write compact values with ``compact=True`` (slider, number_input,
+date_input and time_input). Readable values are always accepted on read.
+"""
+
+import base64
+from datetime import date, datetime, time, timedelta
+import struct
+from typing import Any, Callable, Dict, Optional, Type
+
+from .constants import COMPACT_URL_VALUE_PREFIX
+
+_BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_BASE62_INDEX = {c: i for i, c in enumerate(_BASE62)}
+
+_EPOCH_DATE = date(1970, 1, 1)
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH_DATE.toordinal()
+
+
+def _zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+
+def encode_base62(n: int) -> str:
+    """
+    Base62 digits of a non-negative int.
+    """
+    if n == 0:
+        return "0"
+    digits = []
+    while n:
+        n, digit = divmod(n, 62)
+        digits.append(_BASE62[digit])
+    return "".join(reversed(digits))
+
+
+def decode_base62(text: str) -> int:
+    if not text:
+        raise ValueError("Empty base62 payload.")
+    n = 0
+    for char in text:
+        n = n * 62 + _BASE62_INDEX[char]
+    return n
+
+
+def _encode_int(value: int) -> str:
+    return encode_base62(_zigzag(value))
+
+
+def _decode_int(payload: str) -> int:
+    return _unzigzag(decode_base62(payload))
+
+
+def _encode_float(value: float) -> str:
+    raw = struct.pack(">d", value).rstrip(b"\x00")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_float(payload: str) -> float:
+    raw = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+    if len(raw) > 8:
+        raise ValueError("Float payload longer than 8 bytes.")
+    return struct.unpack(">d", raw.ljust(8, b"\x00"))[0]
+
+
+def _decode_date(payload: str) -> date:
+    return date.fromordinal(_EPOCH_ORDINAL + _decode_int(payload))
+
+
+def _decode_datetime(payload: str) -> datetime:
+    return _EPOCH + timedelta(seconds=_decode_int(payload))
+
+
+def _decode_datetime_us(payload: str) -> datetime:
+    return _EPOCH + timedelta(microseconds=_decode_int(payload))
+
+
+def _decode_time(payload: str) -> time:
+    seconds = decode_base62(payload)
+    if seconds >= 86400:
+        raise ValueError(f"Time of day out of range: {seconds} seconds.")
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "i": _decode_int,
+    "f": _decode_float,
+    "d": _decode_date,
+    "t": _decode_datetime,
+    "u": _decode_datetime_us,
+    "h": _decode_time,
+}
+
+
+def _readable(value: Any) -> str:
+    # the readable format written by to_url_value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime("%H:%M")
+    return str(value)
+
+
+def encode_compact_value(value: Any) -> Optional[str]:
+    """
+    Compact URL value of an int, float, date, datetime or time, None for other values.
+
+    Timezone aware datetimes and times with microseconds have no compact form.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return f"{COMPACT_URL_VALUE_PREFIX}i{_encode_int(value)}"
+    if isinstance(value, float):
+        return f"{COMPACT_URL_VALUE_PREFIX}f{_encode_float(value)}"
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return None
+        delta = value - _EPOCH
+        if value.microsecond:
+            micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+            return f"{COMPACT_URL_VALUE_PREFIX}u{_encode_int(micros)}"
+        return f"{COMPACT_URL_VALUE_PREFIX}t{_encode_int(delta.days * 86400 + delta.seconds)}"
+    if isinstance(value, date):
+        return f"{COMPACT_URL_VALUE_PREFIX}d{_encode_int(value.toordinal() - _EPOCH_ORDINAL)}"
+    if isinstance(value, time):
+        if value.tzinfo is not None or value.microsecond:
+            return None
+        seconds = value.hour * 3600 + value.minute * 60 + value.second
+        return f"{COMPACT_URL_VALUE_PREFIX}h{encode_base62(seconds)}"
+    return None
+
+
+def to_compact_url_value(value: Any) -> Optional[str]:
+    """
+    The compact URL value if it's shorter than the readable one, None otherwise.
+
+    Small ints and short floats such as ``42`` or ``0.5`` stay readable.
+    Times with seconds are always compact as the readable format drops them.
+    """
+    compact = encode_compact_value(value)
+    if compact is None:
+        return None
+    if isinstance(value, time) and value.second:
+        return compact
+    return compact if len(compact) < len(_readable(value)) else None
+
+
+def is_compact_value(url_value: Any) -> bool:
+    """
+    Whether a URL value is a compact typed value.
+    """
+    return (
+        isinstance(url_value, str)
+        and len(url_value) > 2
+        and url_value[0] == COMPACT_URL_VALUE_PREFIX
+        and url_value[1] in _DECODERS
+    )
+
+
+def decode_compact_value(url_value: str, value_type: Optional[Type] = None) -> Any:
+    """
+    Decode a compact URL value.
+
+    Args:
+        url_value: The compact value, e.g. "_dAGE" for 2024-01-01
+        value_type: Expected type. Ints are accepted for floats
+
+    Raises:
+        ValueError: If the value is malformed or not of ``value_type``
+    """
+    if not is_compact_value(url_value):
+        raise ValueError(f"Not a compact URL value: {url_value}")
+    try:
+        value = _DECODERS[url_value[1]](url_value[2:])
+    except (KeyError, ValueError, OverflowError, struct.error) as err:
+        raise ValueError(f"Invalid compact URL value: {url_value}") from err
+    if value_type is None or type(value) is value_type:
+        return value
+    if value_type is float and type(value) is int:
+        return float(value)
+    raise ValueError(
+        f"Compact URL value {url_value} is a {type(value).__name__}, expected {value_type.__name__}."
+    )
@@ -0,0 +1,436 @@
+"""
+Compression codecs for streamlit_permalink.
+
+Every codec except the default zlib one prefixes its URL value with a short
+tag (e.g. ``x.`` for lzma) so ``decompress_text`` can dispatch on it. zlib
+output stays untagged, which keeps it readable by older versions and keeps
+existing links working.
+
+Values compressed with a preset dictionary are tagged ``D<dictionary id>.``,
+so links stay readable as long as the dictionary stays registered.
+"""
+
+import base64
+import bz2
+import codecs
+from collections import Counter
+import hashlib
+from importlib.util import find_spec
+import lzma
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlsplit
+import zlib
+
+# seconds of CPU time (of the calling thread) "auto" may spend trying codecs for a single value
+AUTO_CPU_BUDGET = 0.005
+
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6}]
+
+# zstd level, values of URL size gain next to nothing from the slow levels above it
+ZSTD_LEVEL = 9
+
+
+class CompressionCodec:
+    """
+    A named pair of bytes -> bytes compress and decompress functions.
+
+    Attributes:
+        name: Name used to select the codec
+        tag: Prefix marking values compressed with this codec
+        compress: Compression function
+        decompress: Decompression function
+        binary: Whether the output must be base64 encoded to be URL-compatible
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tag: str,
+        compress: Callable[[bytes], bytes],
+        decompress: Callable[[bytes], bytes],
+        binary: bool = True,
+    ):
+        self.name = name
+        self.tag = tag
+        self.compress = compress
+        self.decompress = decompress
+        self.binary = binary
+
+    def encode(self, text: str) -> str:
+        """
+        Compress text into a tagged, URL-compatible string.
+        """
+        if not self.binary:
+            return f"{self.tag}.{text}"
+        compressed = self.compress(text.encode("utf-8"))
+        encoded = base64.urlsafe_b64encode(compressed).decode("utf-8")
+        return f"{self.tag}.{encoded}" if self.tag else encoded
+
+    def decode(self, payload: str) -> str:
+        """
+        Decompress the payload of a value encoded by this codec (without its tag).
+        """
+        if not self.binary:
+            return payload
+        return self.decompress(base64.urlsafe_b64decode(payload)).decode("utf-8")
+
+
+def _zlib_codec(level: int) -> CompressionCodec:
+    return CompressionCodec(
+        f"zlib-{level}", "", lambda data: zlib.compress(data, level=level), zlib.decompress
+    )
+
+
+def _deflate_compress(data: bytes) -> bytes:
+    compressor = zlib.compressobj(level=9, wbits=-15)
+    return compressor.compress(data) + compressor.flush()
+
+
+# zstandard compressors and decompressors can't be shared by threads, each thread gets its own
+_zstd_local = threading.local()
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    compressor = getattr(_zstd_local, "compressor", None)
+    if compressor is None:
+        import zstandard
+
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor.compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    decompressor = getattr(_zstd_local, "decompressor", None)
+    if decompressor is None:
+        import zstandard
+
+        decompressor = _zstd_local.decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data)
+
+
+def _zstd_codec() -> CompressionCodec:
+    return CompressionCodec("zstd", "s", _zstd_compress, _zstd_decompress)
+
+
+def _brotli_codec() -> CompressionCodec:
+    import brotli
+
+    return CompressionCodec("brotli", "r", brotli.compress, brotli.decompress)
+
+
+COMPRESSION_CODECS: Dict[str, CompressionCodec] = {
+    "none": CompressionCodec("none", "n", bytes, bytes, binary=False),
+    **{f"zlib-{level}": _zlib_codec(level) for level in range(1, 10)},
+    "deflate": CompressionCodec(
+        "deflate", "d", _deflate_compress, lambda data: zlib.decompress(data, wbits=-15)
+    ),
+    "bz2": CompressionCodec(
+        "bz2", "b", lambda data: bz2.compress(data, 9), bz2.decompress
+    ),
+    "lzma": CompressionCodec(
+        "lzma",
+        "x",
+        lambda data: lzma.compress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS),
+        lambda data: lzma.decompress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS),
+    ),
+}
+COMPRESSION_CODECS["zlib"] = COMPRESSION_CODECS["zlib-9"]
+
+# optional backends
+if find_spec("zstandard") is not None:
+    COMPRESSION_CODECS["zstd"] = _zstd_codec()
+if find_spec("brotli") is not None:
+    COMPRESSION_CODECS["brotli"] = _brotli_codec()
+
+# tried by "auto" from cheapest to most expensive
+AUTO_CODECS: List[str] = ["none", "zlib", "deflate", "zstd", "brotli", "bz2", "lzma"]
+
+_CODECS_BY_TAG = {c.tag: c for c in COMPRESSION_CODECS.values() if c.tag}
+_DEFAULT_CODEC = COMPRESSION_CODECS["zlib"]
+
+
+def get_compression_codec(name: str) -> CompressionCodec:
+    """
+    Get a compression codec by name.
+    """
+    try:
+        return COMPRESSION_CODECS[name]
+    except KeyError as err:
+        raise ValueError(
+            f"Unknown compression codec: {name}. "
+            f"Expected 'auto' or one of: {list(COMPRESSION_CODECS)}"
+        ) from err
+
+
+# preset dictionaries by id, see register_dictionary
+COMPRESSION_DICTIONARIES: Dict[str, bytes] = {}
+_DICTIONARY_TAG = "D"
+_DICTIONARY_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+_default_dictionary: Optional[str] = None
+
+
+def register_dictionary(dictionary: Union[bytes, str], dict_id: Optional[str] = None) -> str:
+    """
+    Register a preset zlib dictionary and return its id.
+
+    The id is embedded in every value compressed with the dictionary, so a
+    dictionary must stay registered (under the same id) for as long as links
+    using it should decode. Defaults to a short hash of the dictionary.
+    """
+    if isinstance(dictionary, str):
+        dictionary = dictionary.encode("utf-8")
+    if dict_id is None:
+        dict_id = hashlib.sha1(dictionary).hexdigest()[:4]
+    if not _DICTIONARY_ID.match(dict_id):
+        raise ValueError(
+            f"Invalid dictionary id: '{dict_id}'. Expected letters, digits, '-' or '_'."
+        )
+    if COMPRESSION_DICTIONARIES.get(dict_id, dictionary) != dictionary:
+        raise ValueError(f"A different dictionary is already registered as '{dict_id}'.")
+    COMPRESSION_DICTIONARIES[dict_id] = dictionary
+    return dict_id
+
+
+def set_default_dictionary(dictionary: Union[None, bytes, str], dict_id: Optional[str] = None) -> Optional[str]:
+    """
+    Use a preset dictionary for all default (zlib) compression, e.g. ``compress=True``.
+
+    Accepts dictionary bytes, the id of a registered dictionary or None to go
+    back to plain zlib. Returns the dictionary id.
+    """
+    global _default_dictionary
+    if dictionary is None:
+        _default_dictionary = None
+    elif isinstance(dictionary, bytes):
+        _default_dictionary = register_dictionary(dictionary, dict_id)
+    else:
+        _default_dictionary = _resolve_dictionary(dictionary)
+    return _default_dictionary
+
+
+def _resolve_dictionary(dictionary: Union[bytes, str]) -> str:
+    if isinstance(dictionary, bytes):
+        return register_dictionary(dictionary)
+    if dictionary not in COMPRESSION_DICTIONARIES:
+        raise ValueError(f"Unknown compression dictionary: '{dictionary}'. It must be registered first.")
+    return dictionary
+
+
+def compress_with_dictionary(text: str, dictionary: Union[bytes, str]) -> str:
+    """
+    Raw deflate with a preset dictionary, tagged with the dictionary id.
+
+    Values that do not shrink are stored as-is with the ``none`` tag.
+    """
+    dict_id = _resolve_dictionary(dictionary)
+    compressor = zlib.compressobj(
+        level=9, wbits=-15, zdict=COMPRESSION_DICTIONARIES[dict_id]
+    )
+    compressed = compressor.compress(text.encode("utf-8")) + compressor.flush()
+    encoded = base64.urlsafe_b64encode(compressed).decode("utf-8")
+    encoded = f"{_DICTIONARY_TAG}{dict_id}.{encoded}"
+    raw = COMPRESSION_CODECS["none"].encode(text)
+    return encoded if len(encoded) < len(raw) else raw
+
+
+def _decompress_with_dictionary(dict_id: str, payload: str) -> str:
+    dictionary = COMPRESSION_DICTIONARIES.get(dict_id)
+    if dictionary is None:
+        raise ValueError(f"Unknown compression dictionary: '{dict_id}'. It must be registered first.")
+    decompressor = zlib.decompressobj(wbits=-15, zdict=dictionary)
+    data = decompressor.decompress(base64.urlsafe_b64decode(payload))
+    return (data + decompressor.flush()).decode("utf-8")
+
+
+def _tokens(text: str) -> List[str]:
+    # quoted JSON keys/strings, words and short punctuation runs
+    return re.findall(r'"[^"]{1,64}"\s*:?|\w+|[^\w\s]{1,8}', text)
+
+
+def train_dictionary(samples: Iterable[str], size: int = 4096) -> bytes:
+    """
+    Build a preset zlib dictionary from sample URL values.
+
+    Keeps the tokens (JSON keys, words, punctuation) that occur in more than one
+    sample, the most common ones last where zlib reaches them with the shortest
+    back-references.
+
+    Args:
+        samples: Uncompressed URL values, e.g. serialized tables or option labels
+        size: Maximum dictionary size in bytes (zlib uses at most 32KB)
+
+    Returns:
+        The dictionary, to pass to register_dictionary or set_default_dictionary
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(_tokens(sample)))
+
+    selected = []
+    total = 0
+    for token, count in counts.most_common():
+        if count < 2:
+            break
+        length = len(token.encode("utf-8"))
+        if total + length > size:
+            continue
+        selected.append(token)
+        total += length
+
+    return "".join(reversed(selected)).encode("utf-8")
+
+
+def train_dictionary_from_urls(urls: Iterable[str], size: int = 4096) -> bytes:
+    """
+    Build a preset zlib dictionary from real permalinks.
+
+    Query values are decompressed when they were compressed, see train_dictionary.
+    """
+
+    def values():
+        for url in urls:
+            query = urlsplit(url).query if "?" in url or "://" in url else url
+            for _, value in parse_qsl(query):
+                try:
+                    yield decompress_any(value)
+                except Exception:  # pylint: disable=broad-except
+                    yield value
+
+    return train_dictionary(values(), size)
+
+
+def compress_auto(text: str, cpu_budget: Optional[float] = None) -> str:
+    """
+    Compress text with every available codec and keep the smallest result.
+
+    Codecs are tried from cheapest to most expensive and no further codecs are
+    tried once ``cpu_budget`` seconds of CPU time have been spent. It's the
+    CPU time of the calling thread, so other sessions' threads and waiting
+    don't count against it.
+    """
+    if cpu_budget is None:
+        cpu_budget = AUTO_CPU_BUDGET
+
+    start = time.thread_time()
+    best = None
+    if _default_dictionary is not None:
+        best = compress_with_dictionary(text, _default_dictionary)
+    for name in AUTO_CODECS:
+        codec = COMPRESSION_CODECS.get(name)
+        if codec is None:
+            continue
+        encoded = codec.encode(text)
+        if best is None or len(encoded) < len(best):
+            best = encoded
+        if time.thread_time() - start > cpu_budget:
+            break
+    return best
+
+
+def compress_with(
+    text: str,
+    codec: str = "zlib",
+    cpu_budget: Optional[float] = None,
+    dictionary: Union[None, bytes, str] = None,
+) -> str:
+    """
+    Compress text with the named codec, or the smallest result for "auto".
+
+    zlib uses ``dictionary`` (bytes or the id of a registered dictionary), or
+    the default dictionary when one is set.
+    """
+    if codec == "auto":
+        return compress_auto(text, cpu_budget)
+    if codec == "zlib":
+        dictionary = dictionary if dictionary is not None else _default_dictionary
+        if dictionary is not None:
+            return compress_with_dictionary(text, dictionary)
+    return get_compression_codec(codec).encode(text)
+
+
+# dictionary ids are short hashes or user ids, tags are at most this long
+_MAX_TAG_LENGTH = 64
+
+
+def _b64decode_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    # base64 decodes 4 characters at a time, the rest is carried to the next chunk
+    carry = ""
+    for chunk in chunks:
+        chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % 4
+        carry = chunk[cut:]
+        if cut:
+            yield base64.urlsafe_b64decode(chunk[:cut])
+    if carry:
+        raise ValueError("Invalid base64 value: incomplete final block")
+
+
+def _zlib_decompressor(tag: str):
+    if not tag:
+        return zlib.decompressobj()
+    if tag == COMPRESSION_CODECS["deflate"].tag:
+        return zlib.decompressobj(wbits=-15)
+    if tag.startswith(_DICTIONARY_TAG):
+        dict_id = tag[len(_DICTIONARY_TAG):]
+        dictionary = COMPRESSION_DICTIONARIES.get(dict_id)
+        if dictionary is None:
+            raise ValueError(f"Unknown compression dictionary: '{dict_id}'. It must be registered first.")
+        return zlib.decompressobj(wbits=-15, zdict=dictionary)
+    return None
+
+
+def decompress_chunks(chunks: List[str]) -> str:
+    """
+    Decompress a value split into chunks (see chunking), one chunk at a time.
+
+    zlib, deflate and dictionary values are streamed through
+    ``zlib.decompressobj`` without joining the chunks or the decompressed
+    bytes. Values of other codecs are joined and passed to decompress_any.
+    """
+    # the tag ends at the first "." (base64 has none), tiny chunks may split it
+    head, rest = "", 0
+    while rest < len(chunks) and "." not in head and len(head) <= _MAX_TAG_LENGTH:
+        head += chunks[rest]
+        rest += 1
+    tag, sep, first = head.partition(".")
+    if not sep:
+        tag, first = "", head
+    decompressor = _zlib_decompressor(tag)
+    if decompressor is None:
+        return decompress_any("".join(chunks))
+
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    for data in _b64decode_chunks([first, *chunks[rest:]]):
+        parts.append(text_decoder.decode(decompressor.decompress(data)))
+    if not decompressor.eof:
+        raise ValueError("Incomplete compressed value")
+    parts.append(text_decoder.decode(decompressor.flush(), final=True))
+    return "".join(parts)
+
+
+def decompress_any(compressed_text: str) -> str:
+    """
+    Decompress text compressed by any codec, dispatching on its tag.
+    """
+    chunks = getattr(compressed_text, "chunks", None)
+    if chunks is not None:
+        return decompress_chunks(chunks)
+
+    tag, sep, payload = compressed_text.partition(".")
+    if not sep:
+        # untagged values are zlib, as written by all earlier versions
+        return _DEFAULT_CODEC.decode(compressed_text)
+
+    if tag.startswith(_DICTIONARY_TAG):
+        return _decompress_with_dictionary(tag[len(_DICTIONARY_TAG):], payload)
+
+    codec = _CODECS_BY_TAG.get(tag)
+    if codec is None:
+        raise ValueError(
+            f"Unknown compression tag: '{tag}'. The codec may not be installed."
+        )
+    return codec.decode(payload)
@@ -10,6 +10,27 @@ DATAEDITOR_DATETIME_VALUE_PREFIX = "STREAMLIT_DATETIME_"
 DATAEDITOR_TIME_VALUE_PREFIX = "STREAMLIT_TIME_"
 DATAEDITOR_PREFIX = "STREAMLIT_PERMALINK_DATA_EDITOR_"
 DATAEDITOR_COLUMN_CONFIG_PREFIX = "STREAMLIT_PERMALINK_DATA_EDITOR_COLUMN_CONFIG_"
+DATAEDITOR_DELTA_PREFIX = "STREAMLIT_PERMALINK_DATA_EDITOR_DELTA_"
+DATAEDITOR_CODEC_PREFIX = "STREAMLIT_PERMALINK_DATA_EDITOR_CODEC_"
+STATE_BLOB_KEY = "STREAMLIT_PERMALINK_STATE_BLOB"
+STATE_BLOB_CACHE_KEY = "STREAMLIT_PERMALINK_STATE_BLOB_CACHE"
+PENDING_STATE_BLOB_KEY = "STREAMLIT_PERMALINK_PENDING_STATE_BLOB"
+PENDING_URL_VALUES_KEY = "STREAMLIT_PERMALINK_PENDING_URL_VALUES"
+BATCH_DEPTH_KEY = "STREAMLIT_PERMALINK_BATCH_DEPTH"
+QUERY_PARAMS_SNAPSHOT_KEY = "STREAMLIT_PERMALINK_QUERY_PARAMS_SNAPSHOT"
+SCRIPT_RUN_KEY = "STREAMLIT_PERMALINK_SCRIPT_RUN"
+RUN_BUFFER_KEY = "STREAMLIT_PERMALINK_RUN_BUFFER"
+SYNC_STATE_PREFIX = "STREAMLIT_PERMALINK_SYNC_"
+CHUNK_SIZE_KEY = "STREAMLIT_PERMALINK_CHUNK_SIZE"
+CHUNKED_URL_VALUE_PREFIX = "_STREAMLIT_PERMALINK_CHUNKS_"
+LITERAL_URL_VALUE_PREFIX = "_STREAMLIT_PERMALINK_LITERAL_"
+PERMALINK_SCHEMA_KEY = "STREAMLIT_PERMALINK_SCHEMA"
+ELIDE_DEFAULTS_KEY = "STREAMLIT_PERMALINK_ELIDE_DEFAULTS"
+DEFAULT_URL_VALUES_KEY = "STREAMLIT_PERMALINK_DEFAULT_URL_VALUES"
+DEFERRED_URL_UPDATES_KEY = "STREAMLIT_PERMALINK_DEFERRED_URL_UPDATES"
+FLUSH_TIMER_KEY = "STREAMLIT_PERMALINK_FLUSH_TIMER"
+DUPLICATE_OPTIONS_WARNED_KEY = "STREAMLIT_PERMALINK_DUPLICATE_OPTIONS_WARNED"
+COMPACT_URL_VALUE_PREFIX = "_"
 TRUE_URL_VALUE = "True"
 FALSE_URL_VALUE = "False"
 
@@ -0,0 +1,186 @@
+"""
+Cache of decoded URL values, shared by all sessions.
+
+Widgets decode their URL value on every rerun. For compressed values and
+data_editor tables that means base64 decoding, inflating and parsing JSON
+again although the URL didn't change. Results are cached by URL key and a
+hash of the raw value, up to a maximum memory size.
+"""
+
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from .chunking import value_chunks
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory size of a cached value in bytes.
+    """
+    # pandas is only imported by apps that use data_editor
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def raw_value_key(url_key: str, raw_value: str, kind: str) -> Tuple[str, str, str]:
+    """
+    Cache key of a raw URL value, ``kind`` names the decoding step.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    # chunk by chunk, chunked values hash like their joined string
+    for chunk in value_chunks(raw_value):
+        digest.update(chunk.encode("utf-8"))
+    return (kind, url_key, digest.hexdigest())
+
+
+def raw_values_key(url_key: str, raw_values: List[str], kind: str) -> Tuple[str, str, str]:
+    """
+    Cache key of a list of raw URL values, ``kind`` names the decoding step.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for raw_value in raw_values:
+        # length prefixed, so ["ab", "c"] and ["a", "bc"] differ
+        digest.update(f"{len(raw_value)}:".encode("utf-8"))
+        for chunk in value_chunks(raw_value):
+            digest.update(chunk.encode("utf-8"))
+    return (kind, url_key, digest.hexdigest())
+
+
+class DecodeCache:
+    """
+    Bounded cache of decoded values, evicting by memory size.
+
+    Attributes:
+        max_bytes: Maximum total size of the cached values
+        policy: "lru" evicts the least recently used value first, "fifo" the oldest
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that had to decode
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, policy: str = "lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Invalid eviction policy: {policy}. Expected one of: {EVICTION_POLICIES}"
+            )
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the cached values in bytes.
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        """
+        Remove all cached values.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value, ``default`` if it isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """
+        Cache a value. Values larger than ``max_bytes`` are not cached.
+        """
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        """
+        Change the size limit, evicting values until the cache fits.
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted
+
+    def get_or_decode(
+        self,
+        key: Hashable,
+        decode: Callable[[], Any],
+        copy: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        Get a cached value or decode and cache it.
+
+        Mutable values (e.g. DataFrames) should pass ``copy`` so callers never
+        modify the cached value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = decode()
+            self.put(key, value)
+        return copy(value) if copy is not None else value
+
+
+DECODE_CACHE = DecodeCache()
+
+
+def configure_decode_cache(
+    max_bytes: Optional[int] = None, policy: Optional[str] = None
+) -> DecodeCache:
+    """
+    Change the size limit or eviction policy of the shared decode cache.
+
+    ``max_bytes=0`` disables caching.
+    """
+    if policy is not None:
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Invalid eviction policy: {policy}. Expected one of: {EVICTION_POLICIES}"
+            )
+        DECODE_CACHE.policy = policy
+    if max_bytes is not None:
+        DECODE_CACHE.resize(max_bytes)
+    return DECODE_CACHE
@@ -1,68 +1,86 @@
 """
 This module contains handlers for the Streamlit widgets.
+
+Handler modules are imported on first use, so apps only load the handlers
+(and their dependencies, e.g. pandas for data_editor) of the widgets they use.
 """
 
+from collections.abc import Mapping
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Dict, Iterator, Tuple
+
 import streamlit as st
 
+# widget name -> (handler module, handler class)
 # Base handlers that are available in all Streamlit versions
-from .checkbox import CheckboxHandler
-from .radio import RadioHandler
-from .selectbox import SelectboxHandler
-from .multiselect import MultiSelectHandler
-from .slider import SliderHandler
-from .text_input import TextInputHandler
-from .number_input import NumberInputHandler
-from .text_area import TextAreaHandler
-from .date_input import DateInputHandler
-from .time_input import TimeInputHandler
-from .color_picker import ColorPickerHandler
-
-# Initialize handlers dictionary with base widgets
-HANDLERS = {
-    "checkbox": CheckboxHandler,
-    "radio": RadioHandler,
-    "selectbox": SelectboxHandler,
-    "multiselect": MultiSelectHandler,
-    "slider": SliderHandler,
-    "text_input": TextInputHandler,
-    "number_input": NumberInputHandler,
-    "text_area": TextAreaHandler,
-    "date_input": DateInputHandler,
-    "time_input": TimeInputHandler,
-    "color_picker": ColorPickerHandler,
+_HANDLER_SPECS: Dict[str, Tuple[str, str]] = {
+    "checkbox": ("checkbox", "CheckboxHandler"),
+    "radio": ("radio", "RadioHandler"),
+    "selectbox": ("selectbox", "SelectboxHandler"),
+    "multiselect": ("multiselect", "MultiSelectHandler"),
+    "slider": ("slider", "SliderHandler"),
+    "text_input": ("text_input", "TextInputHandler"),
+    "number_input": ("number_input", "NumberInputHandler"),
+    "text_area": ("text_area", "TextAreaHandler"),
+    "date_input": ("date_input", "DateInputHandler"),
+    "time_input": ("time_input", "TimeInputHandler"),
+    "color_picker": ("color_picker", "ColorPickerHandler"),
 }
 
 # Conditionally add newer widget handlers
 if hasattr(st, "toggle"):
-    from .toggle import ToggleHandler
-
-    HANDLERS["toggle"] = ToggleHandler
+    _HANDLER_SPECS["toggle"] = ("toggle", "ToggleHandler")
 
 if hasattr(st, "select_slider"):
-    from .select_slider import SelectSliderHandler
-
-    HANDLERS["select_slider"] = SelectSliderHandler
+    _HANDLER_SPECS["select_slider"] = ("select_slider", "SelectSliderHandler")
 
 if hasattr(st, "pills"):
-    from .pills import PillsHandler
-
-    HANDLERS["pills"] = PillsHandler
+    _HANDLER_SPECS["pills"] = ("pills", "PillsHandler")
 
 if hasattr(st, "segmented_control"):
-    from .segmented_control import SegmentedControlHandler
-
-    HANDLERS["segmented_control"] = SegmentedControlHandler
+    _HANDLER_SPECS["segmented_control"] = ("segmented_control", "SegmentedControlHandler")
 
 if hasattr(st, "data_editor"):
-    from .data_editor import DataEditorHandler
-
-    HANDLERS["data_editor"] = DataEditorHandler
+    _HANDLER_SPECS["data_editor"] = ("data_editor", "DataEditorHandler")
 
 # option menu (from streamlit_option_menu import option_menu) not in st
-try:
-    from streamlit_option_menu import option_menu
-    from .option_menu import OptionMenuHandler
+if find_spec("streamlit_option_menu") is not None:
+    _HANDLER_SPECS["option_menu"] = ("option_menu", "OptionMenuHandler")
+
+
+class _HandlerRegistry(Mapping):
+    """
+    Mapping of widget names to handler classes, importing each handler module
+    the first time its handler is looked up.
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, str]]):
+        self._specs = specs
+        self._loaded: Dict[str, type] = {}
+
+    def __getitem__(self, name: str) -> type:
+        handler = self._loaded.get(name)
+        if handler is None:
+            module, class_name = self._specs[name]
+            handler = getattr(import_module(f".{module}", __name__), class_name)
+            self._loaded[name] = handler
+        return handler
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+HANDLERS = _HandlerRegistry(_HANDLER_SPECS)
+
+_HANDLER_NAMES = {class_name: name for name, (_, class_name) in _HANDLER_SPECS.items()}
+
 
-    HANDLERS["option_menu"] = OptionMenuHandler
-except ImportError:
-    pass
+def __getattr__(name: str) -> type:
+    # keeps `from streamlit_permalink.handlers import CheckboxHandler` working
+    if name in _HANDLER_NAMES:
+        return HANDLERS[_HANDLER_NAMES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -21,6 +21,9 @@ class CheckboxHandler(WidgetHandler):
                 err=err,
             )
 
+    def declared_value(self) -> bool:
+        return bool(self.bound_args.arguments.get("value", False))
+
     def sync_query_params(self) -> None:
         str_value: str = self.validate_single_url_value(
             self.url_value, allow_none=False
@@ -19,6 +19,10 @@ class ColorPickerHandler(WidgetHandler):
                 err=err,
             )
 
+    def declared_value(self) -> str:
+        # Streamlit's default color
+        return self.bound_args.arguments.get("value") or "#000000"
+
     def sync_query_params(self) -> None:
 
         str_value: str = self.validate_single_url_value(
@@ -27,6 +31,9 @@ class ColorPickerHandler(WidgetHandler):
         color_value: str = self.validate_color(str_value)
         self.bound_args.arguments["value"] = color_value
 
+    def apply_value(self, value: Any) -> None:
+        self.bound_args.arguments["value"] = self.validate_color(value)
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if not isinstance(value, str):
@@ -1,56 +1,129 @@
-from ..constants import DATAEDITOR_COLUMN_CONFIG_PREFIX, DATAEDITOR_DATE_VALUE_PREFIX, DATAEDITOR_DATETIME_VALUE_PREFIX, DATAEDITOR_PREFIX, DATAEDITOR_TIME_VALUE_PREFIX
-from ..url_validators import validate_single_url_value
-from .handler import WidgetHandler
-from typing import Any
-from io import StringIO
+from functools import partial
+import json
+from typing import Any, Optional
 
-import streamlit as st
 import pandas as pd
+import streamlit as st
 
+from .. import instrumentation
+from ..constants import (
+    DATAEDITOR_CODEC_PREFIX,
+    DATAEDITOR_COLUMN_CONFIG_PREFIX,
+    DATAEDITOR_DELTA_PREFIX,
+    DATAEDITOR_PREFIX,
+)
+from ..dataframe_codecs import (
+    decode_dataframe,
+    encode_dataframe,
+    fix_datetime_columns,
+    get_dataframe_codec,
+)
+from ..decode_cache import DECODE_CACHE, raw_value_key
+from ..query_params import get_default_url_value, set_default_url_value
+from ..url_validators import validate_single_url_value
+from ..utils import fingerprint_df, merge_data_editor_deltas, update_data_editor
 from .handler import WidgetHandler
 
 # TODO: Update df to prefix STREAMLIT_PERMALINK_TIME in front of time values ratehr than requiring col config
 
 
-def fix_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
+EMPTY_DELTA = {"edited_rows": {}, "added_rows": [], "deleted_rows": []}
+
+
+def encode_delta(fingerprint: str, delta: dict) -> str:
+    """
+    Encode a data editor delta and the fingerprint of the data it applies to.
+    """
+    return json.dumps({"fingerprint": fingerprint, **delta}, separators=(",", ":"))
+
+
+def data_editor_url_value(url_key: str) -> str:
     """
-    Fix datetime columns in a DataFrame based on column configuration.
+    Build the URL value of a data editor from its current session state.
+
+    In delta mode only the edits against the original data are encoded,
+    otherwise the edited table is encoded in full with the widget's DataFrame codec.
     """
-    df = df.copy(deep=True)
-
-    for col in df.columns:
-        for idx in df.index:
-            value = df.at[idx, col]
-            if isinstance(value, str):
-                if value.startswith(DATAEDITOR_DATE_VALUE_PREFIX):
-                    df.at[idx, col] = pd.to_datetime(
-                        value.replace(DATAEDITOR_DATE_VALUE_PREFIX, "")
-                    ).date()
-                elif value.startswith(DATAEDITOR_DATETIME_VALUE_PREFIX):
-                    df.at[idx, col] = pd.to_datetime(
-                        value.replace(DATAEDITOR_DATETIME_VALUE_PREFIX, "")
-                    )
-                elif value.startswith(DATAEDITOR_TIME_VALUE_PREFIX):
-                    df.at[idx, col] = pd.to_datetime(
-                        value.replace(DATAEDITOR_TIME_VALUE_PREFIX, ""), format="%H:%M"
-                    ).time()
-
-    return df
+    df_updates = st.session_state[url_key]
+    # example = {'edited_rows': {}, 'added_rows': [{}, {'col1': 3}], 'deleted_rows': [1, 2]}
+
+    delta_state = st.session_state.get(f"{DATAEDITOR_DELTA_PREFIX}{url_key}")
+    if delta_state is not None:
+        delta = merge_data_editor_deltas(
+            delta_state["rows"], delta_state["delta"], df_updates
+        )
+        return encode_delta(delta_state["fingerprint"], delta)
+
+    original_df = st.session_state[f"{DATAEDITOR_PREFIX}{url_key}"]
+    updated_df = update_data_editor(original_df, df_updates)
+    return encode_dataframe(
+        fix_datetime_columns(updated_df),
+        st.session_state.get(f"{DATAEDITOR_CODEC_PREFIX}{url_key}"),
+    )
+
+
+def data_editor_is_default(url_key: str) -> bool:
+    """
+    Whether the edited table has the same content as the data the data editor was declared with.
+    """
+    default_fingerprint = get_default_url_value(url_key)
+    if default_fingerprint is None:
+        return False
+    original_df = st.session_state[f"{DATAEDITOR_PREFIX}{url_key}"]
+    updated_df = update_data_editor(original_df, st.session_state[url_key])
+    return fingerprint_df(updated_df) == default_fingerprint
 
 
 class DataEditorHandler(WidgetHandler):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        url_delta: bool = False,
+        df_codec: Optional[str] = None,
+        **kwargs,
+    ):
         """
-        Initialize the HandlerPills instance.
+        Initialize the DataEditorHandler instance.
         """
         super().__init__(*args, **kwargs)
 
+        self.df_codec = get_dataframe_codec(df_codec).name
+        st.session_state[f"{DATAEDITOR_CODEC_PREFIX}{self.url_key}"] = self.df_codec
+
         # Add column_config to to session state, sinec it is not part of the data
         st.session_state[
             f"{DATAEDITOR_COLUMN_CONFIG_PREFIX}{self.url_key}"
         ] = self.bound_args.arguments.get("column_config")
 
+        self.url_delta = url_delta
+        self.delta_key = f"{DATAEDITOR_DELTA_PREFIX}{self.url_key}"
+        data = self.bound_args.arguments.get("data")
+        if not self.url_delta:
+            st.session_state.pop(self.delta_key, None)
+            if self.elide_defaults and isinstance(data, pd.DataFrame):
+                # tables are compared by content hash, not by their URL value
+                set_default_url_value(self.url_key, fingerprint_df(data))
+            return
+
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError(
+                f"url_delta requires data to be a pandas DataFrame, got {type(data)}"
+            )
+        fingerprint = fingerprint_df(data)
+        st.session_state[self.delta_key] = {
+            "fingerprint": fingerprint,
+            "rows": len(data),
+            "delta": EMPTY_DELTA,
+        }
+        if self.elide_defaults:
+            set_default_url_value(self.url_key, fingerprint)
+
+    @property
+    def can_skip_sync(self) -> bool:
+        # the parsed table and delta are stored in session state on every sync
+        return False
+
     # Override the url_init method to set the initial fromt he data rather than return
     def url_init(self, widget_value: Any) -> None:
         """
@@ -59,18 +132,58 @@ class DataEditorHandler(WidgetHandler):
         st.session_state[f"{DATAEDITOR_PREFIX}{self.url_key}"] = (
             self.bound_args.arguments.get("data")
         )
-        if self.init_url:
-            self.update_url_param(self.bound_args.arguments.get("data"))
+        if self.init_url and not self.elide_defaults:
+            if self.url_delta:
+                self.update_url_param(
+                    encode_delta(st.session_state[self.delta_key]["fingerprint"], EMPTY_DELTA)
+                )
+            else:
+                self.update_url_param(
+                    encode_dataframe(self.bound_args.arguments.get("data"), self.df_codec)
+                )
 
     def sync_query_params(self) -> None:
 
         # Process URL value: ensure single value and convert to boolean
         parsed_value = self.validate_single_url_value(self.url_value, allow_none=False)
-        df = pd.read_json(StringIO(parsed_value), orient="records")
-        df = fix_datetime_columns(df)
+
+        # deltas are JSON objects, so links holding a full table still load in delta mode
+        if self.url_delta and parsed_value.lstrip().startswith("{"):
+            df = self.replay_delta(parsed_value)
+        else:
+            key = raw_value_key(self.url_key, parsed_value, "dataframe")
+            if instrumentation.is_enabled():
+                instrumentation.record_cache(self.url_key, key in DECODE_CACHE)
+            df = DECODE_CACHE.get_or_decode(
+                key, partial(decode_dataframe, parsed_value), copy=pd.DataFrame.copy
+            )
+
         st.session_state[f"{DATAEDITOR_PREFIX}{self.url_key}"] = df
         self.bound_args.arguments["data"] = df
 
+    def replay_delta(self, url_value: str) -> pd.DataFrame:
+        """
+        Apply the delta stored in the URL to the original data.
+        """
+        try:
+            payload = json.loads(url_value)
+            delta = {k: payload[k] for k in EMPTY_DELTA}
+            fingerprint = payload["fingerprint"]
+        except (ValueError, TypeError, KeyError) as err:
+            self.raise_url_error("Invalid data editor delta.", err)
+
+        delta_state = st.session_state[self.delta_key]
+        if fingerprint != delta_state["fingerprint"]:
+            self.raise_url_error(
+                "Data editor delta was created for different data "
+                f"(fingerprint {fingerprint}, expected {delta_state['fingerprint']})."
+            )
+
+        delta_state["delta"] = delta
+        data = self.bound_args.arguments.get("data")
+        # the editor reports rows by position, deleted rows mustn't leave gaps in the index
+        return fix_datetime_columns(update_data_editor(data, delta)).reset_index(drop=True)
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if not isinstance(value, pd.DataFrame):
@@ -82,5 +195,4 @@ class DataEditorHandler(WidgetHandler):
     @classmethod
     def verify_get_url_value(cls, value: Any) -> Any:
         parsed_value = validate_single_url_value(value, allow_none=False)
-        df = pd.read_json(StringIO(parsed_value), orient="records")
-        return [df]
+        return [decode_dataframe(parsed_value)]
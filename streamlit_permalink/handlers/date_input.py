@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Any, Union, Tuple
 from datetime import date
 
+from ..compact_values import decode_compact_value, is_compact_value
 from ..url_validators import validate_multi_url_values
 
 from .handler import WidgetHandler
@@ -27,8 +28,19 @@ def get_date_value(value: Any) -> DateValue:
     )
 
 
+def parse_date(str_value: str) -> date:
+    """
+    Parse a compact or ISO (YYYY-MM-DD) date URL value.
+    """
+    if is_compact_value(str_value):
+        return decode_compact_value(str_value, date)
+    return date.fromisoformat(str_value)
+
+
 class DateInputHandler(WidgetHandler):
 
+    supports_compact = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.is_range = isinstance(
@@ -48,6 +60,15 @@ class DateInputHandler(WidgetHandler):
                 f"Date {date_value} is after the maximum allowed date {self.max_value}."
             )
 
+    def declared_value(self) -> Any:
+        value = self.bound_args.arguments.get("value", "today")
+        # the widget returns dates, also for datetimes
+        if self.is_range:
+            dates = [get_date_value(v) for v in value]
+            return tuple(d.date() if isinstance(d, datetime) else d for d in dates)
+        value = get_date_value(value)
+        return value.date() if isinstance(value, datetime) else value
+
     def sync_query_params(self) -> None:
 
         if not self.is_range:
@@ -59,7 +80,7 @@ class DateInputHandler(WidgetHandler):
                 return
 
             try:
-                date_value = date.fromisoformat(str_value)
+                date_value = parse_date(str_value)
             except Exception as err:
                 self.raise_url_error(
                     f"Invalid date format. Expected format: {str_value} YYYY-MM-DD.",
@@ -75,7 +96,7 @@ class DateInputHandler(WidgetHandler):
                 self.url_value, min_values=0, max_values=2, allow_none=True
             )
             try:
-                date_values = tuple(date.fromisoformat(v) for v in str_values)
+                date_values = tuple(parse_date(v) for v in str_values)
             except Exception as err:
                 self.raise_url_error(
                     f"Invalid date format: {str_values}. Expected format: YYYY-MM-DD.",
@@ -92,6 +113,22 @@ class DateInputHandler(WidgetHandler):
 
             self.bound_args.arguments["value"] = date_values
 
+    def apply_value(self, value: Any) -> None:
+        if self.is_range:
+            if not isinstance(value, (list, tuple)) or len(value) > 2:
+                self.raise_url_error(f"Invalid value: {value}. Expected up to 2 dates.")
+            value = tuple(value)
+            if len(value) == 2 and value[0] > value[1]:
+                self.raise_url_error("Start date must be before end date.")
+            date_values = value
+        else:
+            if isinstance(value, (list, tuple)):
+                self.raise_url_error(f"Invalid value: {value}. Expected a single date.")
+            date_values = () if value is None else (value,)
+        for date_value in date_values:
+            self.validate_bounds(date_value)
+        self.bound_args.arguments["value"] = value
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if isinstance(value, (tuple, list)):
@@ -106,7 +143,7 @@ class DateInputHandler(WidgetHandler):
             value, min_values=0, max_values=2, allow_none=True
         )
         try:
-            date_values = tuple(date.fromisoformat(v) for v in str_values)
+            date_values = tuple(parse_date(v) for v in str_values)
         except Exception as err:
             raise ValueError(
                 f"Invalid date format: {str_values}. Expected format: YYYY-MM-DD.",
@@ -1,23 +1,102 @@
 from functools import partial
-from typing import Any, Callable, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Union
 import inspect
+import operator
+import time
 
 import streamlit as st
 
-from packaging.version import parse as V
-
+from .. import instrumentation
+from ..constants import SYNC_STATE_PREFIX
 from ..exceptions import UrlParamError
+from ..query_params import read_url_value, set_default_url_value
 from ..utils import (
     init_url_value,
     to_url_value,
-    DEFAULT_COMPRESSOR,
     DEFAULT_DECOMPRESSOR,
     _compress_list,
     _decompress_list,
+    get_compressor,
 )
 
 from ..url_validators import validate_multi_url_values, validate_single_url_value
 
+if TYPE_CHECKING:
+    from ..schema import Field
+
+
+# declared_value of widgets whose default can't be told from their arguments
+UNKNOWN_DEFAULT = object()
+
+# callbacks are new objects on every run and don't affect the sync
+_UNTRACKED_ARGUMENTS = frozenset(("on_change", "on_click", "args", "kwargs"))
+
+# arguments compared by value when they are new objects, e.g. labels
+_SCALAR_TYPES = frozenset((str, bytes, int, float, bool, type(None)))
+
+
+def _freeze_arguments(arguments: dict) -> Optional[tuple]:
+    """
+    Hashable snapshot of widget arguments, None if they can't be compared cheaply.
+
+    Types are kept so that e.g. ``1`` and ``True`` don't compare equal.
+    """
+    frozen = []
+    for name, value in arguments.items():
+        if name in _UNTRACKED_ARGUMENTS:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = (type(value), tuple(value), tuple(map(type, value)))
+        else:
+            value = (type(value), value)
+        frozen.append((name, value))
+    frozen = tuple(frozen)
+    try:
+        hash(frozen)
+    except TypeError:
+        return None
+    return frozen
+
+
+def _argument_refs(arguments: dict) -> tuple:
+    """
+    The widget arguments, with a snapshot of the items of lists.
+
+    Kept with the last sync so an app passing the same objects (e.g. options
+    defined once at module level) skips hashing their content. Holding the
+    references keeps their ids from being reused by other objects.
+    """
+    return tuple(
+        (name, value, tuple(value) if isinstance(value, list) else None)
+        for name, value in arguments.items()
+        if name not in _UNTRACKED_ARGUMENTS
+    )
+
+
+def _same_arguments(refs: tuple, arguments: dict) -> bool:
+    """
+    Whether the widget gets the same arguments as in the last sync without hashing their content.
+
+    Scalars are compared by value, anything else must be the same object.
+    Lists can be changed in place between runs, so their items must also be
+    the same objects as in the snapshot.
+    """
+    tracked = [(name, value) for name, value in arguments.items() if name not in _UNTRACKED_ARGUMENTS]
+    if len(tracked) != len(refs):
+        return False
+    for (name, value), (ref_name, ref_value, items) in zip(tracked, refs):
+        if name != ref_name:
+            return False
+        if value is not ref_value and not (
+            type(value) is type(ref_value) and type(value) in _SCALAR_TYPES and value == ref_value
+        ):
+            return False
+        if items is not None and (
+            len(value) != len(items) or not all(map(operator.is_, value, items))
+        ):
+            return False
+    return True
+
 
 class WidgetHandler:
     """
@@ -34,12 +113,18 @@ class WidgetHandler:
         decompressor: Decompressor function for url_value
         init_url: Boolean indicating whether to initialize URL value
         validate_url: Boolean indicating whether to validate URL value
+        compact: Boolean indicating whether to write compact typed URL values
+        field: Schema field of the URL key, decodes the URL value instead of the handler
+        elide_defaults: Boolean indicating whether to leave the widget's default out of the URL
 
     returns:
         The widget's return value
 
     """
 
+    # whether the widget's values can be written with compact typed encodings
+    supports_compact = False
+
     def __init__(
         self,
         base_widget: st.delta_generator.DeltaGenerator,
@@ -49,6 +134,9 @@ class WidgetHandler:
         compressor: Callable,
         decompressor: Callable,
         init_url: bool,
+        compact: bool = False,
+        field: Optional["Field"] = None,
+        elide_defaults: bool = False,
     ):
         self.base_widget = base_widget
         self.url_key = url_key
@@ -57,10 +145,27 @@ class WidgetHandler:
         self.compressor = compressor
         self.decompressor = decompressor
         self.init_url = init_url
+        self.compact = compact
+        self.field = field
+        self.elide_defaults = elide_defaults
+        self._url_value = None
+        self._url_value_decoded = False
+        self._decode_seconds = 0.0
 
-        self.url_value = None
-        if self.has_url_value:
-            self.url_value = self.decompressor(self.raw_url_value)
+    @property
+    def url_value(self) -> Optional[List[str]]:
+        """
+        The decompressed URL value(s), decompressed on first use.
+        """
+        if not self._url_value_decoded:
+            if self.has_url_value:
+                start = time.perf_counter()
+                self._url_value = self.decompressor(self.raw_url_value)
+                self._decode_seconds = time.perf_counter() - start
+                if instrumentation.is_enabled():
+                    instrumentation.record_time(self.url_key, "decode", self._decode_seconds)
+            self._url_value_decoded = True
+        return self._url_value
 
     def sync_query_params(self) -> None:
         """
@@ -69,11 +174,22 @@ class WidgetHandler:
         """
         raise NotImplementedError("Subclasses must implement update_bound_args.")
 
+    def apply_value(self, value: Any) -> None:
+        """
+        Set the widget arguments for a value decoded by the schema field.
+
+        Handlers override this to check the value against the widget's own
+        arguments (bounds, options, ...) like ``sync_query_params`` does.
+        """
+        self.bound_args.arguments["value"] = value
+
     def update_url_param(self, value: Any):
         """
         Set the URL value(s) in the query params.
         """
-        init_url_value(self.url_key, self.compressor(to_url_value(value)))
+        init_url_value(
+            self.url_key, self.compressor(to_url_value(value, compact=self.compact))
+        )
 
     @property
     def has_url_value(self) -> bool:
@@ -89,23 +205,142 @@ class WidgetHandler:
         """
         return self.base_widget.__name__
 
+    def declared_value(self) -> Any:
+        """
+        Value of the widget without a URL value, from its declared arguments.
+
+        Called before the URL value is applied. Handlers return
+        ``UNKNOWN_DEFAULT`` when the arguments don't tell the default.
+        """
+        return UNKNOWN_DEFAULT
+
+    def record_declared_default(self) -> None:
+        """
+        Remember the declared default of a widget rendered with a URL value.
+        """
+        value = self.declared_value()
+        if value is not UNKNOWN_DEFAULT:
+            set_default_url_value(self.url_key, to_url_value(value, compact=self.compact))
+
     def url_init(self, widget_value: Any) -> None:
         """
         Initialize the URL value(s) in the query params.
         """
+        if self.elide_defaults:
+            # rendered without a URL value, so this is the widget's default
+            set_default_url_value(self.url_key, to_url_value(widget_value, compact=self.compact))
+            return
         if self.init_url:
             self.update_url_param(widget_value)
 
     def run(self) -> Any:
+        instrumented = instrumentation.is_enabled()
+        sync_skipped = False
+
+        if self.elide_defaults and self.has_url_value:
+            # pages opened from a link never render the default
+            self.record_declared_default()
 
         if not self.has_url_value:
-            widget_value = self.base_widget(**self.bound_args.arguments)
+            widget_value = self.render(instrumented)
             self.url_init(widget_value)
-            return widget_value
+        elif self.field is not None:
+            start = time.perf_counter()
+            self.apply_value(self.field.read(self.raw_url_value))
+            if instrumented:
+                instrumentation.record_time(
+                    self.url_key, "validate", time.perf_counter() - start
+                )
+            widget_value = self.render(instrumented)
+        else:
+            sync_skipped = self.restore_sync()
+            if not sync_skipped:
+                arguments = dict(self.bound_args.arguments)
+                start = time.perf_counter()
+                self.sync_query_params()
+                if instrumented:
+                    # the URL value is decoded during the sync, its time is recorded separately
+                    instrumentation.record_time(
+                        self.url_key,
+                        "validate",
+                        time.perf_counter() - start - self._decode_seconds,
+                    )
+                self.record_sync(arguments)
+            widget_value = self.render(instrumented)
+
+        if instrumented:
+            instrumentation.record_run(self.url_key, self.handler_name, sync_skipped)
+        return widget_value
+
+    def render(self, instrumented: bool = False) -> Any:
+        """
+        Call the Streamlit widget with the bound arguments.
+        """
+        if not instrumented:
+            return self.base_widget(**self.bound_args.arguments)
+        start = time.perf_counter()
+        widget_value = self.base_widget(**self.bound_args.arguments)
+        instrumentation.record_time(self.url_key, "render", time.perf_counter() - start)
+        return widget_value
 
-        self.sync_query_params()
+    @property
+    def can_skip_sync(self) -> bool:
+        """
+        Whether a sync can be replayed from the last run instead of parsing the URL value again.
 
-        return self.base_widget(**self.bound_args.arguments)
+        Handlers whose ``sync_query_params`` has side effects besides setting
+        ``bound_args`` (e.g. mutating the options) must return False.
+        """
+        return True
+
+    def restore_sync(self) -> bool:
+        """
+        Apply the result of the last sync if neither the URL value nor the widget arguments changed.
+
+        The widget arguments a sync sets (e.g. ``value``) are part of the
+        widget's id, so they are applied again rather than skipped.
+
+        Arguments are first compared by identity, and the items of lists with
+        their snapshot, their content is only hashed when the app passes new
+        or changed objects.
+        """
+        if not self.can_skip_sync:
+            return False
+        sync_key = f"{SYNC_STATE_PREFIX}{self.url_key}"
+        last_sync = st.session_state.get(sync_key)
+        if last_sync is None:
+            return False
+        raw_url_value, refs, inputs, updates = last_sync
+        if raw_url_value != self.raw_url_value or inputs is None:
+            return False
+        arguments = self.bound_args.arguments
+        if not _same_arguments(refs, arguments):
+            if inputs != _freeze_arguments(arguments):
+                return False
+            # equal content in new objects, the next run compares these
+            st.session_state[sync_key] = (raw_url_value, _argument_refs(arguments), inputs, updates)
+        arguments.update(updates)
+        return True
+
+    def record_sync(self, arguments: dict) -> None:
+        """
+        Remember the arguments set by sync_query_params for the current URL value.
+        """
+        if not self.can_skip_sync:
+            st.session_state.pop(f"{SYNC_STATE_PREFIX}{self.url_key}", None)
+            return
+        inputs = _freeze_arguments(arguments)
+        updates = {
+            name: value
+            for name, value in self.bound_args.arguments.items()
+            if name not in arguments or arguments[name] is not value
+        }
+        st.session_state[f"{SYNC_STATE_PREFIX}{self.url_key}"] = (
+            list(self.raw_url_value),
+            _argument_refs(arguments),
+            inputs,
+            updates,
+        )
 
     def raise_url_error(self, message: str, err=None) -> None:
         """
@@ -179,21 +414,22 @@ class WidgetHandler:
         value: Any,
         url_key: str,
         compressor: Optional[Callable] = None,
-        compress: bool = False,
+        compress: Union[bool, str] = False,
+        compact: bool = False,
     ) -> str:
         """
         Update the URL parameter
         """
 
-        if compressor is None and compress is True:
-            compressor = DEFAULT_COMPRESSOR
+        if compressor is None and compress:
+            compressor = partial(_compress_list, get_compressor(compress))
 
         if compress is False:
             compressor = partial(_compress_list, lambda x: x)
 
         value = cls.verify_update_url_value(value)
 
-        init_url_value(url_key, compressor(to_url_value(value)))
+        init_url_value(url_key, compressor(to_url_value(value, compact=compact)))
 
     @classmethod
     def verify_get_url_value(cls, value: Any) -> Any:
@@ -204,23 +440,17 @@ class WidgetHandler:
 
     @classmethod
     def get_url_value(
-        cls, url_key: str, decompressor: Optional[Callable] = None, compress: bool = False
+        cls, url_key: str, decompressor: Optional[Callable] = None, compress: Union[bool, str] = False
     ) -> Any:
         """
         Get the URL value for the given key.
         """
-        if decompressor is None and compress is True:
+        if decompressor is None and compress:
             decompressor = DEFAULT_DECOMPRESSOR
         if compress is False:
             decompressor = partial(_decompress_list, lambda x: x)
 
-        if V(st.__version__) < V("1.30"):
-            raw_url_value = st.experimental_get_query_params().get(url_key, None)
-        else:
-            raw_url_value = st.query_params.get_all(url_key)
-            if len(raw_url_value) == 0:
-                raw_url_value = None
-
+        raw_url_value = read_url_value(url_key)
         if raw_url_value is None:
             return None
 
@@ -3,9 +3,7 @@ from typing import Any, Iterable, List
 from ..url_validators import validate_multi_url_values
 
 from .handler import WidgetHandler
-from ..utils import (
-    _validate_multi_options,
-)
+from ..utils import get_option_index
 
 
 class MultiSelectHandler(WidgetHandler):
@@ -16,21 +14,33 @@ class MultiSelectHandler(WidgetHandler):
         """
         super().__init__(*args, **kwargs)
         self.options = self.bound_args.arguments.get("options")
-        self.str_options: List[str] = _validate_multi_options(
-            self.options, self.handler_name
-        )
+        self.option_index = get_option_index(self.options, self.handler_name)
+        self.str_options: List[str] = self.option_index.str_options
 
         self.accept_new_options = self.bound_args.arguments.get(
             "accept_new_options", False
         )
 
+    @property
+    def can_skip_sync(self) -> bool:
+        # new options from the URL are added to the options on every run
+        return not self.accept_new_options
+
+    def declared_value(self) -> List[Any]:
+        default = self.bound_args.arguments.get("default")
+        if default is None:
+            return []
+        if isinstance(default, str) or not isinstance(default, Iterable):
+            return [default]
+        return list(default)
+
     def sync_query_params(self) -> None:
         str_values = self.validate_multi_url_values(
             self.url_value, min_values=None, max_values=None, allow_none=True
         )
 
         # Validate all values are in options
-        invalid_str_values = [v for v in str_values if v not in self.str_options]
+        invalid_str_values = [v for v in str_values if v not in self.option_index]
 
         if self.accept_new_options:
             self.options.extend(invalid_str_values)
@@ -39,11 +49,23 @@ class MultiSelectHandler(WidgetHandler):
             if invalid_str_values:
                 self.raise_url_error(f"Invalid values: {invalid_str_values}")
 
-        # Convert string values back to original option values
-        options_map = {str(v): v for v in self.options}
-        actual_values = [options_map[v] for v in str_values]
+        # Convert string values back to original option values, new options are strings
+        options_map = self.option_index.values
+        actual_values = [options_map.get(v, v) for v in str_values]
         self.bound_args.arguments["default"] = actual_values
 
+    def apply_value(self, value: Any) -> None:
+        if value is None:
+            value = []
+        elif isinstance(value, str) or not isinstance(value, Iterable):
+            value = [value]
+        invalid_values = [v for v in value if str(v) not in self.option_index]
+        if invalid_values:
+            self.raise_url_error(
+                f"Invalid values: {invalid_values}. Expected one of: {self.str_options}"
+            )
+        self.bound_args.arguments["default"] = list(value)
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if not isinstance(value, Iterable):
@@ -1,12 +1,15 @@
 from typing import Any
 
 from ..url_validators import validate_single_url_value
+from ..value_parsing import parse_number
 
 from .handler import WidgetHandler
 
 
 class NumberInputHandler(WidgetHandler):
 
+    supports_compact = True
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the HandlerMultiSelect instance.
@@ -38,6 +41,9 @@ class NumberInputHandler(WidgetHandler):
                 f"Value {value} is greater than the maximum allowed value {self.max_value}."
             )
 
+    def declared_value(self) -> Any:
+        return self.value
+
     def sync_query_params(self) -> None:
 
         # Parse the URL value
@@ -52,16 +58,8 @@ class NumberInputHandler(WidgetHandler):
             return
 
         try:
-            if self.value_type == int:
-                parsed_value = int(str_value)
-            elif self.value_type == float:
-                parsed_value = float(str_value)
-            elif self.value_type == type(None):
-                # For None type, try float first, then int if that fails, or keep as None
-                try:
-                    parsed_value = int(str_value)
-                except (ValueError, TypeError):
-                    parsed_value = float(str_value)
+            # without a value type, the URL value is parsed as int or float by its shape
+            parsed_value = parse_number(str_value, self.value_type)
         except (ValueError, TypeError) as err:
             type_name = (
                 "int"
@@ -75,6 +73,18 @@ class NumberInputHandler(WidgetHandler):
 
         self.bound_args.arguments["value"] = parsed_value
 
+    def apply_value(self, value: Any) -> None:
+        if value is None:
+            if self.value_type != type(None):
+                self.raise_url_error("None value is not allowed.")
+        else:
+            if self.value_type != type(None) and type(value) is not self.value_type:
+                self.raise_url_error(
+                    f"Invalid value type: {type(value)}. Expected {self.value_type}."
+                )
+            self.validate_bounds(value)
+        self.bound_args.arguments["value"] = value
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         """
@@ -92,11 +102,8 @@ class NumberInputHandler(WidgetHandler):
             return [None]
 
         try:
-            return [int(str_value)]
-        except ValueError:
-            try:
-                return [float(str_value)]
-            except ValueError:
-                raise ValueError(
-                    f"Invalid number format: {str_value}. Expected int or float."
-                )
+            return [parse_number(str_value)]
+        except ValueError as err:
+            raise ValueError(
+                f"Invalid number format: {str_value}. Expected int or float."
+            ) from err
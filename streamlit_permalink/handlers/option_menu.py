@@ -2,9 +2,7 @@ from typing import Any
 
 from ..url_validators import validate_single_url_value
 from .handler import WidgetHandler
-from ..utils import (
-    _validate_multi_options,
-)
+from ..utils import get_option_index
 
 
 class OptionMenuHandler(WidgetHandler):
@@ -15,19 +13,27 @@ class OptionMenuHandler(WidgetHandler):
         """
         super().__init__(*args, **kwargs)
         self.options = self.bound_args.arguments.get("options")
-        self.str_options = _validate_multi_options(self.options, self.handler_name)
+        self.option_index = get_option_index(self.options, self.handler_name)
+        self.str_options = self.option_index.str_options
+
+    def declared_value(self) -> Any:
+        return self.options[self.bound_args.arguments.get("default_index", 0)]
 
     def sync_query_params(self) -> None:
         str_value = self.validate_single_url_value(self.url_value, allow_none=False)
-        options_map = {str(v): v for v in self.options}
-
-        if str_value not in options_map:
+        if str_value not in self.option_index:
             self.raise_url_error(
                 f"Invalid value for option menu: '{str_value}'. Expected one of: {self.str_options}"
             )
 
-        actual_value = options_map[str_value]
-        self.bound_args.arguments["default_index"] = self.options.index(actual_value)
+        self.bound_args.arguments["default_index"] = self.option_index.index(str_value)
+
+    def apply_value(self, value: Any) -> None:
+        if str(value) not in self.option_index:
+            self.raise_url_error(
+                f"Invalid value for option menu: '{value}'. Expected one of: {self.str_options}"
+            )
+        self.bound_args.arguments["default_index"] = self.option_index.index(str(value))
 
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
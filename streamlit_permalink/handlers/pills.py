@@ -6,7 +6,7 @@ from .handler import WidgetHandler
 
 from ..utils import (
     _validate_selection_mode,
-    _validate_multi_options,
+    get_option_index,
 )
 
 
@@ -18,14 +18,23 @@ class PillsHandler(WidgetHandler):
         """
         super().__init__(*args, **kwargs)
         self.options = self.bound_args.arguments.get("options", None)
-        self.str_options: List[str] = _validate_multi_options(
-            self.options, self.handler_name
-        )
+        self.option_index = get_option_index(self.options, self.handler_name)
+        self.str_options: List[str] = self.option_index.str_options
 
         self.selection_mode = _validate_selection_mode(
             self.bound_args.arguments.get("selection_mode", "single")
         )
 
+    def declared_value(self) -> Any:
+        default = self.bound_args.arguments.get("default")
+        if self.selection_mode == "single":
+            return default
+        if default is None:
+            return []
+        if isinstance(default, str) or not isinstance(default, Iterable):
+            return [default]
+        return list(default)
+
     def sync_query_params(self) -> None:
 
         # Validate URL values against options
@@ -37,7 +46,7 @@ class PillsHandler(WidgetHandler):
             self.raise_url_error("Multiple values provided for single selection mode.")
 
         # Validate all values are in options
-        invalid_str_values = [v for v in str_values if v not in self.str_options]
+        invalid_str_values = [v for v in str_values if v not in self.option_index]
 
         if len(invalid_str_values) > 0:
             self.raise_url_error(
@@ -45,10 +54,23 @@ class PillsHandler(WidgetHandler):
             )
 
         # Convert string values back to original option values
-        options_map = {str(v): v for v in self.options}
-        actual_values = [options_map[v] for v in str_values]
+        actual_values = [self.option_index.values[v] for v in str_values]
         self.bound_args.arguments["default"] = actual_values
 
+    def apply_value(self, value: Any) -> None:
+        if value is None:
+            value = []
+        elif isinstance(value, str) or not isinstance(value, Iterable):
+            value = [value]
+        if self.selection_mode == "single" and len(value) > 1:
+            self.raise_url_error("Multiple values provided for single selection mode.")
+        invalid_values = [v for v in value if str(v) not in self.option_index]
+        if invalid_values:
+            self.raise_url_error(
+                f"Invalid values: {invalid_values}. Expected one of: {self.str_options}"
+            )
+        self.bound_args.arguments["default"] = list(value)
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if not isinstance(value, Iterable):
@@ -3,9 +3,7 @@ from typing import Any, Optional
 from ..url_validators import validate_single_url_value
 
 from .handler import WidgetHandler
-from ..utils import (
-    _validate_multi_options,
-)
+from ..utils import get_option_index
 
 
 class RadioHandler(WidgetHandler):
@@ -16,7 +14,12 @@ class RadioHandler(WidgetHandler):
         """
         super().__init__(*args, **kwargs)
         self.options = self.bound_args.arguments.get("options")
-        self.str_options = _validate_multi_options(self.options, self.handler_name)
+        self.option_index = get_option_index(self.options, self.handler_name)
+        self.str_options = self.option_index.str_options
+
+    def declared_value(self) -> Any:
+        index = self.bound_args.arguments.get("index", 0)
+        return None if index is None else self.options[index]
 
     def sync_query_params(self) -> None:
 
@@ -28,15 +31,22 @@ class RadioHandler(WidgetHandler):
             self.bound_args.arguments["index"] = None
             return
 
-        options_map = {str(v): v for v in self.options}
-
-        if str_value not in options_map:
+        if str_value not in self.option_index:
             self.raise_url_error(
                 f"Invalid value for radio button: '{str_value}'. Expected one of: {self.str_options}"
             )
 
-        actual_url_value = options_map[str_value]
-        self.bound_args.arguments["index"] = self.options.index(actual_url_value)
+        self.bound_args.arguments["index"] = self.option_index.index(str_value)
+
+    def apply_value(self, value: Any) -> None:
+        if value is None:
+            self.bound_args.arguments["index"] = None
+            return
+        if str(value) not in self.option_index:
+            self.raise_url_error(
+                f"Invalid value for radio button: '{value}'. Expected one of: {self.str_options}"
+            )
+        self.bound_args.arguments["index"] = self.option_index.index(str(value))
 
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
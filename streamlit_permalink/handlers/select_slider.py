@@ -3,9 +3,7 @@ from typing import Any, List
 from ..url_validators import validate_multi_url_values
 
 from .handler import WidgetHandler
-from ..utils import (
-    _validate_multi_options,
-)
+from ..utils import get_option_index
 
 
 class SelectSliderHandler(WidgetHandler):
@@ -15,9 +13,8 @@ class SelectSliderHandler(WidgetHandler):
         super().__init__(*args, **kwargs)
         # Get and validate options
         self.options = self.bound_args.arguments.get("options")
-        self.str_options: List[str] = _validate_multi_options(
-            self.options, self.handler_name
-        )
+        self.option_index = get_option_index(self.options, self.handler_name)
+        self.str_options: List[str] = self.option_index.str_options
 
         # Get value
         self.value = self.bound_args.arguments.get("value", self.options[0])
@@ -32,9 +29,14 @@ class SelectSliderHandler(WidgetHandler):
 
             self.is_range_slider = True
 
+    def declared_value(self) -> Any:
+        if self.value is None:
+            return self.options[0]
+        return tuple(self.value) if self.is_range_slider else self.value
+
     def sync_query_params(self) -> None:
 
-        options_map = {str(v): v for v in self.options}
+        options_map = self.option_index.values
 
         if self.is_range_slider:
 
@@ -42,15 +44,15 @@ class SelectSliderHandler(WidgetHandler):
                 self.url_value, min_values=2, max_values=2, allow_none=False
             )
 
-            invalid_values = [v for v in str_values if v not in self.str_options]
+            invalid_values = [v for v in str_values if v not in self.option_index]
             if invalid_values:
                 self.raise_url_error(
                     f"Invalid values: {invalid_values}. Expected one of: {self.str_options}"
                 )
 
             actual_values = [options_map[v] for v in str_values]
-            start_idx = self.options.index(actual_values[0])
-            end_idx = self.options.index(actual_values[1])
+            start_idx = self.option_index.index(str_values[0])
+            end_idx = self.option_index.index(str_values[1])
 
             if start_idx > end_idx:
                 self.raise_url_error(
@@ -64,7 +66,7 @@ class SelectSliderHandler(WidgetHandler):
                 self.url_value, allow_none=False
             )
 
-            if str_value not in self.str_options:
+            if str_value not in self.option_index:
                 self.raise_url_error(
                     f"Invalid value: {str_value}. Expected one of: {self.str_options}"
                 )
@@ -72,6 +74,25 @@ class SelectSliderHandler(WidgetHandler):
             actual_url_value = options_map[str_value]
             self.bound_args.arguments["value"] = actual_url_value
 
+    def apply_value(self, value: Any) -> None:
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if len(values) != (2 if self.is_range_slider else 1):
+            self.raise_url_error(f"Invalid value for select slider: {value}.")
+        invalid_values = [v for v in values if str(v) not in self.option_index]
+        if invalid_values:
+            self.raise_url_error(
+                f"Invalid values: {invalid_values}. Expected one of: {self.str_options}"
+            )
+        actual_values = [self.option_index.values[str(v)] for v in values]
+        if self.is_range_slider:
+            if self.option_index.index(str(values[0])) > self.option_index.index(str(values[1])):
+                self.raise_url_error(
+                    f"Invalid range for select slider: start value '{values[0]}' comes after end value '{values[1]}' in options."
+                )
+            self.bound_args.arguments["value"] = actual_values
+        else:
+            self.bound_args.arguments["value"] = actual_values[0]
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if isinstance(value, (tuple, list)):
@@ -3,9 +3,7 @@ from typing import Any, Optional
 from ..url_validators import validate_single_url_value
 
 from .handler import WidgetHandler
-from ..utils import (
-    _validate_multi_options,
-)
+from ..utils import get_option_index
 
 
 class SelectboxHandler(WidgetHandler):
@@ -16,12 +14,22 @@ class SelectboxHandler(WidgetHandler):
         """
         super().__init__(*args, **kwargs)
         self.options = self.bound_args.arguments.get("options")
-        self.str_options = _validate_multi_options(self.options, self.handler_name)
+        self.option_index = get_option_index(self.options, self.handler_name)
+        self.str_options = self.option_index.str_options
 
         self.accept_new_options = self.bound_args.arguments.get(
             "accept_new_options", False
         )
 
+    @property
+    def can_skip_sync(self) -> bool:
+        # new options from the URL are added to the options on every run
+        return not self.accept_new_options
+
+    def declared_value(self) -> Any:
+        index = self.bound_args.arguments.get("index", 0)
+        return None if index is None else self.options[index]
+
     def sync_query_params(self) -> None:
         str_value: Optional[str] = self.validate_single_url_value(
             self.url_value, allow_none=True
@@ -31,7 +39,7 @@ class SelectboxHandler(WidgetHandler):
             self.bound_args.arguments["index"] = None
             return
 
-        if str_value not in self.str_options:
+        if str_value not in self.option_index:
 
             if not self.accept_new_options:
                 self.raise_url_error(
@@ -39,11 +47,21 @@ class SelectboxHandler(WidgetHandler):
                 )
 
             self.options.append(str_value)
-            self.str_options.append(str_value)
+            self.str_options = self.str_options + [str_value]
+            self.bound_args.arguments["index"] = len(self.options) - 1
+            return
 
-        options_map = {str(v): v for v in self.options}
-        actual_value = options_map[str_value]
-        self.bound_args.arguments["index"] = self.options.index(actual_value)
+        self.bound_args.arguments["index"] = self.option_index.index(str_value)
+
+    def apply_value(self, value: Any) -> None:
+        if value is None:
+            self.bound_args.arguments["index"] = None
+            return
+        if str(value) not in self.option_index:
+            self.raise_url_error(
+                f"Invalid value for selectbox: '{value}'. Expected one of: {self.str_options}"
+            )
+        self.bound_args.arguments["index"] = self.option_index.index(str(value))
 
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
@@ -2,47 +2,18 @@ from datetime import datetime, date, time
 from typing import Any
 
 from ..url_validators import validate_multi_url_values
+from ..value_parsing import VALID_TYPES, blind_parse_value, parse_value
 
 from .handler import WidgetHandler
 
 
-VALID_TYPES = [int, float, datetime, date, time]
-
-
-def parse_value(value_type, value: Any) -> Any:
-
-    if value_type == int:
-        return int(value)
-    if value_type == float:
-        return float(value)
-    if value_type == datetime:
-        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
-    if value_type == date:
-        return datetime.strptime(value, "%Y-%m-%d").date()
-    if value_type == time:
-        return datetime.strptime(value, "%H:%M").time()
-    raise ValueError(
-        f"Unsupported value type: {value_type}. Expected one of: {VALID_TYPES}"
-    )
-
-
-def blind_parse_value(value: str) -> Any:
-    """
-    Attempt to parse date, datetime, date, int, float
-    """
-    for value_type in VALID_TYPES:
-        try:
-            return parse_value(value_type, value)
-        except ValueError:
-            continue
-    raise ValueError(f"Could not parse value: {value}. Expected one of: {VALID_TYPES}")
-
-
 class SliderHandler(WidgetHandler):
     """
     Handler for slider widget URL state synchronization.
     """
 
+    supports_compact = True
+
     def __init__(self, *args, **kwargs):
         """
         Initialize the HandlerSlider instance.
@@ -98,6 +69,9 @@ class SliderHandler(WidgetHandler):
                 f"Value {value} is greater than max_value {self.max_value}."
             )
 
+    def declared_value(self) -> Any:
+        return tuple(self.value) if self.is_range else self.value
+
     def sync_query_params(self) -> None:
         """
         Parse the URL value and update bound_args with the parsed value.
@@ -125,6 +99,26 @@ class SliderHandler(WidgetHandler):
             self.check_bounds(parsed_value)
             self.bound_args.arguments["value"] = parsed_value
 
+    def apply_value(self, value: Any) -> None:
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if len(values) != (2 if self.is_range else 1):
+            expected = "a (start, end) range" if self.is_range else "a single value"
+            self.raise_url_error(f"Invalid value for slider: {value}. Expected {expected}.")
+        for v in values:
+            if type(v) is not self.value_type:
+                self.raise_url_error(
+                    f"Invalid value type for slider: {type(v)}. Expected {self.value_type}."
+                )
+            self.check_bounds(v)
+        if self.is_range:
+            if values[0] > values[1]:
+                self.raise_url_error(
+                    f"Start value {values[0]} is greater than end value {values[1]}."
+                )
+            self.bound_args.arguments["value"] = values
+        else:
+            self.bound_args.arguments["value"] = values[0]
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if isinstance(value, (list, tuple)):
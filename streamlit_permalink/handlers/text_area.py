@@ -13,6 +13,9 @@ class TextAreaHandler(WidgetHandler):
         super().__init__(*args, **kwargs)
         self.max_chars = self.bound_args.arguments.get("max_chars", None)
 
+    def declared_value(self) -> Any:
+        return self.bound_args.arguments.get("value", "")
+
     def sync_query_params(self) -> None:
 
         # Get the validated single URL value
@@ -33,6 +36,14 @@ class TextAreaHandler(WidgetHandler):
         # Update bound arguments with validated value
         self.bound_args.arguments["value"] = value
 
+    def apply_value(self, value: Any) -> None:
+        if value is not None and self.max_chars is not None and len(value) > self.max_chars:
+            self.raise_url_error(
+                f"Text exceeds maximum allowed characters: {len(value)} "
+                f"characters provided, but limit is {self.max_chars}"
+            )
+        self.bound_args.arguments["value"] = value
+
     @classmethod
     def verify_update_url_value(cls, value: Any) -> Any:
         if not isinstance(value, str):
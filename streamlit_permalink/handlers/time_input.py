@@ -2,13 +2,14 @@ from datetime import datetime, time
 from typing import Any
 
 from ..url_validators import validate_single_url_value
+from ..value_parsing import parse_value
 
-from .handler import WidgetHandler
+from .handler import UNKNOWN_DEFAULT, WidgetHandler
 
 
-def _parse_time_from_string(value: str) -> time:
-    """Convert string time to time object with only hours and minutes."""
-    return datetime.strptime(value, "%H:%M").time()
+def _parse_time_url_value(value: str) -> time:
+    """Convert a compact or HH:MM URL value to a time object."""
+    return parse_value(time, value)
 
 
 class TimeInputHandler(WidgetHandler):
@@ -16,6 +17,17 @@ class TimeInputHandler(WidgetHandler):
     Handler for time input widget URL state synchronization.
     """
 
+    supports_compact = True
+
+    def declared_value(self) -> Any:
+        value = self.bound_args.arguments.get("value", "now")
+        if isinstance(value, datetime):
+            return value.time()
+        if value is None or isinstance(value, time):
+            return value
+        # "now" changes between runs
+        return UNKNOWN_DEFAULT
+
     def sync_query_params(self) -> None:
         """
         Parse the URL value and update bound_args with the parsed value.
@@ -24,8 +36,8 @@ class TimeInputHandler(WidgetHandler):
         str_url_value = self.validate_single_url_value(self.url_value, allow_none=False)
 
         try:
-            # Parse time value from URL in HH:MM format only
-            parsed_value = _parse_time_from_string(str_url_value)
+            # Parse time value from URL in HH:MM or compact format
+            parsed_value = _parse_time_url_value(str_url_value)
         except Exception as err:
             self.raise_url_error(
                 f"Invalid time format for {self.handler_name} parameter '{self.url_key}': {str_url_value}. "
@@ -46,7 +58,7 @@ class TimeInputHandler(WidgetHandler):
 
         if isinstance(value, str):
             try:
-                return _parse_time_from_string(value)
+                return _parse_time_url_value(value)
             except ValueError as err:
                 raise ValueError(
                     f"Invalid time string format: {value}. Expected HH:MM."
@@ -0,0 +1,294 @@
+"""
+Opt-in per-widget metrics: timings, URL sizes and cache hits.
+
+With ``enable_instrumentation`` every permalinked widget records, by URL key:
+
+- decode: time spent decompressing its URL value
+- validate: time spent parsing and validating it (``sync_query_params``)
+- encode: time spent compressing its value for the URL (including state store writes)
+- render: time spent in the Streamlit widget itself
+- raw/URL bytes: size of the last value before and after compression
+- cache hits and misses of the decode cache, and reruns that replayed the last sync
+
+Metrics are shared by all sessions of the process. They can be read with
+``get_widget_metrics``, passed to callbacks as they are recorded, shown with
+``render_debug_panel``, logged with ``log_metrics`` or exported in the
+OpenMetrics text format with ``openmetrics_text``.
+
+When instrumentation is disabled (the default) widgets only check a flag.
+"""
+
+from functools import partial
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import streamlit as st
+
+TIMINGS = ("decode", "validate", "encode", "render")
+
+# callback(url_key, metric, value), e.g. ("table", "decode_seconds", 0.012)
+MetricsCallback = Callable[[str, str, float], None]
+
+_enabled = False
+_callbacks: List[MetricsCallback] = []
+_lock = threading.Lock()
+
+
+class WidgetMetrics:
+    """
+    Metrics of a single permalinked widget.
+
+    Attributes:
+        url_key: URL key of the widget
+        widget: Name of the widget function, e.g. "selectbox"
+        runs: Number of handler runs
+        sync_skips: Runs that replayed the last sync instead of parsing the URL value
+        cache_hits: Decode cache hits
+        cache_misses: Decode cache misses
+        seconds: Total seconds spent per timing ("decode", "validate", ...)
+        counts: Number of measurements per timing
+        raw_bytes: Size of the last URL value before compression
+        url_bytes: Size of the last URL value after compression
+    """
+
+    def __init__(self, url_key: str):
+        self.url_key = url_key
+        self.widget: Optional[str] = None
+        self.runs = 0
+        self.sync_skips = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.seconds = dict.fromkeys(TIMINGS, 0.0)
+        self.counts = dict.fromkeys(TIMINGS, 0)
+        self.raw_bytes = 0
+        self.url_bytes = 0
+
+    def mean_seconds(self, timing: str) -> float:
+        """
+        Mean seconds of a timing, 0 if never measured.
+        """
+        count = self.counts[timing]
+        return self.seconds[timing] / count if count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        row = {
+            "url_key": self.url_key,
+            "widget": self.widget,
+            "runs": self.runs,
+            "sync_skips": self.sync_skips,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "raw_bytes": self.raw_bytes,
+            "url_bytes": self.url_bytes,
+        }
+        for timing in TIMINGS:
+            row[f"{timing}_ms"] = round(self.mean_seconds(timing) * 1000, 3)
+        return row
+
+
+_metrics: Dict[str, WidgetMetrics] = {}
+
+
+def enable_instrumentation(callback: Optional[MetricsCallback] = None) -> None:
+    """
+    Start recording widget metrics, optionally passing each one to ``callback``.
+    """
+    global _enabled
+    if callback is not None:
+        add_metrics_callback(callback)
+    _enabled = True
+
+
+def disable_instrumentation() -> None:
+    """
+    Stop recording widget metrics. Recorded metrics are kept.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def add_metrics_callback(callback: MetricsCallback) -> None:
+    """
+    Call ``callback(url_key, metric, value)`` for every recorded metric.
+    """
+    with _lock:
+        _callbacks.append(callback)
+
+
+def remove_metrics_callback(callback: MetricsCallback) -> None:
+    with _lock:
+        _callbacks.remove(callback)
+
+
+def reset_metrics() -> None:
+    """
+    Forget all recorded metrics.
+    """
+    with _lock:
+        _metrics.clear()
+
+
+def get_widget_metrics() -> Dict[str, WidgetMetrics]:
+    """
+    Recorded metrics by URL key.
+    """
+    with _lock:
+        return dict(_metrics)
+
+
+def _update(url_key: str, metric: str, value: float, apply: Callable[[WidgetMetrics], None]) -> None:
+    with _lock:
+        metrics = _metrics.get(url_key)
+        if metrics is None:
+            metrics = _metrics[url_key] = WidgetMetrics(url_key)
+        apply(metrics)
+        callbacks = list(_callbacks)
+    for callback in callbacks:
+        callback(url_key, metric, value)
+
+
+def record_time(url_key: str, timing: str, seconds: float) -> None:
+    """
+    Record the duration of a timing ("decode", "validate", "encode" or "render").
+    """
+
+    def apply(metrics):
+        metrics.seconds[timing] += seconds
+        metrics.counts[timing] += 1
+
+    _update(url_key, f"{timing}_seconds", seconds, apply)
+
+
+def record_run(url_key: str, widget: str, sync_skipped: bool) -> None:
+    """
+    Record a handler run.
+    """
+
+    def apply(metrics):
+        metrics.widget = widget
+        metrics.runs += 1
+        metrics.sync_skips += sync_skipped
+
+    _update(url_key, "sync_skips" if sync_skipped else "runs", 1, apply)
+
+
+def record_cache(url_key: str, hit: bool) -> None:
+    """
+    Record a decode cache lookup.
+    """
+
+    def apply(metrics):
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+    _update(url_key, "cache_hits" if hit else "cache_misses", 1, apply)
+
+
+def _url_size(value: Union[None, str, List[str]]) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sum(_url_size(v) for v in value)
+
+
+def record_sizes(url_key: str, raw_value: Union[str, List[str]], url_value: Union[str, List[str]]) -> None:
+    """
+    Record the size of a URL value before and after compression.
+    """
+    raw_bytes = _url_size(raw_value)
+    url_bytes = _url_size(url_value)
+
+    def apply(metrics):
+        metrics.raw_bytes = raw_bytes
+        metrics.url_bytes = url_bytes
+
+    _update(url_key, "url_bytes", url_bytes, apply)
+
+
+def _timed_compressor(url_key: str, compressor: Callable, value: Any) -> Any:
+    start = time.perf_counter()
+    url_value = compressor(value)
+    record_time(url_key, "encode", time.perf_counter() - start)
+    record_sizes(url_key, value, url_value)
+    return url_value
+
+
+def instrument_compressor(url_key: str, compressor: Callable) -> Callable:
+    """
+    Wrap a widget's compressor to record its timing and the URL value sizes.
+    """
+    return partial(_timed_compressor, url_key, compressor)
+
+
+def log_metrics(logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+    """
+    Log one line with the metrics of each widget.
+    """
+    if logger is None:
+        logger = logging.getLogger("streamlit_permalink")
+    for metrics in get_widget_metrics().values():
+        logger.log(
+            level,
+            "%s",
+            " ".join(f"{k}={v}" for k, v in metrics.to_dict().items()),
+        )
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def openmetrics_text(prefix: str = "streamlit_permalink") -> str:
+    """
+    All metrics in the OpenMetrics text format, e.g. for a /metrics endpoint.
+    """
+    metrics = list(get_widget_metrics().values())
+    families = [
+        ("runs", "counter", "Handler runs", lambda m: m.runs),
+        ("sync_skips", "counter", "Runs that replayed the last sync", lambda m: m.sync_skips),
+        ("cache_hits", "counter", "Decode cache hits", lambda m: m.cache_hits),
+        ("cache_misses", "counter", "Decode cache misses", lambda m: m.cache_misses),
+        ("raw_bytes", "gauge", "Size of the last URL value before compression", lambda m: m.raw_bytes),
+        ("url_bytes", "gauge", "Size of the last URL value in the URL", lambda m: m.url_bytes),
+    ]
+    lines = []
+    for name, kind, help_text, value in families:
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.append(f"# HELP {prefix}_{name} {help_text}.")
+        suffix = "_total" if kind == "counter" else ""
+        for m in metrics:
+            lines.append(f'{prefix}_{name}{suffix}{{url_key="{_label(m.url_key)}"}} {value(m)}')
+
+    lines.append(f"# TYPE {prefix}_seconds summary")
+    lines.append(f"# HELP {prefix}_seconds Time spent per widget and step.")
+    for m in metrics:
+        for timing in TIMINGS:
+            labels = f'url_key="{_label(m.url_key)}",step="{timing}"'
+            lines.append(f"{prefix}_seconds_count{{{labels}}} {m.counts[timing]}")
+            lines.append(f"{prefix}_seconds_sum{{{labels}}} {m.seconds[timing]}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def render_debug_panel(label: str = "Permalink metrics", expanded: bool = False) -> None:
+    """
+    Show the recorded metrics in an expander, slowest widgets first.
+    """
+    rows = [m.to_dict() for m in get_widget_metrics().values()]
+    rows.sort(key=lambda row: -sum(row[f"{t}_ms"] for t in TIMINGS))
+    with st.expander(label, expanded=expanded):
+        if not _enabled:
+            st.caption("Instrumentation is disabled, call stp.enable_instrumentation() first.")
+        if rows:
+            st.table(rows)
+        else:
+            st.caption("No metrics recorded yet.")
@@ -0,0 +1,551 @@
+"""
+Reading and writing widget values in the URL query parameters.
+
+All widgets go through ``read_url_value`` and ``write_url_value``. By default
+every widget has its own query parameter. With ``enable_state_blob`` the
+values of all widgets on the page are stored in a single compressed,
+versioned parameter instead (e.g. ``?s=1.eJyr...``). Changes to the blob are
+collected and it is encoded and written once per script run, when the run
+ends, instead of once per widget.
+
+Inside ``batch_url_updates`` writes are buffered and sent to the browser in a
+single update when the outermost batch exits, instead of one URL update (and
+history entry) per widget. Writes of widget callbacks and form submissions are
+buffered with ``buffer_url_updates``. From the first widget of a script run on,
+all writes of the run are buffered as well (see ``buffer_run_url_updates``) and
+everything is sent in a single update when the run ends, including the initial
+values of all widgets on first load, however many widgets there are.
+
+Reads use a snapshot of all query params that is parsed once per script run
+and only parsed again after the URL changed, instead of one lookup per widget.
+
+With ``enable_chunked_values`` long values are split across numbered
+parameters (see chunking). Chunked values are reassembled on read whether
+chunking is enabled or not, so chunked links always load.
+
+With ``enable_elide_defaults`` widgets don't write their values on first
+load, and a value equal to the widget's default removes its parameter, so
+URLs only hold what the user changed.
+"""
+
+from contextlib import contextmanager
+from functools import partial
+import json
+import logging
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qs
+
+import streamlit as st
+from packaging.version import parse as V
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # Streamlit < 1.12
+
+    def get_script_run_ctx():
+        return None
+
+from .chunking import (
+    DEFAULT_CHUNK_SIZE,
+    chunk_key,
+    escape_url_values,
+    join_url_value,
+    parse_manifest,
+    split_url_value,
+    unescape_url_value,
+)
+from .compression import compress_with, decompress_any, get_compression_codec
+from .constants import (
+    BATCH_DEPTH_KEY,
+    CHUNK_SIZE_KEY,
+    DEFAULT_URL_VALUES_KEY,
+    ELIDE_DEFAULTS_KEY,
+    PENDING_STATE_BLOB_KEY,
+    PENDING_URL_VALUES_KEY,
+    QUERY_PARAMS_SNAPSHOT_KEY,
+    RUN_BUFFER_KEY,
+    STATE_BLOB_CACHE_KEY,
+    SCRIPT_RUN_KEY,
+    STATE_BLOB_KEY,
+)
+from .exceptions import UrlParamError
+
+STATE_BLOB_VERSION = "1"
+DEFAULT_STATE_BLOB_PARAM = "s"
+
+
+# query params Streamlit keeps out of st.query_params
+_EMBED_PARAMS = ("embed", "embed_options")
+
+# st.query_params replaced experimental_get/set_query_params in Streamlit 1.30
+_LEGACY_QUERY_PARAMS = V(st.__version__) < V("1.30")
+
+
+def _read_query_params(query_string: Optional[str] = None) -> Dict[str, List[str]]:
+    if _LEGACY_QUERY_PARAMS:
+        return st.experimental_get_query_params()
+    if query_string is None:
+        return {k: st.query_params.get_all(k) for k in st.query_params.keys()}
+    # st.query_params keeps the run's query string in sync with every change
+    params = parse_qs(query_string, keep_blank_values=True)
+    for key in _EMBED_PARAMS:
+        params.pop(key, None)
+    return params
+
+
+def _query_params_snapshot() -> Dict[str, List[str]]:
+    """
+    All query params of the current run, parsed once per query string.
+
+    The query string of the run context changes with every write, ours or
+    the app's own, so a stale snapshot is never returned.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return _read_query_params()
+
+    query_string = ctx.query_string
+    cached = st.session_state.get(QUERY_PARAMS_SNAPSHOT_KEY)
+    if cached is not None and cached[0] == query_string:
+        return cached[1]
+
+    params = _read_query_params(query_string)
+    st.session_state[QUERY_PARAMS_SNAPSHOT_KEY] = (query_string, params)
+    return params
+
+
+def get_query_params() -> Dict[str, List[str]]:
+    """
+    Get all query params, including writes that have not been sent yet.
+    """
+    params = {k: list(v) for k, v in _query_params_snapshot().items()}
+    pending = st.session_state.get(PENDING_URL_VALUES_KEY)
+    if pending:
+        for key, value in pending.items():
+            if value is None:
+                params.pop(key, None)
+            else:
+                params[key] = [value] if isinstance(value, str) else list(value)
+    return params
+
+
+def _get_raw_param(key: str) -> Optional[List[str]]:
+    pending = st.session_state.get(PENDING_URL_VALUES_KEY)
+    if pending and key in pending:
+        value = pending[key]
+        if value is None:
+            return None
+    else:
+        value = _query_params_snapshot().get(key)
+        if not value:
+            return None
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _get_param(key: str) -> Optional[List[str]]:
+    value = _get_raw_param(key)
+    if value is not None and parse_manifest(value[-1]) is not None:
+        try:
+            return [join_url_value(key, value[-1], _get_chunk)]
+        except ValueError as err:
+            raise UrlParamError(
+                message=f"Invalid chunked value: {err}", url_key=key, url_value=value[-1]
+            ) from err
+    if value is not None:
+        value = [unescape_url_value(v) for v in value]
+    return value
+
+
+def _get_chunk(key: str) -> Optional[str]:
+    value = _get_raw_param(key)
+    return value[-1] if value else None
+
+
+def _set_params(params: Dict[str, Union[None, str, List[str]]]) -> None:
+    """
+    Send params to the browser in a single update, None values are removed.
+    """
+    if not params:
+        return
+    if _LEGACY_QUERY_PARAMS:
+        url = dict(_query_params_snapshot())
+        url.update(params)
+        st.experimental_set_query_params(
+            **{k: v for k, v in url.items() if v is not None}
+        )
+    elif any(v is None for v in params.values()):
+        url = {k: v for k, v in _query_params_snapshot().items() if k not in params}
+        url.update({k: v for k, v in params.items() if v is not None})
+        st.query_params.from_dict(url)
+    else:
+        # a single browser URL update for all keys
+        st.query_params.update(params)
+    st.session_state.pop(QUERY_PARAMS_SNAPSHOT_KEY, None)
+
+
+def _is_buffering_run() -> bool:
+    ctx = get_script_run_ctx()
+    run = getattr(ctx, "widget_ids_this_run", None)
+    return run is not None and st.session_state.get(RUN_BUFFER_KEY) is run
+
+
+def _is_batching() -> bool:
+    return st.session_state.get(BATCH_DEPTH_KEY, 0) > 0 or _is_buffering_run()
+
+
+def _set_param(key: str, value: Union[None, str, List[str]]) -> None:
+    params = _split_param(key, value)
+    if _is_batching():
+        st.session_state.setdefault(PENDING_URL_VALUES_KEY, {}).update(params)
+    else:
+        _set_params(params)
+
+
+def _split_param(key: str, value: Union[None, str, List[str]]) -> Dict[str, Union[None, str, List[str]]]:
+    chunk_size = st.session_state.get(CHUNK_SIZE_KEY)
+    if chunk_size is not None and isinstance(value, str):
+        params = split_url_value(key, value, chunk_size)
+    else:
+        params = {key: escape_url_values(value)}
+
+    # remove the chunks of the previous value that aren't overwritten
+    previous = _get_raw_param(key)
+    manifest = parse_manifest(previous[-1]) if previous else None
+    if manifest is not None:
+        for index in range(manifest[0]):
+            params.setdefault(chunk_key(key, index), None)
+    return params
+
+
+def enable_chunked_values(chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """
+    Split URL values longer than ``chunk_size`` across numbered parameters.
+
+    Call this at the top of the page, before any widget. The parameter of a
+    long value holds the number of chunks and a checksum, the chunks are in
+    ``<url_key>.0``, ``<url_key>.1``, ...
+
+    Args:
+        chunk_size: Maximum length of a single query value
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"Invalid chunk size: {chunk_size}. Expected a positive number.")
+    st.session_state[CHUNK_SIZE_KEY] = chunk_size
+
+
+def disable_chunked_values() -> None:
+    """
+    Write long URL values into a single parameter again.
+    """
+    st.session_state.pop(CHUNK_SIZE_KEY, None)
+
+
+def enable_elide_defaults() -> None:
+    """
+    Leave widget values that equal the widget's default out of the URL.
+
+    Call this at the top of the page, before any widget. Widgets no longer
+    write their values on first load, and changing a value back to its
+    default removes its parameter. Missing parameters load the default from
+    the widget's arguments, as they always do. Widgets can opt out with
+    ``elide_defaults=False``.
+    """
+    st.session_state[ELIDE_DEFAULTS_KEY] = True
+
+
+def disable_elide_defaults() -> None:
+    """
+    Write the values of all widgets to the URL again, defaults included.
+    """
+    st.session_state.pop(ELIDE_DEFAULTS_KEY, None)
+
+
+def elide_defaults_enabled() -> bool:
+    return st.session_state.get(ELIDE_DEFAULTS_KEY, False)
+
+
+def set_default_url_value(url_key: str, url_value: Any) -> None:
+    """
+    Remember the URL value of a widget's default, before compression.
+    """
+    st.session_state.setdefault(DEFAULT_URL_VALUES_KEY, {})[url_key] = url_value
+
+
+def get_default_url_value(url_key: str) -> Any:
+    """
+    URL value of a widget's default, None if the widget doesn't elide its default.
+    """
+    return st.session_state.get(DEFAULT_URL_VALUES_KEY, {}).get(url_key)
+
+
+def clear_default_url_value(url_key: str) -> None:
+    defaults = st.session_state.get(DEFAULT_URL_VALUES_KEY)
+    if defaults:
+        defaults.pop(url_key, None)
+
+
+def flush_url_values() -> None:
+    """
+    Send all buffered URL writes to the browser in a single update.
+    """
+    params = st.session_state.pop(PENDING_URL_VALUES_KEY, None) or {}
+    state = st.session_state.pop(PENDING_STATE_BLOB_KEY, None)
+    config = _state_blob_config()
+    if state is not None and config is not None:
+        blob = encode_state_blob(state, config["compress"])
+        st.session_state[STATE_BLOB_CACHE_KEY] = (blob, state)
+        params.update(_split_param(config["param"], blob))
+    _set_params(params)
+
+
+def is_new_script_run() -> bool:
+    """
+    True on the first call of each script run, full or fragment run, False after.
+    """
+    ctx = get_script_run_ctx()
+    run = getattr(ctx, "widget_ids_this_run", None)
+    if run is None:
+        return True
+    # the run context gets a new set of widget ids for every run
+    if st.session_state.get(SCRIPT_RUN_KEY) is run:
+        return False
+    st.session_state[SCRIPT_RUN_KEY] = run
+    return True
+
+
+def is_fragment_run() -> bool:
+    """
+    True if the current script run only runs fragments.
+    """
+    ctx = get_script_run_ctx()
+    return bool(getattr(ctx, "fragment_ids_this_run", None))
+
+
+@contextmanager
+def batch_url_updates():
+    """
+    Buffer URL writes and send them in a single update at the end.
+
+    Batches can be nested, only the outermost one sends the update. Inside a
+    script run whose writes are buffered (see ``buffer_run_url_updates``) the
+    update is sent when the run ends. Wrap the widgets of a page to initialize
+    all of their URL values at once:
+
+        with stp.batch_url_updates():
+            stp.checkbox("A", url_key="a")
+            stp.slider("B", url_key="b")
+    """
+    depth = st.session_state.get(BATCH_DEPTH_KEY, 0)
+    st.session_state[BATCH_DEPTH_KEY] = depth + 1
+    try:
+        yield
+    finally:
+        st.session_state[BATCH_DEPTH_KEY] = depth
+        if depth == 0 and not _is_buffering_run():
+            flush_url_values()
+
+
+@contextmanager
+def buffer_url_updates():
+    """
+    Buffer URL writes like ``batch_url_updates``, but leave them to the next flush.
+
+    Used by widget callbacks, which run before the script: their writes are
+    sent together with the writes of the run (see ``url_updates.flush_run_url_updates``).
+    """
+    depth = st.session_state.get(BATCH_DEPTH_KEY, 0)
+    st.session_state[BATCH_DEPTH_KEY] = depth + 1
+    try:
+        yield
+    finally:
+        st.session_state[BATCH_DEPTH_KEY] = depth
+
+
+def _flush_at_end_of_run(on_script_finished, widget_ids_this_run) -> None:
+    try:
+        st.session_state.pop(RUN_BUFFER_KEY, None)
+        flush_url_values()
+    except Exception:
+        # the run is over, the error can't be shown in the app anymore
+        logging.getLogger("streamlit_permalink").exception("Failed to update the URL")
+    finally:
+        on_script_finished(widget_ids_this_run)
+
+
+def flush_url_values_at_end_of_run() -> bool:
+    """
+    Send the URL writes still buffered when the current script run ends, e.g. the state blob.
+
+    Streamlit has no hook for the end of a run, so the ``on_script_finished``
+    method of the session state, which the script runner calls once the script
+    completed, is wrapped once per session. Runs stopped early by ``st.rerun``
+    or ``st.stop`` don't call it, their writes are sent by the next run.
+
+    Returns:
+        False if there's no script run to hook into, buffered writes then wait for the next run
+    """
+    session_state = getattr(get_script_run_ctx(), "session_state", None)
+    on_script_finished = getattr(type(session_state), "on_script_finished", None)
+    if on_script_finished is None:
+        return False
+    hook = session_state.__dict__.get("on_script_finished")
+    if not (isinstance(hook, partial) and hook.func is _flush_at_end_of_run):
+        # instance attribute, SafeSessionState forwards setattr to the state
+        object.__setattr__(
+            session_state,
+            "on_script_finished",
+            partial(_flush_at_end_of_run, on_script_finished.__get__(session_state)),
+        )
+    return True
+
+
+def buffer_run_url_updates() -> bool:
+    """
+    Buffer all URL writes of the current script run and send them in a single update when it ends.
+
+    Returns:
+        False if the end of the run can't be hooked into, writes are then sent right away
+    """
+    ctx = get_script_run_ctx()
+    run = getattr(ctx, "widget_ids_this_run", None)
+    if run is None or not flush_url_values_at_end_of_run():
+        return False
+    # the run context gets a new set of widget ids for every run
+    st.session_state[RUN_BUFFER_KEY] = run
+    return True
+
+
+def enable_state_blob(
+    param: str = DEFAULT_STATE_BLOB_PARAM, compress: Union[bool, str] = True
+) -> None:
+    """
+    Store the values of all widgets in a single URL parameter.
+
+    Call this at the top of the page, before any widget. Compressing all
+    values together gives much shorter URLs than compressing each value on
+    its own, so widgets should not also pass ``compress``.
+
+    Args:
+        param: Name of the query parameter holding the blob
+        compress: Compression codec name, "auto", True for zlib or False for none
+    """
+    if isinstance(compress, str) and compress != "auto":
+        get_compression_codec(compress)
+    st.session_state[STATE_BLOB_KEY] = {"param": param, "compress": compress}
+
+
+def disable_state_blob() -> None:
+    """
+    Go back to one URL parameter per widget.
+    """
+    st.session_state.pop(STATE_BLOB_KEY, None)
+    st.session_state.pop(STATE_BLOB_CACHE_KEY, None)
+    st.session_state.pop(PENDING_STATE_BLOB_KEY, None)
+
+
+def _state_blob_config() -> Optional[Dict[str, Any]]:
+    return st.session_state.get(STATE_BLOB_KEY)
+
+
+def encode_state_blob(
+    state: Dict[str, Union[str, List[str]]], compress: Union[bool, str] = True
+) -> str:
+    """
+    Encode the URL values of all widgets into a single versioned string.
+    """
+    if compress is True:
+        codec = "zlib"
+    elif not compress:
+        codec = "none"
+    else:
+        codec = compress
+    text = json.dumps(state, separators=(",", ":"), ensure_ascii=False)
+    return f"{STATE_BLOB_VERSION}.{compress_with(text, codec)}"
+
+
+def decode_state_blob(blob: str) -> Dict[str, Union[str, List[str]]]:
+    """
+    Decode a string written by encode_state_blob.
+    """
+    # the payload of a chunked blob keeps its chunks
+    version, sep, payload = blob.partition(".")
+    if not sep or version != STATE_BLOB_VERSION:
+        raise ValueError(f"Unsupported state blob version: '{version}'")
+    state = json.loads(decompress_any(payload))
+    if not isinstance(state, dict):
+        raise ValueError("State blob must hold an object of URL values")
+    return state
+
+
+def _read_state_blob(param: str) -> Dict[str, Union[str, List[str]]]:
+    pending = st.session_state.get(PENDING_STATE_BLOB_KEY)
+    if pending is not None:
+        return pending
+
+    raw = _get_param(param)
+    if raw is None:
+        return {}
+
+    # decode the blob once per URL value, not once per widget
+    cached = st.session_state.get(STATE_BLOB_CACHE_KEY)
+    if cached is not None and cached[0] == raw[-1]:
+        return cached[1]
+
+    try:
+        state = decode_state_blob(raw[-1])
+    except Exception as err:
+        raise UrlParamError(
+            message=f"Invalid state blob: {err}",
+            url_key=param,
+            url_value=raw[-1],
+        ) from err
+
+    st.session_state[STATE_BLOB_CACHE_KEY] = (raw[-1], state)
+    return state
+
+
+def read_url_value(url_key: str) -> Optional[List[str]]:
+    """
+    Get the raw URL value(s) of a widget, None if not present.
+    """
+    config = _state_blob_config()
+    if config is not None:
+        state = _read_state_blob(config["param"])
+        if url_key in state:
+            value = state[url_key]
+            return [value] if isinstance(value, str) else list(value)
+        # links created without the blob keep working
+    return _get_param(url_key)
+
+
+def write_url_value(url_key: str, url_value: Union[str, List[str]]) -> None:
+    """
+    Set the raw URL value(s) of a widget.
+    """
+    config = _state_blob_config()
+    if config is None:
+        _set_param(url_key, url_value)
+        return
+
+    state = dict(_read_state_blob(config["param"]))
+    if state.get(url_key) == url_value:
+        return
+    state[url_key] = url_value
+    # encoded once, when the batch or the script run is flushed
+    st.session_state[PENDING_STATE_BLOB_KEY] = state
+
+
+def remove_url_value(url_key: str) -> None:
+    """
+    Remove the URL value(s) of a widget, if present.
+    """
+    config = _state_blob_config()
+    if config is not None:
+        state = _read_state_blob(config["param"])
+        if url_key in state:
+            state = {k: v for k, v in state.items() if k != url_key}
+            st.session_state[PENDING_STATE_BLOB_KEY] = state
+        # links created without the blob keep their own parameter
+
+    if _get_raw_param(url_key) is not None:
+        _set_param(url_key, None)
@@ -0,0 +1,352 @@
+"""
+Declarative permalink schemas.
+
+A ``PermalinkSchema`` declares the URL parameters of a page once: their
+types, options, bounds and codecs. Each ``Field`` is compiled into flat
+decode, encode and validate functions when the schema is created.
+
+.. code-block:: python
+
+    schema = stp.PermalinkSchema(
+        {
+            "country": stp.Field(options=["FR", "DE", "IT"]),
+            "range": stp.Field(int, min_value=0, max_value=100, is_range=True),
+            "tags": stp.Field(options=["a", "b"], multiple=True),
+            "notes": stp.Field(str, compress=True),
+        }
+    )
+    schema.activate()  # at the top of the page, on every run
+
+    values = schema.read_all()  # all typed values in one pass over the query params
+    stp.selectbox("Country", ["FR", "DE", "IT"], url_key="country")
+
+Widgets whose ``url_key`` is in the active schema take their codecs from the
+schema and apply the decoded value instead of parsing the URL value
+themselves. The value is still checked against the widget's own bounds and
+options. Decoded values are cached
+by raw URL value and field contract across reruns and sessions, so a rerun
+costs a dict lookup.
+
+A schema is also a ``PermalinkCodec``: it decodes and encodes URLs without a
+Streamlit script run, including ``decode_many`` for batches.
+"""
+
+import hashlib
+from datetime import date, datetime, time
+from functools import partial
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type, Union
+
+import streamlit as st
+
+from .codec import PermalinkCodec
+from .constants import PERMALINK_SCHEMA_KEY
+from .decode_cache import DECODE_CACHE, raw_values_key
+from .exceptions import UrlParamError
+from .query_params import read_url_value
+from .state_store import StateStore, get_state_store, wrap_with_store
+from .utils import (
+    _compress_list,
+    _decompress_list,
+    cached_decompress_text,
+    get_compressor,
+    get_option_index,
+    to_url_value,
+)
+from .value_parsing import parse_value
+
+FIELD_TYPES = (str, bool, int, float, date, datetime, time)
+
+_BOOL_VALUES = {"True": True, "False": False}
+
+
+def _identity(value: str) -> str:
+    return value
+
+
+def _copy_value(value: Any) -> Any:
+    # cached lists are shared by all sessions
+    return list(value) if isinstance(value, list) else value
+
+
+class Field:
+    """
+    Contract of one URL parameter.
+
+    Args:
+        value_type: Type of the values, one of ``FIELD_TYPES``. Ignored with ``options``
+        options: Allowed values, matched by their string form like widget options
+        min_value: Smallest allowed value
+        max_value: Largest allowed value
+        multiple: The value is a list of values, e.g. for multiselect
+        is_range: The value is a (start, end) tuple, e.g. for range sliders
+        nullable: None is a valid value
+        compress: Compression codec, like the widgets' ``compress``
+        compact: Compact typed values, like the widgets' ``compact``
+        store: State store, like the widgets' ``store``
+    """
+
+    def __init__(
+        self,
+        value_type: Type = str,
+        options: Optional[Iterable[Any]] = None,
+        min_value: Any = None,
+        max_value: Any = None,
+        multiple: bool = False,
+        is_range: bool = False,
+        nullable: bool = False,
+        compress: Union[bool, str] = False,
+        compact: bool = False,
+        store: Union[None, bool, StateStore] = None,
+    ) -> None:
+        if options is None and value_type not in FIELD_TYPES:
+            raise ValueError(
+                f"Unsupported field type: {value_type}. Expected one of: {FIELD_TYPES}"
+            )
+        if multiple and is_range:
+            raise ValueError("A field can't be both multiple and a range.")
+
+        self.value_type = value_type
+        self.options = None if options is None else list(options)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.multiple = multiple
+        self.is_range = is_range
+        self.nullable = nullable
+        self.compress = compress
+        self.compact = compact
+        self.store = store
+        self.url_key: Optional[str] = None
+
+        self._option_index = (
+            None if self.options is None else get_option_index(self.options, "field")
+        )
+        if self._option_index is not None:
+            self._parse = self._parse_option
+        elif value_type is str:
+            self._parse = _identity
+        elif value_type is bool:
+            self._parse = self._parse_bool
+        else:
+            self._parse = partial(parse_value, value_type)
+
+    def compile(self, url_key: str) -> "Field":
+        """
+        Bind the field to its URL key and build its compressor and decompressor.
+        """
+        self.url_key = url_key
+        compressor = get_compressor(self.compress) if self.compress else _identity
+        decompressor = (
+            partial(cached_decompress_text, url_key) if self.compress else _identity
+        )
+        store = None
+        if self.store:
+            store = get_state_store(self.store)
+            compressor, decompressor = wrap_with_store(store, compressor, decompressor)
+        self.compressor = partial(_compress_list, compressor)
+        self.decompressor = partial(_decompress_list, decompressor)
+        self._cache_kind = f"schema:{self._fingerprint(store)}"
+        return self
+
+    def _fingerprint(self, store: Optional[StateStore]) -> str:
+        # decoded values are cached per contract, fields of other schemas with
+        # the same URL key don't share them
+        contract = (
+            self.value_type.__module__,
+            self.value_type.__qualname__,
+            None
+            if self.options is None
+            else [(type(o).__qualname__, str(o)) for o in self.options],
+            repr(self.min_value),
+            repr(self.max_value),
+            self.multiple,
+            self.is_range,
+            self.nullable,
+            repr(self.compress),
+            self.compact,
+            None if store is None else (type(store).__qualname__, id(store)),
+        )
+        return hashlib.blake2b(repr(contract).encode("utf-8"), digest_size=8).hexdigest()
+
+    def __reduce__(self):
+        # compiled again by the schema, e.g. in worker processes
+        return (
+            Field,
+            (
+                self.value_type,
+                self.options,
+                self.min_value,
+                self.max_value,
+                self.multiple,
+                self.is_range,
+                self.nullable,
+                self.compress,
+                self.compact,
+                self.store,
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"Field({self.value_type.__name__}, url_key={self.url_key!r})"
+
+    def _error(self, message: str, url_value: Any = None) -> UrlParamError:
+        return UrlParamError(message=message, url_key=self.url_key, url_value=url_value)
+
+    def _parse_option(self, str_value: str) -> Any:
+        if str_value not in self._option_index:
+            raise ValueError(
+                f"Invalid value: '{str_value}'. Expected one of: {self._option_index.str_options}"
+            )
+        return self._option_index.values[str_value]
+
+    @staticmethod
+    def _parse_bool(str_value: str) -> bool:
+        if str_value not in _BOOL_VALUES:
+            raise ValueError(f"Invalid boolean value: '{str_value}'. Expected True or False.")
+        return _BOOL_VALUES[str_value]
+
+    def _check_bounds(self, value: Any) -> None:
+        if self.min_value is not None and value < self.min_value:
+            raise ValueError(f"Value {value} is less than min_value {self.min_value}.")
+        if self.max_value is not None and value > self.max_value:
+            raise ValueError(f"Value {value} is greater than max_value {self.max_value}.")
+
+    def _parse_one(self, str_value: str) -> Any:
+        value = self._parse(str_value)
+        self._check_bounds(value)
+        return value
+
+    def decode(self, url_value: List[str]) -> Any:
+        """
+        Typed value for the raw URL value(s).
+
+        Raises:
+            UrlParamError: If the URL value doesn't match the field
+        """
+        try:
+            str_values = self.decompressor(url_value)
+        except Exception as err:
+            raise self._error(f"Invalid compressed value: {err}", url_value) from err
+        if str_values is None:
+            if not self.nullable:
+                raise self._error("None is not allowed.", url_value)
+            return None
+
+        try:
+            if self.multiple:
+                return [self._parse_one(v) for v in str_values]
+            if self.is_range:
+                if len(str_values) != 2:
+                    raise ValueError(f"Expected 2 values, got {len(str_values)}.")
+                start, end = map(self._parse_one, str_values)
+                if start > end:
+                    raise ValueError(f"Start value {start} is greater than end value {end}.")
+                return (start, end)
+            if len(str_values) != 1:
+                raise ValueError(f"Expected a single value, got {len(str_values)}.")
+            return self._parse_one(str_values[0])
+        except ValueError as err:
+            raise self._error(str(err), str_values) from err
+
+    def read(self, url_value: List[str]) -> Any:
+        """
+        ``decode`` with results cached by raw URL value across reruns and sessions.
+        """
+        key = raw_values_key(self.url_key, url_value, self._cache_kind)
+        return DECODE_CACHE.get_or_decode(key, partial(self.decode, url_value), _copy_value)
+
+    def _validate_one(self, value: Any) -> None:
+        if self._option_index is not None:
+            if str(value) not in self._option_index:
+                raise ValueError(
+                    f"Invalid value: '{value}'. Expected one of: {self._option_index.str_options}"
+                )
+            return
+        if not isinstance(value, self.value_type) or (
+            self.value_type is int and isinstance(value, bool)
+        ):
+            if not (self.value_type is float and type(value) is int):
+                raise ValueError(
+                    f"Invalid value type: {type(value).__name__}. Expected {self.value_type.__name__}."
+                )
+        self._check_bounds(value)
+
+    def validate(self, value: Any) -> Any:
+        """
+        Check a value against the field before it's written to a URL.
+
+        Raises:
+            ValueError: If the value doesn't match the field
+        """
+        if value is None:
+            if not self.nullable:
+                raise ValueError(f"None is not allowed for '{self.url_key}'.")
+            return value
+        if self.multiple or self.is_range:
+            if not isinstance(value, (list, tuple)):
+                raise ValueError(f"Expected a list or tuple, got {type(value).__name__}.")
+            if self.is_range and len(value) != 2:
+                raise ValueError(f"Expected 2 values, got {len(value)}.")
+            for v in value:
+                self._validate_one(v)
+            return value
+        self._validate_one(value)
+        return value
+
+    def encode(self, value: Any) -> Union[str, List[str]]:
+        """
+        Raw URL value(s) of a validated value.
+        """
+        return self.compressor(to_url_value(self.validate(value), compact=self.compact))
+
+
+class PermalinkSchema(PermalinkCodec):
+    """
+    The URL parameters of a page, by URL key.
+
+    Args:
+        fields: Field of each URL key
+        state_blob: Query parameter of the state blob, if the page uses
+            ``enable_state_blob``. True for the default parameter
+    """
+
+    def __init__(
+        self, fields: Mapping[str, Field], state_blob: Union[None, bool, str] = None
+    ) -> None:
+        self.fields = {url_key: field.compile(url_key) for url_key, field in fields.items()}
+        super().__init__(self.fields.values(), state_blob)
+
+    def __reduce__(self):
+        return (PermalinkSchema, (self.fields, self.state_blob))
+
+    def activate(self) -> None:
+        """
+        Make widgets of the current session look up their URL contract in this schema.
+        """
+        st.session_state[PERMALINK_SCHEMA_KEY] = self
+
+    def deactivate(self) -> None:
+        if st.session_state.get(PERMALINK_SCHEMA_KEY) is self:
+            del st.session_state[PERMALINK_SCHEMA_KEY]
+
+    def read_all(self) -> Dict[str, Any]:
+        """
+        Typed values of all fields in the current URL, None for missing ones.
+
+        Raises:
+            UrlParamError: If a URL value doesn't match its field
+        """
+        values = {}
+        for url_key, field in self.fields.items():
+            url_value = read_url_value(url_key)
+            values[url_key] = None if url_value is None else field.read(url_value)
+        return values
+
+
+def get_schema_field(url_key: str) -> Optional[Field]:
+    """
+    Field of a URL key in the active schema of the session, None if there is none.
+    """
+    schema = st.session_state.get(PERMALINK_SCHEMA_KEY)
+    if schema is None:
+        return None
+    return schema.fields.get(url_key)
@@ -0,0 +1,332 @@
+"""
+Server-side storage of large URL values.
+
+With ``store=True`` (or a store instance) a widget keeps its URL value in a
+content-addressed store and the URL only carries a short token such as
+``~Yk3pQ0m1rT9aZxVe``. Values are stored under a hash of their content, so
+the same state always gets the same token and tokens never go stale.
+
+``~`` is not used by compressed values, and values no longer than a token
+are kept in the URL, with a leading ``~`` doubled so they are never read as
+a token.
+"""
+
+import base64
+from collections import OrderedDict
+from functools import partial
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple, Union
+
+TOKEN_PREFIX = "~"
+TOKEN_LENGTH = 16
+_TOKEN = re.compile(rf"^{re.escape(TOKEN_PREFIX)}[A-Za-z0-9_-]{{{TOKEN_LENGTH}}}$")
+
+# values up to the length of a token are kept in the URL
+INLINE_LENGTH = len(TOKEN_PREFIX) + TOKEN_LENGTH
+
+_LOCK_TYPE = type(threading.Lock())
+
+
+def make_token(value: str) -> str:
+    """
+    Content hash of a value, as used in the URL (without the prefix).
+    """
+    digest = hashlib.sha256(value.encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest).decode("utf-8")[:TOKEN_LENGTH]
+
+
+def is_token(url_value: str) -> bool:
+    """
+    Check if a URL value is a state store token.
+    """
+    return isinstance(url_value, str) and _TOKEN.match(url_value) is not None
+
+
+def escape_inline_value(url_value: str) -> str:
+    """
+    Escape a value kept in the URL that would otherwise be read as a token.
+    """
+    if url_value.startswith(TOKEN_PREFIX):
+        return f"{TOKEN_PREFIX}{url_value}"
+    return url_value
+
+
+def unescape_inline_value(url_value: str) -> str:
+    """
+    Undo ``escape_inline_value``.
+    """
+    if url_value.startswith(TOKEN_PREFIX * 2):
+        return url_value[len(TOKEN_PREFIX) :]
+    return url_value
+
+
+class StateStore:
+    """
+    Base class for content-addressed stores of URL values.
+
+    Subclasses implement ``get`` and ``put``. Loaded values are kept in a small
+    LRU cache, so popular links don't hit the backend on every visit.
+
+    Attributes:
+        cache_size: Number of loaded values to keep in memory
+    """
+
+    def __init__(self, cache_size: int = 128):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        # an empty store is still enabled, e.g. ``store=MemoryStore()``
+        return True
+
+    def __getstate__(self) -> dict:
+        # locks can't be pickled, every copy gets its own
+        return {k: v for k, v in self.__dict__.items() if not isinstance(v, _LOCK_TYPE)}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        """
+        Get the value stored under a token, None if unknown.
+        """
+        raise NotImplementedError(f"{type(self).__name__} must implement get.")
+
+    def put(self, token: str, value: str) -> None:
+        """
+        Store a value under its token.
+        """
+        raise NotImplementedError(f"{type(self).__name__} must implement put.")
+
+    def _remember(self, token: str, value: str) -> None:
+        with self._cache_lock:
+            self._cache[token] = value
+            self._cache.move_to_end(token)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _recall(self, token: str) -> Optional[str]:
+        with self._cache_lock:
+            value = self._cache.get(token)
+            if value is not None:
+                self._cache.move_to_end(token)
+            return value
+
+    def save(self, value: str) -> str:
+        """
+        Store a value and return its URL token.
+        """
+        token = make_token(value)
+        if self._recall(token) is None:
+            self.put(token, value)
+            self._remember(token, value)
+        return f"{TOKEN_PREFIX}{token}"
+
+    def load(self, url_value: str) -> str:
+        """
+        Get the value for a URL token.
+        """
+        token = url_value[len(TOKEN_PREFIX) :]
+        value = self._recall(token)
+        if value is None:
+            value = self.get(token)
+            if value is None:
+                raise ValueError(
+                    f"Unknown state token: '{url_value}'. The link may have expired."
+                )
+            self._remember(token, value)
+        return value
+
+
+class MemoryStore(StateStore):
+    """
+    In-memory LRU store. Tokens are lost when the server restarts.
+
+    Attributes:
+        max_items: Number of values to keep
+    """
+
+    def __init__(self, max_items: int = 1024):
+        super().__init__(cache_size=0)
+        self.max_items = max_items
+        self._values: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __setstate__(self, state: dict) -> None:
+        super().__setstate__(state)
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            value = self._values.get(token)
+            if value is not None:
+                self._values.move_to_end(token)
+            return value
+
+    def put(self, token: str, value: str) -> None:
+        with self._lock:
+            self._values[token] = value
+            self._values.move_to_end(token)
+            while len(self._values) > self.max_items:
+                self._values.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class SQLiteStore(StateStore):
+    """
+    Store backed by a local SQLite database file.
+
+    Attributes:
+        path: Path of the database file
+    """
+
+    def __init__(self, path: str, cache_size: int = 128):
+        super().__init__(cache_size=cache_size)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS permalink_state "
+                "(token TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        # copies open their own connection to the same file
+        state.pop("_connection", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        super().__setstate__(state)
+        self._lock = threading.Lock()
+        self._connect()
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM permalink_state WHERE token = ?", (token,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, token: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO permalink_state VALUES (?, ?, ?)",
+                (token, value, time.time()),
+            )
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._connection.close()
+
+
+class RedisStore(StateStore):
+    """
+    Store backed by a Redis-compatible client (``redis.Redis``, ``fakeredis``, ...).
+
+    Only the client's ``get`` and ``set`` methods are used.
+
+    Attributes:
+        client: The Redis client
+        prefix: Prefix of the keys
+        ttl: Seconds to keep values, None to keep them forever
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        prefix: str = "streamlit_permalink:",
+        ttl: Optional[int] = None,
+        cache_size: int = 128,
+    ):
+        super().__init__(cache_size=cache_size)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, token: str) -> Optional[str]:
+        value = self.client.get(f"{self.prefix}{token}")
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def put(self, token: str, value: str) -> None:
+        self.client.set(f"{self.prefix}{token}", value, ex=self.ttl)
+
+
+_default_store: Optional[StateStore] = None
+
+
+def set_default_store(store: Optional[StateStore]) -> None:
+    """
+    Set the store used by widgets with ``store=True``.
+    """
+    global _default_store
+    _default_store = store
+
+
+def get_state_store(store: Union[bool, StateStore]) -> StateStore:
+    """
+    Get the store for a widget's ``store`` argument.
+
+    ``True`` selects the default store, an in-memory one unless set with
+    set_default_store.
+    """
+    global _default_store
+    if isinstance(store, StateStore):
+        return store
+    if store is True:
+        if _default_store is None:
+            _default_store = MemoryStore()
+        return _default_store
+    raise ValueError(f"Invalid store: {store}. Expected True or a StateStore.")
+
+
+def _store_compress(store: StateStore, compressor: Callable[[str], str], text: str) -> str:
+    url_value = compressor(text)
+    if len(url_value) <= INLINE_LENGTH:
+        # a token wouldn't make the URL shorter
+        return escape_inline_value(url_value)
+    return store.save(url_value)
+
+
+def _store_decompress(
+    store: StateStore, decompressor: Callable[[str], str], url_value: str
+) -> str:
+    if is_token(url_value):
+        url_value = store.load(url_value)
+    else:
+        url_value = unescape_inline_value(url_value)
+    return decompressor(url_value)
+
+
+def wrap_with_store(
+    store: StateStore,
+    compressor: Callable[[str], str],
+    decompressor: Callable[[str], str],
+) -> Tuple[Callable[[str], str], Callable[[str], str]]:
+    """
+    Wrap a compressor/decompressor pair so values go through ``store``.
+
+    Values no longer than a token are kept in the URL. URL values that aren't
+    tokens (e.g. links created before the store was enabled) are passed to
+    ``decompressor`` once a doubled leading ``~`` is undone.
+    """
+    return (
+        partial(_store_compress, store, compressor),
+        partial(_store_decompress, store, decompressor),
+    )
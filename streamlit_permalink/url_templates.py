@@ -0,0 +1,168 @@
+"""
+Compiled URL templates for generating many permalinks.
+
+``create_url`` converts, encodes and joins every value on every call. A
+``UrlTemplate`` does the work that's the same for all links once: the base
+URL and its existing query parameters are split when the template is
+created, each key gets its own encoder (with compression if
+requested) and encoded values are cached per key, so repeated values such as
+categories are converted and compressed once.
+
+.. code-block:: python
+
+    template = url_template("https://app.example.com/report", ["country", "year"])
+    template.render({"country": "FR", "year": 2024})
+    # "https://app.example.com/report?country=FR&year=2024"
+    urls = list(template.render_many(df))
+"""
+
+from functools import lru_cache, partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Union,
+)
+from urllib.parse import quote_plus
+
+from .chunking import escape_url_value
+from .utils import _compress_list, _is_dataframe, get_compressor, to_url_value
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# distinct values cached per key
+ENCODER_CACHE_SIZE = 4096
+
+# DataFrame rows encoded column by column at a time
+FRAME_BLOCK_SIZE = 10_000
+
+Compress = Union[bool, str]
+
+
+def _identity(value: str) -> str:
+    return value
+
+
+def _encode_fragment(
+    prefix: str, compressor: Callable, compact: bool, value: Any
+) -> str:
+    url_value = compressor(to_url_value(value, compact=compact))
+    if isinstance(url_value, str):
+        return f"{prefix}{quote_plus(escape_url_value(url_value))}"
+    return "&".join(f"{prefix}{quote_plus(escape_url_value(str(v)))}" for v in url_value)
+
+
+class _KeyEncoder:
+    """
+    Encodes the values of one key into ``key=value`` query fragments.
+    """
+
+    def __init__(self, url_key: str, compress: Compress, compact: bool) -> None:
+        compressor = get_compressor(compress) if compress else _identity
+        self.encode = partial(
+            _encode_fragment,
+            f"{quote_plus(url_key)}=",
+            partial(_compress_list, compressor),
+            compact,
+        )
+        # typed, so that 1, 1.0 and True get their own entries
+        self.cached = lru_cache(maxsize=ENCODER_CACHE_SIZE, typed=True)(self.encode)
+
+    def __call__(self, value: Any) -> str:
+        try:
+            return self.cached(value)
+        except TypeError:
+            # unhashable values, e.g. lists
+            return self.encode(value)
+
+
+class UrlTemplate:
+    """
+    A base URL and the query parameters to fill in, see ``url_template``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        keys: Sequence[str],
+        compress: Union[Compress, Mapping[str, Compress]] = False,
+        compact: bool = False,
+    ) -> None:
+        base_url, _, existing_params = base_url.partition("?")
+        self.base_url = base_url
+        self.existing_params = existing_params
+        self._prefix = f"{base_url}?"
+        self._suffix = f"&{existing_params}" if existing_params else ""
+        self.keys = list(keys)
+        if not isinstance(compress, Mapping):
+            compress = dict.fromkeys(self.keys, compress)
+        self.encoders: Dict[str, _KeyEncoder] = {
+            key: _KeyEncoder(key, compress.get(key, False), compact) for key in self.keys
+        }
+
+    def _join(self, fragments: Iterable[str]) -> str:
+        query = "&".join(fragments)
+        if query:
+            return f"{self._prefix}{query}{self._suffix}"
+        if self.existing_params:
+            return f"{self._prefix}{self.existing_params}"
+        return self.base_url
+
+    def render(self, row: Mapping[str, Any]) -> str:
+        """
+        URL for the values of one row, keys missing from the row are left out.
+        """
+        return self._join(
+            encoder(row[key]) for key, encoder in self.encoders.items() if key in row
+        )
+
+    def render_many(
+        self, rows: Union["pd.DataFrame", Iterable[Mapping[str, Any]]]
+    ) -> Iterator[str]:
+        """
+        URLs for the rows of a DataFrame or an iterable of dicts, generated lazily.
+
+        DataFrames are encoded column by column in blocks of rows. Keys that
+        are not columns of the DataFrame are left out.
+        """
+        if not _is_dataframe(rows):
+            for row in rows:
+                yield self.render(row)
+            return
+
+        keys = [key for key in self.keys if key in rows.columns]
+        for start in range(0, len(rows), FRAME_BLOCK_SIZE):
+            block = rows.iloc[start : start + FRAME_BLOCK_SIZE]
+            columns: List[List[str]] = [
+                list(map(self.encoders[key], block[key].tolist())) for key in keys
+            ]
+            for fragments in zip(*columns) if columns else ((),) * len(block):
+                yield self._join(fragments)
+
+
+def url_template(
+    base_url: str,
+    keys: Iterable[str],
+    compress: Union[Compress, Mapping[str, Compress]] = False,
+    compact: bool = False,
+) -> UrlTemplate:
+    """
+    Compile a template for URLs with the given query parameters.
+
+    Values are written like ``create_url`` writes them, or like widgets with
+    ``compress`` and ``compact`` write them.
+
+    Args:
+        base_url: Base URL, existing query parameters are kept after the new ones
+        keys: Query parameters filled in by ``render`` and ``render_many``
+        compress: Compression codec for all keys (see the widgets' ``compress``), or by key
+        compact: Write numbers, dates and times with the compact typed encoding when shorter
+    """
+    return UrlTemplate(base_url, list(keys), compress, compact)
@@ -0,0 +1,158 @@
+"""
+Deferred URL updates.
+
+By default a widget writes its value to the URL in its ``on_change``
+callback, i.e. on every committed change. A widget's ``url_update`` policy
+can defer the write:
+
+- "immediate": write on every change (default)
+- "debounce": write once no change happened for ``debounce_seconds``
+- "on_submit": write when ``flush_deferred_url_updates`` is called, e.g. from a button
+
+Deferred updates are kept per URL key, so a later change replaces the
+pending one and rapid changes are encoded and written once. Due debounced
+updates are written by the first widget of any later run. With
+``st.fragment`` available, a single page-level timer also writes them after
+the quiet period without waiting for another interaction. Once no debounced
+update is left it reruns the app, which is the only way to stop a
+``run_every`` fragment, instead of polling until the next interaction.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import streamlit as st
+
+from .constants import DEFERRED_URL_UPDATES_KEY, FLUSH_TIMER_KEY
+from .query_params import (
+    batch_url_updates,
+    buffer_run_url_updates,
+    is_fragment_run,
+)
+
+URL_UPDATE_POLICIES = ("immediate", "debounce", "on_submit")
+
+# quiet period of debounced widgets
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+
+
+def validate_url_update(url_update: str, debounce_seconds: float) -> None:
+    if url_update not in URL_UPDATE_POLICIES:
+        raise ValueError(
+            f"Invalid url_update: {url_update}. Expected one of: {URL_UPDATE_POLICIES}"
+        )
+    if debounce_seconds <= 0:
+        raise ValueError(
+            f"Invalid debounce_seconds: {debounce_seconds}. Expected a positive number."
+        )
+
+
+def _pending() -> Dict[str, Tuple[Optional[float], Callable[[], None]]]:
+    return st.session_state.setdefault(DEFERRED_URL_UPDATES_KEY, {})
+
+
+def defer_url_update(
+    url_key: str, write: Callable[[], None], delay: Optional[float] = None
+) -> None:
+    """
+    Replace the pending URL update of a widget.
+
+    Args:
+        url_key: URL key of the widget
+        write: Writes the widget's value to the URL when the update is flushed
+        delay: Seconds until the update is due, None to wait for an explicit flush
+    """
+    deadline = None if delay is None else time.monotonic() + delay
+    _pending()[url_key] = (deadline, write)
+
+
+def pending_url_updates() -> List[str]:
+    """
+    URL keys of the widgets whose changes are not in the URL yet.
+    """
+    return list(st.session_state.get(DEFERRED_URL_UPDATES_KEY) or ())
+
+
+def _flush(url_keys: Iterable[str]) -> None:
+    pending = _pending()
+    writes = [pending.pop(url_key)[1] for url_key in url_keys]
+    if not writes:
+        return
+    # a single browser URL update for all of them
+    with batch_url_updates():
+        for write in writes:
+            write()
+
+
+def flush_due_url_updates() -> None:
+    """
+    Write the debounced updates whose quiet period is over.
+    """
+    pending = st.session_state.get(DEFERRED_URL_UPDATES_KEY)
+    if not pending:
+        return
+    now = time.monotonic()
+    _flush(
+        [
+            url_key
+            for url_key, (deadline, _) in pending.items()
+            if deadline is not None and deadline <= now
+        ]
+    )
+
+
+def flush_deferred_url_updates(url_keys: Optional[Iterable[str]] = None) -> None:
+    """
+    Write pending URL updates now, debounced or not, in a single URL update.
+
+    Can be used as a callback, e.g. ``st.button("Save link", on_click=stp.flush_deferred_url_updates)``.
+
+    Args:
+        url_keys: Widgets to write, all pending widgets by default
+    """
+    pending = st.session_state.get(DEFERRED_URL_UPDATES_KEY)
+    if not pending:
+        return
+    if url_keys is None:
+        url_keys = list(pending)
+    _flush([url_key for url_key in url_keys if url_key in pending])
+
+
+def flush_run_url_updates() -> None:
+    """
+    Write the URL values buffered by callbacks and the debounced updates that are due.
+
+    Widgets call this once per script run. From then on the writes of the run
+    are buffered as well, everything is sent in a single URL update when the
+    run ends.
+    """
+    if not is_fragment_run():
+        # full runs stop the timer of the previous run
+        st.session_state.pop(FLUSH_TIMER_KEY, None)
+    buffer_run_url_updates()
+    with batch_url_updates():
+        flush_due_url_updates()
+
+
+def _has_debounced_updates() -> bool:
+    pending = st.session_state.get(DEFERRED_URL_UPDATES_KEY) or {}
+    return any(deadline is not None for deadline, _ in pending.values())
+
+
+def _flush_timer() -> None:
+    flush_due_url_updates()
+    if not _has_debounced_updates() and st.session_state.get(FLUSH_TIMER_KEY):
+        # the timer keeps running until the next full run
+        st.rerun()
+
+
+def render_flush_timer(debounce_seconds: float) -> None:
+    """
+    Flush due updates every ``debounce_seconds`` in a fragment, if Streamlit has fragments.
+
+    A single timer runs per page, it is only rendered while no timer is running.
+    """
+    if not hasattr(st, "fragment") or st.session_state.get(FLUSH_TIMER_KEY):
+        return
+    st.session_state[FLUSH_TIMER_KEY] = True
+    st.fragment(_flush_timer, run_every=debounce_seconds)()
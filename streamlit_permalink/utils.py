@@ -2,20 +2,58 @@
 Utility functions for streamlit_permalink.
 """
 
-import base64
+from collections import OrderedDict
+import hashlib
+import json
+import operator
+import sys
+import threading
 from datetime import date, datetime, time
 from functools import partial
-from typing import Any, Callable, Iterable, List, Optional, Union
-import zlib
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional, Tuple, Union
 import warnings
 from packaging.version import parse as V
 
-import pandas as pd
 import streamlit as st
 
-from .constants import DATAEDITOR_DATE_VALUE_PREFIX, DATAEDITOR_DATETIME_VALUE_PREFIX, DATAEDITOR_TIME_VALUE_PREFIX, EMPTY_LIST_URL_VALUE, EMPTY_STRING_URL_VALUE, NONE_URL_VALUE
+from .chunking import escape_url_values, join_chunks, split_url_value
+from .compact_values import to_compact_url_value
+from .compression import compress_with, decompress_any, get_compression_codec
+from .constants import (
+    DUPLICATE_OPTIONS_WARNED_KEY,
+    EMPTY_LIST_URL_VALUE,
+    EMPTY_STRING_URL_VALUE,
+    NONE_URL_VALUE,
+)
+from . import instrumentation
+from .decode_cache import DECODE_CACHE, raw_value_key
+from .query_params import (
+    get_query_params as _get_query_params,
+    get_script_run_ctx,
+    write_url_value,
+)
 from urllib.parse import urlencode
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas is only imported by apps that use DataFrames (see __getattr__)
+_DATAFRAME_FUNCTIONS = ("encode_dataframe", "fix_datetime_columns", "serialize_df")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _DATAFRAME_FUNCTIONS:
+        from . import dataframe_codecs
+
+        return getattr(dataframe_codecs, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _is_dataframe(value: Any) -> bool:
+    # a value can't be a DataFrame if pandas was never imported
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(value, pd.DataFrame)
+
 
 class TypedValue:
     """
@@ -69,23 +107,15 @@ class StringHashableValue:
     def __repr__(self):
         return f"{self.value}"
 
-def serialize_df(df: pd.DataFrame) -> str:
-    result = df.copy(deep=True)
-    # Check all cells for date, datetime, and time types
-    for col in df.columns:
-        for idx in result.index:
-            value = result.at[idx, col]
-            if isinstance(value, date) and not isinstance(value, datetime):
-                result.at[idx, col] = f"{DATAEDITOR_DATE_VALUE_PREFIX}{value.isoformat()}"
-            elif isinstance(value, datetime):
-                result.at[idx, col] = f"{DATAEDITOR_DATETIME_VALUE_PREFIX}{value.isoformat()}"
-            elif isinstance(value, time):
-                result.at[idx, col] = f"{DATAEDITOR_TIME_VALUE_PREFIX}{value.strftime('%H:%M')}"
-    return result.to_json(orient="records")
-
-def to_url_value(result: Any) -> Union[str, List[str]]:
+def to_url_value(
+    result: Any, df_codec: Optional[str] = None, compact: bool = False
+) -> Union[str, List[str]]:
     """
     Convert a result to a URL value.
+
+    DataFrames are encoded with ``df_codec`` (see dataframe_codecs), JSON records by default.
+    With ``compact`` numbers, dates and times use the compact typed encoding
+    (see compact_values) when it's shorter.
     """
     if result is None:
         return NONE_URL_VALUE
@@ -93,18 +123,26 @@ def to_url_value(result: Any) -> Union[str, List[str]]:
         if result == "":
             return EMPTY_STRING_URL_VALUE
         return result
+    if compact:
+        compact_value = to_compact_url_value(result)
+        if compact_value is not None:
+            return compact_value
     if isinstance(result, (bool, float, int)):
         return str(result)
     if isinstance(result, (list, tuple)):
         if len(result) == 0:
             return EMPTY_LIST_URL_VALUE
+        if compact:
+            return [to_url_value(v, compact=True) for v in result]
         return list(map(to_url_value, result))
     if isinstance(result, (date, datetime)):
         return result.isoformat()
     if isinstance(result, time):
         return result.strftime("%H:%M")
-    if isinstance(result, pd.DataFrame):
-        return serialize_df(result)
+    if _is_dataframe(result):
+        from .dataframe_codecs import encode_dataframe
+
+        return encode_dataframe(result, df_codec)
     try:
         res = str(result)
         if res == "":
@@ -118,12 +156,7 @@ def init_url_value(url_key: str, url_value: str):
     """
     Initialize a URL value.
     """
-    if V(st.__version__) < V("1.30"):
-        url = st.experimental_get_query_params()
-        url[url_key] = url_value
-        st.experimental_set_query_params(**url)
-    else:
-        st.query_params[url_key] = url_value
+    write_url_value(url_key, url_value)
 
 
 def _validate_multi_options(options: Iterable[Any], widget_name: str) -> List[str]:
@@ -158,16 +191,149 @@ def _validate_multi_options(options: Iterable[Any], widget_name: str) -> List[st
             f"String options: {str_options}"
         )
 
-    # provide warning when sets are different lengths
-    if len(set(map(StringHashableValue, options))) != len(options):
-        warnings.warn(
-            f"Duplicate values detected in {widget_name} options: {options}. "
-            "When these values are passed through URL parameters, the first matching value will be selected. "
-            "This may lead to unexpected behavior if multiple options evaluate to the same string representation.",
-            UserWarning,
+    return str_options
+
+
+def _warn_duplicate_options(index: "OptionIndex", widget_name: str) -> None:
+    """
+    Warn about options with the same string, once per session and options.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        warned = st.session_state.setdefault(DUPLICATE_OPTIONS_WARNED_KEY, set())
+        key = (widget_name, tuple(index.str_options))
+        if key in warned:
+            return
+        warned.add(key)
+    # a fresh registry, Python shows a warning once per code location and process otherwise
+    frame = sys._getframe(2)
+    warnings.warn_explicit(
+        f"Duplicate values detected in {widget_name} options: {list(index._options)}. "
+        "When these values are passed through URL parameters, the first matching value will be selected. "
+        "This may lead to unexpected behavior if multiple options evaluate to the same string representation.",
+        UserWarning,
+        frame.f_code.co_filename,
+        frame.f_lineno,
+        module=frame.f_globals.get("__name__"),
+        registry={},
+    )
+
+
+class OptionIndex:
+    """
+    Validated options of a widget with lookups by their URL (string) value.
+
+    Attributes:
+        str_options: The options cast to strings, in order
+        values: Maps each string to its option (the last one for duplicates)
+        has_duplicates: Whether options have the same string
+    """
+
+    def __init__(self, options: Iterable[Any], widget_name: str):
+        self.str_options = _validate_multi_options(options, widget_name)
+        self._options = tuple(options)
+        self.values = dict(zip(self.str_options, self._options))
+        self.has_duplicates = len(set(map(StringHashableValue, self._options))) != len(
+            self._options
         )
+        self._positions = None
+
+    def __contains__(self, str_value: str) -> bool:
+        return str_value in self.values
+
+    def index(self, str_value: str) -> int:
+        """
+        Position of the first option equal to the option for ``str_value``, like ``list.index``.
+        """
+        value = self.values[str_value]
+        if self._positions is None:
+            positions = {}
+            try:
+                for i, option in enumerate(self._options):
+                    positions.setdefault(option, i)
+            except TypeError:
+                # unhashable options
+                positions = None
+            self._positions = positions if positions is not None else False
+        if self._positions is False:
+            return self._options.index(value)
+        return self._positions[value]
+
+
+# option indexes by options, shared by all sessions
+_OPTION_INDEXES: "OrderedDict[tuple, OptionIndex]" = OrderedDict()
+# the same indexes by the id of the options object, with the object
+_OPTION_INDEXES_BY_ID: "OrderedDict[int, Tuple[Any, OptionIndex]]" = OrderedDict()
+_OPTION_INDEXES_LOCK = threading.Lock()
+OPTION_INDEX_CACHE_SIZE = 64
+
+
+def _cache_option_index(cache: OrderedDict, key: Any, entry: Any) -> None:
+    cache[key] = entry
+    cache.move_to_end(key)
+    while len(cache) > OPTION_INDEX_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _same_items(options: Iterable[Any], index: OptionIndex) -> bool:
+    # options changed in place since they were indexed, without hashing them
+    items = index._options
+    return len(options) == len(items) and all(map(operator.is_, options, items))
+
+
+def _get_option_index(options: Iterable[Any], widget_name: str) -> OptionIndex:
+    try:
+        len(options)
+        sized = True
+    except TypeError:
+        sized = False
+    if sized:
+        # the same options object, e.g. a module-level list, is found without hashing it
+        with _OPTION_INDEXES_LOCK:
+            entry = _OPTION_INDEXES_BY_ID.get(id(options))
+        if entry is not None and entry[0] is options and _same_items(options, entry[1]):
+            with _OPTION_INDEXES_LOCK:
+                _OPTION_INDEXES_BY_ID.move_to_end(id(options))
+            return entry[1]
 
-    return str_options
+    try:
+        items = tuple(options)
+        key = (items, tuple(map(type, items)))
+        hash(key)
+    except TypeError:
+        return OptionIndex(options, widget_name)
+
+    with _OPTION_INDEXES_LOCK:
+        index = _OPTION_INDEXES.get(key)
+        if index is not None:
+            _OPTION_INDEXES.move_to_end(key)
+    if index is None:
+        index = OptionIndex(options, widget_name)
+    with _OPTION_INDEXES_LOCK:
+        _cache_option_index(_OPTION_INDEXES, key, index)
+        if sized:
+            # keeping the object alive keeps its id from being reused
+            _cache_option_index(_OPTION_INDEXES_BY_ID, id(options), (options, index))
+    return index
+
+
+def get_option_index(options: Iterable[Any], widget_name: str) -> OptionIndex:
+    """
+    Get the validated OptionIndex of a widget's options.
+
+    Indexes are cached by the options object, then by the options and their
+    types (so ``[1]`` and ``[True]`` don't share an index). A rerun with the
+    same options object finds its index by checking the options are still the
+    same objects, without hashing them, so options changed in place are
+    noticed. Equal options in a new object are hashed once. Options that
+    aren't hashable are indexed on every call.
+
+    Duplicate options are warned about once per session.
+    """
+    index = _get_option_index(options, widget_name)
+    if index.has_duplicates:
+        _warn_duplicate_options(index, widget_name)
+    return index
 
 
 def _validate_multi_default(
@@ -206,26 +372,32 @@ def _validate_selection_mode(selection_mode: str) -> str:
     return selection_mode
 
 
-def compress_text(text: str) -> str:
+def compress_text(
+    text: str,
+    codec: str = "zlib",
+    cpu_budget: Optional[float] = None,
+    dictionary: Union[None, bytes, str] = None,
+) -> str:
     """
-    Compress text using zlib and encode with base64 to make it URL-compatible.
+    Compress text and encode it with base64 to make it URL-compatible.
 
     Args:
         text: The text to compress
+        codec: Name of the compression codec (see compression.COMPRESSION_CODECS),
+            or "auto" to keep the smallest output of all available codecs
+        cpu_budget: Seconds "auto" may spend trying codecs, defaults to AUTO_CPU_BUDGET
+        dictionary: Preset zlib dictionary (bytes or a registered id), defaults to
+            the one set with compression.set_default_dictionary
 
     Returns:
-        URL-compatible compressed string
+        URL-compatible compressed string, tagged with its codec unless plain zlib
     """
-    compressed = zlib.compress(
-        text.encode("utf-8"), level=9
-    )  # Level 0-9, 9 is highest compression
-    encoded = base64.urlsafe_b64encode(compressed).decode("utf-8")
-    return encoded
+    return compress_with(text, codec, cpu_budget, dictionary)
 
 
 def decompress_text(compressed_text: str) -> str:
     """
-    Decompress text that was compressed with compress_text.
+    Decompress text that was compressed with compress_text, using any codec.
 
     Args:
         compressed_text: The compressed text
@@ -233,27 +405,136 @@ def decompress_text(compressed_text: str) -> str:
     Returns:
         Original decompressed text
     """
-    decoded = base64.urlsafe_b64decode(compressed_text)
-    decompressed = zlib.decompress(decoded).decode("utf-8")
-    return decompressed
+    return decompress_any(compressed_text)
 
 
-def update_data_editor(df: pd.DataFrame, df_updates: dict) -> pd.DataFrame:
+def cached_decompress_text(url_key: str, compressed_text: str) -> str:
+    """
+    decompress_text, with results cached in the shared decode cache.
+    """
+    key = raw_value_key(url_key, compressed_text, "decompress")
+    if instrumentation.is_enabled():
+        instrumentation.record_cache(url_key, key in DECODE_CACHE)
+    return DECODE_CACHE.get_or_decode(key, partial(decompress_text, compressed_text))
+
+
+def get_compressor(compress: Union[bool, str]) -> Callable[[str], str]:
+    """
+    Get the compressor for a widget's ``compress`` argument.
+
+    ``True`` selects the default zlib compression, a string selects a codec by name.
+    """
+    if isinstance(compress, str):
+        if compress != "auto":
+            get_compression_codec(compress)
+        return partial(compress_text, codec=compress)
+    return compress_text
+
+
+def update_data_editor(df: "pd.DataFrame", df_updates: dict) -> "pd.DataFrame":
     """
     Update a DataFrame based on the updates from the data editor.
+
+    The updates are applied to a copy, ``df`` is not modified. Edited cells are
+    set column by column, added rows are appended and deleted rows dropped in
+    a single step each.
     """
+    import numpy as np
+    import pandas as pd
+
+    df = df.copy()
 
+    # {column: {row: value}}
+    edited_columns = {}
     for row_index, row_data in df_updates["edited_rows"].items():
         for column_name, value in row_data.items():
-            df.at[int(row_index), column_name] = value
+            edited_columns.setdefault(column_name, {})[int(row_index)] = value
+
+    for column_name, values in edited_columns.items():
+        rows = list(values)
+        if column_name in df.columns and pd.Index(rows).isin(df.index).all():
+            new_values = list(values.values())
+            kind = df[column_name].dtype.kind
+            if kind in "iufcmM":
+                # cleared numeric and datetime cells become NaN/NaT, like with df.at
+                missing = pd.NaT if kind in "mM" else np.nan
+                new_values = [missing if v is None else v for v in new_values]
+            df.loc[rows, column_name] = pd.Series(new_values, index=rows)
+        else:
+            # new columns or rows aren't set column-wise
+            for row_index, value in values.items():
+                df.at[row_index, column_name] = value
+
+    if df_updates["added_rows"]:
+        df = pd.concat([df, pd.DataFrame(df_updates["added_rows"])], ignore_index=True)
+
+    if df_updates["deleted_rows"]:
+        df = df.drop(list(df_updates["deleted_rows"]))
 
-    for row_data in df_updates["added_rows"]:
-        df = pd.concat([df, pd.DataFrame([row_data])], ignore_index=True)
+    return df
 
-    for row_index in df_updates["deleted_rows"]:
-        df = df.drop(row_index)
 
-    return df
+def merge_data_editor_deltas(rows: int, first: dict, second: dict) -> dict:
+    """
+    Combine two data editor deltas into a single delta against the original data.
+
+    Args:
+        rows: Number of rows in the original data
+        first: Delta against the original data
+        second: Delta against the result of applying ``first``
+
+    Returns:
+        Delta with ``edited_rows``, ``added_rows`` and ``deleted_rows``
+    """
+    deleted = {int(i) for i in first["deleted_rows"]}
+    edited = {int(i): dict(changes) for i, changes in first["edited_rows"].items()}
+    added = [dict(row) for row in first["added_rows"]]
+
+    # positions in `second` refer to the kept original rows followed by the added rows
+    kept = [i for i in range(rows) if i not in deleted]
+
+    for position, changes in second["edited_rows"].items():
+        position = int(position)
+        if position < len(kept):
+            edited.setdefault(kept[position], {}).update(changes)
+        else:
+            added[position - len(kept)].update(changes)
+
+    removed = set()
+    for position in second["deleted_rows"]:
+        position = int(position)
+        if position < len(kept):
+            deleted.add(kept[position])
+            edited.pop(kept[position], None)
+        else:
+            removed.add(position - len(kept))
+
+    added = [row for i, row in enumerate(added) if i not in removed]
+    added.extend(dict(row) for row in second["added_rows"])
+
+    return {
+        "edited_rows": {i: edited[i] for i in sorted(edited)},
+        "added_rows": added,
+        "deleted_rows": sorted(deleted),
+    }
+
+
+def fingerprint_df(df: "pd.DataFrame") -> str:
+    """
+    Short content hash of a DataFrame, stable across sessions.
+    """
+    import pandas as pd
+
+    from .dataframe_codecs import serialize_df
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # unhashable cells (lists, dicts)
+        digest.update(serialize_df(df).encode("utf-8"))
+    return digest.hexdigest()[:16]
 
 
 def to_list(value: Any) -> List:
@@ -303,9 +584,12 @@ def requires_streamlit_version(min_version: str):
             # Function implementation
     """
 
+    # the installed version can't change while the app runs
+    supported = V(st.__version__) >= V(min_version)
+
     def decorator(func):
         def wrapper(*args, **kwargs):
-            if V(st.__version__) < V(min_version):
+            if not supported:
                 raise RuntimeError(
                     f"{func.__name__} requires Streamlit {min_version} or newer. "
                     f"Current version: {st.__version__}"
@@ -324,12 +608,7 @@ def get_query_params() -> dict[str, List]:
     Returns:
         dict: Dictionary of query parameters
     """
-
-    if st.__version__ < "1.30":
-        url_params = st.experimental_get_query_params()
-    else:
-        url_params = {k: st.query_params.get_all(k) for k in st.query_params.keys()}
-    return url_params
+    return _get_query_params()
 
 
 @requires_streamlit_version("1.45.0")
@@ -347,6 +626,7 @@ def get_page_url() -> str:
 def create_url(
     url: str,
     url_params: dict[str, Any] = None,
+    chunk_size: Optional[int] = None,
 ) -> str:
     """
     Create a URL with include teh given values as query parameters.
@@ -354,6 +634,7 @@ def create_url(
     Args:
         url (str): Base URL
         url_params (dict): Dictionary of query parameters
+        chunk_size (int): Split values longer than this across numbered parameters
 
     Returns:
         str: Complete URL with query parameters
@@ -362,6 +643,18 @@ def create_url(
         url_params = {}
 
     url_params = {k: to_url_value(v) for k, v in url_params.items()}
+    if chunk_size is None:
+        url_params = {k: escape_url_values(v) for k, v in url_params.items()}
+    else:
+        url_params = {
+            key: value
+            for url_key, url_value in url_params.items()
+            for key, value in (
+                split_url_value(url_key, url_value, chunk_size)
+                if isinstance(url_value, str)
+                else {url_key: escape_url_values(url_value)}
+            ).items()
+        }
 
     # Handle URL with existing query parameters
     if "?" in url:
@@ -391,6 +684,10 @@ def _compress_list(func: Callable, l: Union[List[str], str]):
     raise ValueError(f"Invalid list type: {type(l)}")
 
 
+def _decompress_joined(func: Callable[[str], str], url_value: str) -> str:
+    return func(join_chunks(url_value))
+
+
 def _decompress_list(func: Callable, l: List[str]):
 
     if l == [EMPTY_LIST_URL_VALUE]:
@@ -402,7 +699,8 @@ def _decompress_list(func: Callable, l: List[str]):
     if l == [EMPTY_STRING_URL_VALUE]:
         return [""]
 
-    l = [func(e) for e in l]
+    # values that weren't decompressed are joined here, if they were chunked
+    l = [join_chunks(func(e)) for e in l]
 
     return l
 
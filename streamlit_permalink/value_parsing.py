@@ -0,0 +1,121 @@
+"""
+Parsing of number, date and time URL values.
+
+``classify_value`` finds the type of a URL value from its shape in a single
+regex match: int (anything ``int()`` accepts, like ``" 42"`` or ``"1_000"``),
+ISO datetime (``YYYY-MM-DDTHH:MM:SS``), ISO date (``YYYY-MM-DD``) or time
+(``HH:MM``), and float for anything else. Values are
+then parsed by a function per type without ``strptime``. Compact values (see
+compact_values) are decoded from their type tag.
+"""
+
+from datetime import date, datetime, time
+import re
+from typing import Any, Callable, Dict, Optional, Type
+
+from .compact_values import decode_compact_value, is_compact_value
+
+VALID_TYPES = [int, float, datetime, date, time]
+
+# fields may have fewer digits, like strptime's %m, %d, %H, %M and %S
+_DATE = r"(\d{4})-(\d{1,2})-(\d{1,2})"
+_TIME = r"(\d{1,2}):(\d{1,2})"
+_DATETIME = r"(\d{4})-(\d{1,2})-(\d{1,2})T(\d{1,2}):(\d{1,2}):(\d{1,2})"
+
+# like int(): surrounding whitespace and single underscores between digits
+_INT = r"\s*[+-]?\d+(?:_\d+)*\s*"
+
+_DATE_RE = re.compile(_DATE)
+_TIME_RE = re.compile(_TIME)
+_DATETIME_RE = re.compile(_DATETIME)
+_SHAPE_RE = re.compile(
+    rf"(?P<int>{_INT})|(?P<datetime>{_DATETIME})|(?P<date>{_DATE})|(?P<time>{_TIME})"
+)
+_SHAPE_TYPES = {"int": int, "datetime": datetime, "date": date, "time": time}
+
+
+def classify_value(value: str) -> Type:
+    """
+    Type of a readable URL value by its shape: int, datetime, date, time or float.
+
+    Float is returned for any other shape and may still fail to parse.
+    """
+    match = _SHAPE_RE.fullmatch(value)
+    if match is None:
+        return float
+    return _SHAPE_TYPES[match.lastgroup]
+
+
+def _fields(pattern: re.Pattern, value: str, expected: str) -> map:
+    match = pattern.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Invalid value: {value}. Expected format: {expected}.")
+    return map(int, match.groups())
+
+
+def _parse_date(value: str) -> date:
+    return date(*_fields(_DATE_RE, value, "YYYY-MM-DD"))
+
+
+def _parse_time(value: str) -> time:
+    return time(*_fields(_TIME_RE, value, "HH:MM"))
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime(*_fields(_DATETIME_RE, value, "YYYY-MM-DDTHH:MM:SS"))
+
+
+_PARSERS: Dict[Type, Callable[[str], Any]] = {
+    int: int,
+    float: float,
+    datetime: _parse_datetime,
+    date: _parse_date,
+    time: _parse_time,
+}
+
+
+def parse_value(value_type: Type, value: str) -> Any:
+    """
+    Parse a readable or compact URL value of ``value_type``.
+
+    Raises:
+        ValueError: If the value can't be parsed as ``value_type``
+    """
+    if is_compact_value(value):
+        return decode_compact_value(value, value_type)
+    parser = _PARSERS.get(value_type)
+    if parser is None:
+        raise ValueError(
+            f"Unsupported value type: {value_type}. Expected one of: {VALID_TYPES}"
+        )
+    return parser(value)
+
+
+def blind_parse_value(value: str) -> Any:
+    """
+    Parse a URL value of unknown type: int, float, datetime, date or time.
+    """
+    if is_compact_value(value):
+        return decode_compact_value(value)
+    try:
+        return _PARSERS[classify_value(value)](value)
+    except ValueError as err:
+        raise ValueError(
+            f"Could not parse value: {value}. Expected one of: {VALID_TYPES}"
+        ) from err
+
+
+def parse_number(value: str, value_type: Optional[Type] = None) -> Any:
+    """
+    Parse an int or float URL value, either one if ``value_type`` is None.
+    """
+    if value_type in (int, float):
+        return parse_value(value_type, value)
+    if is_compact_value(value):
+        number = decode_compact_value(value)
+        if type(number) not in (int, float):
+            raise ValueError(f"Expected int or float value, got {type(number).__name__}.")
+        return number
+    if classify_value(value) is int:
+        return int(value)
+    return float(value)
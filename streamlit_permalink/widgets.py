@@ -2,28 +2,135 @@
 Widgets that are aware of URL parameters.
 """
 
-from typing import Callable, Any, Optional, TypeVar
+from typing import Callable, Any, Optional, TypeVar, Union
 from functools import partial
+from importlib.util import find_spec
 import inspect
 
-from packaging.version import parse as V
 import streamlit as st
 
 from .utils import (
     _compress_list,
+    _decompress_joined,
     _decompress_list,
-    compress_text,
+    cached_decompress_text,
     decompress_text,
+    get_compressor,
     to_url_value,
-    update_data_editor,
 )
+from . import instrumentation
 from .handlers import HANDLERS
-from .handlers.data_editor import fix_datetime_columns
+from .query_params import (
+    buffer_url_updates,
+    clear_default_url_value,
+    elide_defaults_enabled,
+    get_default_url_value,
+    is_new_script_run,
+    read_url_value,
+    remove_url_value,
+    write_url_value,
+)
+from .schema import get_schema_field
+from .state_store import get_state_store, wrap_with_store
+from .url_updates import (
+    DEFAULT_DEBOUNCE_SECONDS,
+    defer_url_update,
+    flush_run_url_updates,
+    pending_url_updates,
+    render_flush_timer,
+    validate_url_update,
+)
 
 _active_form = None
 
 T = TypeVar("T")
 
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+_KEYWORD = (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+
+
+class _WidgetBinder:
+    """Binds widget call arguments without going through inspect.Signature.bind_partial.
+
+    The signature is inspected once per widget. Calls the fast path can't
+    bind exactly like ``bind_partial`` (unknown keywords, too many or duplicate
+    arguments) fall back to it, so errors stay the same.
+
+    Parameters
+    ----------
+    base_widget : Callable
+        The Streamlit widget function
+    """
+
+    def __init__(self, base_widget: Callable) -> None:
+        self.signature = inspect.signature(base_widget)
+        parameters = self.signature.parameters.values()
+        self.positional = [p.name for p in parameters if p.kind in _POSITIONAL]
+        self.keywords = frozenset(p.name for p in parameters if p.kind in _KEYWORD)
+
+    def bind_partial(self, args: tuple, kwargs: dict) -> inspect.BoundArguments:
+        """Bind ``args`` and ``kwargs`` like ``signature.bind_partial(*args, **kwargs)``."""
+        if len(args) > len(self.positional) or not self.keywords.issuperset(kwargs):
+            return self.signature.bind_partial(*args, **kwargs)
+
+        arguments = dict(zip(self.positional, args))
+        if len(args) and not arguments.keys().isdisjoint(kwargs):
+            return self.signature.bind_partial(*args, **kwargs)
+        arguments.update(kwargs)
+        return inspect.BoundArguments(self.signature, arguments)
+
+
+# one binder per widget function, shared by bound methods of all containers and forms
+_BINDERS = {}
+
+
+def _get_binder(base_widget: Callable) -> _WidgetBinder:
+    function = getattr(base_widget, "__func__", base_widget)
+    binder = _BINDERS.get(function)
+    if binder is None:
+        binder = _BINDERS[function] = _WidgetBinder(base_widget)
+    return binder
+
+
+def _write_widget_value(
+    url_key: str, value: Any, compressor: Callable, compact: bool = False
+) -> None:
+    """
+    Write a widget value to the URL, or remove its parameter if it's the widget's elided default.
+    """
+    url_value = to_url_value(value, compact=compact)
+    default_url_value = get_default_url_value(url_key)
+    if default_url_value is not None and url_value == default_url_value:
+        remove_url_value(url_key)
+    else:
+        write_url_value(url_key, compressor(url_value))
+
+
+def _write_data_editor_value(url_key: str, compressor: Callable) -> None:
+    """
+    Write a data editor's table to the URL, or remove its parameter if it holds the declared data.
+    """
+    from .handlers.data_editor import data_editor_is_default, data_editor_url_value
+
+    if data_editor_is_default(url_key):
+        remove_url_value(url_key)
+    else:
+        write_url_value(url_key, compressor(data_editor_url_value(url_key)))
+
+
+def _update_url(
+    url_key: str, write: Callable[[], None], url_update: str, debounce_seconds: float
+) -> None:
+    """
+    Write a widget's URL value now or defer it, depending on its ``url_update`` policy.
+    """
+    if url_update == "immediate":
+        write()
+    elif url_update == "debounce":
+        defer_url_update(url_key, write, debounce_seconds)
+    else:
+        defer_url_update(url_key, write)
+
 
 class UrlAwareWidget:
     """A wrapper class that adds URL parameter awareness to Streamlit widgets.
@@ -96,8 +203,10 @@ class UrlAwareWidget:
             
             - url_key : str, optional
                 The key to use in URL parameters, defaults to widget key or label
-            - compress : bool, optional
-                Whether to compress the widget value, by default False
+            - compress : bool or str, optional
+                Whether to compress the widget value, by default False. A string
+                selects a compression codec by name ("lzma", "deflate", ...) or
+                "auto" to use the smallest output of all available codecs
             - compressor : Callable, optional
                 Custom compression function, by default compress_text
             - decompressor : Callable, optional
@@ -106,6 +215,29 @@ class UrlAwareWidget:
                 Whether to track the widget state in URL, by default True
             - init_url : bool, optional
                 Whether to initialize URL parameters on first load, by default True
+            - store : bool or StateStore, optional
+                Keep the value in a server-side store and only put a short token
+                in the URL, by default None. True uses the default store
+            - url_delta : bool, optional
+                data_editor only: store the edits against ``data`` in the URL
+                instead of the full table, by default False
+            - df_codec : str, optional
+                data_editor only: DataFrame codec for the URL value ("json",
+                "columnar" or "arrow"), by default "json"
+            - compact : bool, optional
+                slider, number_input, date_input and time_input only: write
+                numbers, dates and times with the compact typed encoding when
+                it's shorter, by default False
+            - elide_defaults : bool, optional
+                Leave the widget's default value out of the URL, by default
+                the mode set with ``stp.enable_elide_defaults()``
+            - url_update : str, optional
+                When changes are written to the URL: "immediate" on every
+                change, "debounce" once no change happened for
+                ``debounce_seconds``, or "on_submit" when
+                ``stp.flush_deferred_url_updates()`` is called, by default "immediate"
+            - debounce_seconds : float, optional
+                Quiet period of ``url_update="debounce"``, by default 0.5
 
         Returns
         -------
@@ -115,21 +247,46 @@ class UrlAwareWidget:
 
         url_key = kwargs.pop("url_key", None)
         compress = kwargs.pop("compress", False)
-        compressor = kwargs.pop("compressor", compress_text)
+        compressor = kwargs.pop("compressor", None)
         decompressor = kwargs.pop("decompressor", decompress_text)
         stateful = kwargs.pop("stateful", True)
         init_url = kwargs.pop("init_url", True)
+        store = kwargs.pop("store", None)
+        compact = kwargs.pop("compact", False)
+        elide_defaults = kwargs.pop("elide_defaults", None)
+        url_update = kwargs.pop("url_update", "immediate")
+        debounce_seconds = kwargs.pop("debounce_seconds", DEFAULT_DEBOUNCE_SECONDS)
+        validate_url_update(url_update, debounce_seconds)
+
+        handler_kwargs = {}
+        if self.base_widget.__name__ == "data_editor":
+            handler_kwargs["url_delta"] = kwargs.pop("url_delta", False)
+            handler_kwargs["df_codec"] = kwargs.pop("df_codec", None)
+        if compact:
+            if not HANDLERS[self.base_widget.__name__].supports_compact:
+                raise ValueError(
+                    f"compact is not supported by {self.base_widget.__name__}. "
+                    "Expected slider, number_input, date_input or time_input."
+                )
+            handler_kwargs["compact"] = True
+        if elide_defaults is None:
+            elide_defaults = elide_defaults_enabled()
+        if elide_defaults:
+            handler_kwargs["elide_defaults"] = True
 
         if stateful is False:
             return self.base_widget(*args, **kwargs)
 
+        if is_new_script_run():
+            # once per run: writes of the callbacks, state blob changes left by a
+            # run stopped early and debounced changes whose quiet period is over
+            flush_run_url_updates()
+
         if not compress:
             compressor = lambda x: x
             decompressor = lambda x: x
-
-        # partial partial run_with_each_element for compressor and decompressor
-        compressor = partial(_compress_list, compressor)
-        decompressor = partial(_decompress_list, decompressor)
+        elif compressor is None:
+            compressor = get_compressor(compress)
 
         # add compressor and decompressor to session state
         if st.session_state.get("compress_map") is None:
@@ -141,8 +298,10 @@ class UrlAwareWidget:
         if st.session_state.get("data_editor_keys") is None:
             st.session_state["data_editor_keys"] = []
 
-        signature = inspect.signature(self.base_widget)
-        bound_args = signature.bind_partial(*args, **kwargs)
+        if st.session_state.get("compact_keys") is None:
+            st.session_state["compact_keys"] = set()
+
+        bound_args = _get_binder(self.base_widget).bind_partial(args, kwargs)
 
         key = bound_args.arguments.get("key", None)
 
@@ -155,15 +314,67 @@ class UrlAwareWidget:
             else:
                 raise ValueError("url_key or key is required")
 
+        if decompressor is decompress_text:
+            # decoded values are cached across reruns and sessions
+            decompressor = partial(cached_decompress_text, url_key)
+        elif compress:
+            # custom decompressors get chunked values as a single string
+            decompressor = partial(_decompress_joined, decompressor)
+
+        if compress and self.base_widget.__name__ == "data_editor":
+            from .dataframe_codecs import skip_compressed_dataframe
+
+            # columnar and arrow values are compressed already, links compressed twice still load
+            compressor = partial(skip_compressed_dataframe, compressor)
+            decompressor = partial(skip_compressed_dataframe, decompressor)
+
+        if store:
+            compressor, decompressor = wrap_with_store(
+                get_state_store(store), compressor, decompressor
+            )
+
+        # partial partial run_with_each_element for compressor and decompressor
+        compressor = partial(_compress_list, compressor)
+        decompressor = partial(_decompress_list, decompressor)
+
+        # the active schema's field replaces the codecs given to the widget
+        field = get_schema_field(url_key)
+        if field is not None:
+            if self.base_widget.__name__ == "data_editor":
+                raise ValueError("data_editor can't be declared in a PermalinkSchema.")
+            handler = HANDLERS[self.base_widget.__name__]
+            if field.compact and not handler.supports_compact:
+                raise ValueError(f"compact is not supported by {self.base_widget.__name__}.")
+            compressor = field.compressor
+            decompressor = field.decompressor
+            compact = field.compact
+            handler_kwargs["compact"] = compact
+            handler_kwargs["field"] = field
+
+        if instrumentation.is_enabled():
+            compressor = instrumentation.instrument_compressor(url_key, compressor)
+
         st.session_state["compress_map"][url_key] = compressor
         st.session_state["decompress_map"][url_key] = decompressor
 
         if self.base_widget.__name__ == "data_editor":
             st.session_state["data_editor_keys"].append(url_key)
 
+        if compact:
+            st.session_state["compact_keys"].add(url_key)
+        else:
+            st.session_state["compact_keys"].discard(url_key)
+
+        if not elide_defaults:
+            clear_default_url_value(url_key)
+
         bound_args.arguments["key"] = url_key
 
         if _active_form is not None or self.form is not None:
+            if url_update != "immediate":
+                raise ValueError(
+                    "url_update is not supported inside forms, submitting the form writes the URL."
+                )
             return self.call_inside_form(
                 self.form or _active_form,
                 url_key,
@@ -171,11 +382,9 @@ class UrlAwareWidget:
                 compressor=compressor,
                 decompressor=decompressor,
                 init_url=init_url,
+                **handler_kwargs,
             )
 
-        if V(st.__version__) < V("1.30"):
-            url = st.experimental_get_query_params()
-
         # if user provides on_change and its not None, we need to update the url when the widget changes
         user_supplied_change_handler = None
         if (
@@ -194,15 +403,17 @@ class UrlAwareWidget:
             **kwargs : dict
                 Keyword arguments passed to the on_change handler
             """
-            if V(st.__version__) < V("1.30"):
-                url[url_key] = compressor(
-                    to_url_value(getattr(st.session_state, bound_args.arguments["key"]))
-                )
-                st.experimental_set_query_params(**url)
-            else:
-                st.query_params[url_key] = compressor(
-                    to_url_value(getattr(st.session_state, bound_args.arguments["key"]))
-                )
+            # the value is encoded when the update is written, once for rapid changes
+            write = partial(
+                _write_widget_value,
+                url_key,
+                getattr(st.session_state, bound_args.arguments["key"]),
+                compressor,
+                compact,
+            )
+            # sent with the other changes of the rerun when it ends
+            with buffer_url_updates():
+                _update_url(url_key, write, url_update, debounce_seconds)
 
             if user_supplied_change_handler is not None:
                 user_supplied_change_handler(*args, **kwargs)
@@ -217,22 +428,9 @@ class UrlAwareWidget:
             **kwargs : dict
                 Keyword arguments passed to the on_change handler
             """
-            original_df = getattr(
-                st.session_state,
-                f'STREAMLIT_PERMALINK_DATA_EDITOR_{bound_args.arguments["key"]}',
-            )
-            df_updates = getattr(
-                st.session_state, bound_args.arguments["key"]
-            )  # example = {'edited_rows': {}, 'added_rows': [{}, {'col1': 3}], 'deleted_rows': [1, 2]}
-
-            updated_df = update_data_editor(original_df, df_updates)
-            updated_df = fix_datetime_columns(updated_df)
-
-            if V(st.__version__) < V("1.30"):
-                url[url_key] = compressor(to_url_value(updated_df))
-                st.experimental_set_query_params(**url)
-            else:
-                st.query_params[url_key] = compressor(to_url_value(updated_df))
+            write = partial(_write_data_editor_value, bound_args.arguments["key"], compressor)
+            with buffer_url_updates():
+                _update_url(url_key, write, url_update, debounce_seconds)
 
             if user_supplied_change_handler is not None:
                 user_supplied_change_handler(*args, **kwargs)
@@ -242,10 +440,7 @@ class UrlAwareWidget:
         else:
             bound_args.arguments["on_change"] = on_change
 
-        if V(st.__version__) < V("1.30"):
-            url_value = url.get(url_key, None)
-        else:
-            url_value = st.query_params.get_all(url_key) or None
+        url_value = read_url_value(url_key)
 
         handler = HANDLERS[self.base_widget.__name__]
         result = handler(
@@ -256,7 +451,11 @@ class UrlAwareWidget:
             compressor=compressor,
             decompressor=decompressor,
             init_url=init_url,
+            **handler_kwargs,
         ).run()
+
+        if url_update == "debounce" and url_key in pending_url_updates():
+            render_flush_timer(debounce_seconds)
         return result
 
     def call_inside_form(
@@ -267,6 +466,7 @@ class UrlAwareWidget:
         compressor: Callable,
         decompressor: Callable,
         init_url: bool = True,
+        **handler_kwargs,
     ) -> Any:
         """Call the widget inside a form.
 
@@ -284,6 +484,8 @@ class UrlAwareWidget:
             The decompressor function
         init_url : bool, optional
             Whether to initialize URL parameters on first load, by default True
+        **handler_kwargs
+            Widget specific options passed to the handler
 
         Returns
         -------
@@ -292,11 +494,7 @@ class UrlAwareWidget:
         """
         _form.field_mapping[url_key] = bound_args.arguments["key"]
 
-        if V(st.__version__) < V("1.30"):
-            url = st.experimental_get_query_params()
-            url_value = url.get(url_key, None)
-        else:
-            url_value = st.query_params.get_all(url_key) or None
+        url_value = read_url_value(url_key)
 
         handler = HANDLERS[self.base_widget.__name__]
         result = handler(
@@ -307,10 +505,16 @@ class UrlAwareWidget:
             compressor=compressor,
             decompressor=decompressor,
             init_url=init_url,
+            **handler_kwargs,
         ).run()
         return result
     
-    def get_url_value(self, url_key: str, decompressor: Optional[Callable] = None, compress: bool = False) -> Any:
+    def get_url_value(
+        self,
+        url_key: str,
+        decompressor: Optional[Callable] = None,
+        compress: Union[bool, str] = False,
+    ) -> Any:
         """Get the URL parameter value for a widget.
 
         Parameters
@@ -319,8 +523,9 @@ class UrlAwareWidget:
             The URL key for the widget
         decompressor : Optional[Callable], optional
             Custom decompression function, by default None
-        compress : bool, optional
-            Whether the value is compressed, by default False
+        compress : bool or str, optional
+            Whether the value is compressed, by default False. Any codec is
+            detected from the value itself
 
         Returns
         -------
@@ -332,7 +537,14 @@ class UrlAwareWidget:
             url_key, decompressor, compress
         )
 
-    def set_url_value(self, url_key: str, value: Any, compressor: Optional[Callable] = None, compress: bool = False) -> None:
+    def set_url_value(
+        self,
+        url_key: str,
+        value: Any,
+        compressor: Optional[Callable] = None,
+        compress: Union[bool, str] = False,
+        compact: bool = False,
+    ) -> None:
         """Set the URL parameter value for a widget.
 
         Parameters
@@ -343,12 +555,15 @@ class UrlAwareWidget:
             The value to set
         compressor : Optional[Callable], optional
             Custom compression function, by default None
-        compress : bool, optional
-            Whether to compress the value, by default False
+        compress : bool or str, optional
+            Whether to compress the value, by default False. A string selects
+            a compression codec by name, or "auto"
+        compact : bool, optional
+            Whether to write the value with the compact typed encoding, by default False
         """
         handler = HANDLERS[self.base_widget.__name__]
         return handler.update_url(
-            value, url_key, compressor, compress
+            value, url_key, compressor, compress, compact
         )
     
             
@@ -423,44 +638,25 @@ class UrlAwareFormSubmitButton:
             The result of the submit button call
         """
 
-        if V(st.__version__) < V("1.30"):
-            url = st.experimental_get_query_params()
         user_supplied_click_handler = kwargs.get("on_click", lambda: None)
 
         def on_click(*args, **kwargs):
 
-            for url_key, key in _form.field_mapping.items():
-                raw_value = getattr(st.session_state, key)
-
-                compressor, _ = (
-                    st.session_state["compress_map"][url_key],
-                    st.session_state["decompress_map"][url_key],
-                )
-
-                if url_key in st.session_state["data_editor_keys"]:
+            # all fields of the form are written in a single URL update
+            with buffer_url_updates():
+                for url_key, key in _form.field_mapping.items():
+                    raw_value = getattr(st.session_state, key)
 
-                    original_df = getattr(
-                        st.session_state, f"STREAMLIT_PERMALINK_DATA_EDITOR_{url_key}"
-                    )
-                    column_config = getattr(
-                        st.session_state,
-                        f"STREAMLIT_PERMALINK_DATA_EDITOR_COLUMN_CONFIG_{url_key}",
+                    compressor, _ = (
+                        st.session_state["compress_map"][url_key],
+                        st.session_state["decompress_map"][url_key],
                     )
-                    df_updates = getattr(
-                        st.session_state, url_key
-                    )  # example = {'edited_rows': {}, 'added_rows': [{}, {'col1': 3}], 'deleted_rows': [1, 2]}
-
-                    updated_df = update_data_editor(original_df, df_updates)
-                    raw_value = fix_datetime_columns(updated_df)
-
-                if raw_value is not None:
-                    if V(st.__version__) < V("1.30"):
-                        url[url_key] = compressor(to_url_value(raw_value))
-                    else:
-                        st.query_params[url_key] = compressor(to_url_value(raw_value))
 
-            if V(st.__version__) < V("1.30"):
-                st.experimental_set_query_params(**url)
+                    if url_key in st.session_state["data_editor_keys"]:
+                        _write_data_editor_value(url_key, compressor)
+                    elif raw_value is not None:
+                        compact = url_key in st.session_state["compact_keys"]
+                        _write_widget_value(url_key, raw_value, compressor, compact)
 
             user_supplied_click_handler(*args, **kwargs)
 
@@ -491,13 +687,18 @@ if hasattr(st, "data_editor"):
 form_submit_button = UrlAwareFormSubmitButton(st.form_submit_button)
 
 
-try:
-    import streamlit_option_menu
+# streamlit_option_menu is imported when option_menu is first used
+HAS_OPTION_MENU = find_spec("streamlit_option_menu") is not None
 
-    option_menu = UrlAwareWidget(streamlit_option_menu.option_menu)
-    HAS_OPTION_MENU = True
-except ImportError:
-    HAS_OPTION_MENU = False
+
+def __getattr__(name: str) -> Any:
+    if name == "option_menu" and HAS_OPTION_MENU:
+        global option_menu
+        import streamlit_option_menu
+
+        option_menu = UrlAwareWidget(streamlit_option_menu.option_menu)
+        return option_menu
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class UrlAwareForm:
@@ -538,9 +739,6 @@ class UrlAwareForm:
         data_editor = UrlAwareWidget(st.data_editor)
     form_submit_button = UrlAwareFormSubmitButton(st.form_submit_button)
 
-    if HAS_OPTION_MENU:
-        option_menu = UrlAwareWidget(streamlit_option_menu.option_menu)
-
     def __init__(self, key, *args, **kwargs):
         self.base_form = st.form(key, *args, **kwargs)
         # map from URL query param names to streamlit widget keys
@@ -592,6 +790,8 @@ class UrlAwareForm:
         Any
             The attribute value
         """
+        if attr == "option_menu" and HAS_OPTION_MENU:
+            return __getattr__(attr).__get__(self)
         return getattr(self.base_form, attr)
 
 
@@ -0,0 +1,57 @@
+"""
+Benchmarks: tests marked with ``@pytest.mark.benchmark`` only run with
+STREAMLIT_PERMALINK_BENCHMARK=1 and report their timings with the
+``benchmark_report`` fixture, shown in a section of the terminal summary.
+"""
+
+import os
+
+import pytest
+
+BENCHMARK_ENV = "STREAMLIT_PERMALINK_BENCHMARK"
+
+# (test id, line) of the benchmarks that ran, collected from the test reports
+# so the results of pytest-xdist workers are shown as well
+_benchmark_results = []
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", f"benchmark: timing test, only runs with {BENCHMARK_ENV}=1"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get(BENCHMARK_ENV):
+        return
+    skip = pytest.mark.skip(reason=f"set {BENCHMARK_ENV}=1 to run benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark") is not None:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def benchmark_report(record_property):
+    """Report a line of benchmark results in the terminal summary."""
+
+    def report(line):
+        record_property("benchmark", line)
+
+    return report
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call":
+        _benchmark_results.extend(
+            (report.nodeid, value)
+            for name, value in report.user_properties
+            if name == "benchmark"
+        )
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _benchmark_results:
+        return
+    terminalreporter.section("benchmarks")
+    for nodeid, line in _benchmark_results:
+        terminalreporter.write_line(f"{nodeid}: {line}")
@@ -0,0 +1,175 @@
+import pytest
+from streamlit.runtime.state.query_params import QueryParams
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.query_params as query_params
+
+from .utils import get_query_params, set_query_params
+
+
+def create_batched_app():
+    import streamlit_permalink as stp
+
+    with stp.batch_url_updates():
+        for i in range(5):
+            stp.checkbox(f"Checkbox {i}", url_key=f"check_{i}")
+
+
+def create_unbatched_app():
+    import streamlit_permalink as stp
+
+    for i in range(5):
+        stp.checkbox(f"Checkbox {i}", url_key=f"check_{i}")
+
+
+def create_many_widgets_app():
+    import streamlit_permalink as stp
+
+    for i in range(10):
+        stp.checkbox(f"Checkbox {i}", url_key=f"check_{i}")
+        stp.slider(f"Slider {i}", 0, 10, i, url_key=f"slider_{i}")
+        stp.text_input(f"Text {i}", value=f"text {i}", url_key=f"text_{i}")
+        stp.selectbox(f"Select {i}", ["a", "b", "c"], url_key=f"select_{i}")
+
+
+def create_batched_form_app():
+    import streamlit_permalink as stp
+
+    with stp.form("test_form"):
+        for i in range(5):
+            stp.text_input(f"Text {i}", value="", url_key=f"text_{i}")
+        stp.form_submit_button("Submit")
+
+
+def create_batched_state_blob_app():
+    import streamlit_permalink as stp
+
+    stp.enable_state_blob()
+    with stp.batch_url_updates():
+        for i in range(5):
+            stp.checkbox(f"Checkbox {i}", url_key=f"check_{i}")
+
+
+def create_read_inside_batch_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    with stp.batch_url_updates():
+        stp.checkbox.set_url_value("check", True)
+        st.session_state["inside"] = stp.checkbox.get_url_value("check")
+        st.session_state["sent"] = st.query_params.get("check")
+
+
+@pytest.fixture
+def url_updates(monkeypatch):
+    """Count the URL updates sent to the browser"""
+    calls = []
+    send = QueryParams._send_query_param_msg
+
+    def counting_send(self):
+        calls.append(dict(self._query_params))
+        send(self)
+
+    monkeypatch.setattr(QueryParams, "_send_query_param_msg", counting_send)
+    return calls
+
+
+def test_url_init_once_per_run(url_updates):
+    """Test the widgets of a first load are initialized with a single URL update, without a batch"""
+    at = AppTest.from_function(create_many_widgets_app)
+    at.run()
+
+    assert not at.exception
+    assert len(url_updates) == 1
+    params = get_query_params(at)
+    assert len(params) == 40
+    assert params["check_9"] == ["False"]
+    assert params["slider_9"] == ["9"]
+    assert params["text_9"] == ["text 9"]
+    assert params["select_9"] == ["a"]
+
+
+def test_batched_url_init(url_updates):
+    """Test all widgets are initialized with a single URL update"""
+    at = AppTest.from_function(create_batched_app)
+    at.run()
+
+    assert not at.exception
+    assert len(url_updates) == 1
+    assert get_query_params(at) == {f"check_{i}": ["False"] for i in range(5)}
+
+
+def test_batched_keeps_other_params(url_updates):
+    """Test a batch only adds its keys to the query params"""
+    at = AppTest.from_function(create_batched_app)
+    set_query_params(at, {"check_0": "True", "other": "value"})
+    at.run()
+
+    assert at.checkbox[0].value is True
+    assert len(url_updates) == 1
+    assert get_query_params(at)["other"] == ["value"]
+
+
+def test_callbacks_write_once_per_rerun(url_updates):
+    """Test the callbacks of a rerun changing several widgets write a single URL update"""
+    at = AppTest.from_function(create_unbatched_app)
+    at.run()
+    url_updates.clear()
+
+    for i in range(3):
+        at.checkbox[i].check()
+    at.run()
+
+    assert not at.exception
+    assert len(url_updates) == 1
+    params = get_query_params(at)
+    assert [params[f"check_{i}"] for i in range(5)] == [["True"]] * 3 + [["False"]] * 2
+
+    at.checkbox[4].check().run()
+    assert len(url_updates) == 2
+    assert get_query_params(at)["check_4"] == ["True"]
+
+
+def test_batched_form_submit(url_updates):
+    """Test a form submission writes all fields in a single URL update"""
+    at = AppTest.from_function(create_batched_form_app)
+    at.run()
+    url_updates.clear()
+
+    for i in range(5):
+        at.text_input[i].set_value(f"value {i}")
+    at.button[0].click().run()
+
+    assert len(url_updates) == 1
+    assert get_query_params(at) == {f"text_{i}": [f"value {i}"] for i in range(5)}
+
+
+def test_batched_state_blob(url_updates, monkeypatch):
+    """Test the state blob is encoded and written once per batch"""
+    encodes = []
+    encode = query_params.encode_state_blob
+
+    def counting_encode(*args, **kwargs):
+        encodes.append(args)
+        return encode(*args, **kwargs)
+
+    monkeypatch.setattr(query_params, "encode_state_blob", counting_encode)
+
+    at = AppTest.from_function(create_batched_state_blob_app)
+    at.run()
+
+    assert len(url_updates) == 1
+    assert len(encodes) == 1
+    state = query_params.decode_state_blob(get_query_params(at)["s"][0])
+    assert state == {f"check_{i}": "False" for i in range(5)}
+
+
+def test_read_inside_batch():
+    """Test buffered values are visible to reads before they are sent"""
+    at = AppTest.from_function(create_read_inside_batch_app)
+    at.run()
+
+    assert not at.exception
+    assert at.session_state["inside"] == [True]
+    assert at.session_state["sent"] is None
+    assert get_query_params(at)["check"] == ["True"]
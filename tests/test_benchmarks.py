@@ -0,0 +1,59 @@
+"""Tests for the benchmark suite in benchmarks/run_benchmarks.py."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent / "benchmarks" / "run_benchmarks.py"
+
+
+@pytest.fixture(scope="module")
+def benchmarks():
+    spec = importlib.util.spec_from_file_location("run_benchmarks", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_results(**medians):
+    return {
+        "results": [
+            {"name": name, "params": {"widgets": 10}, "median": median}
+            for name, median in medians.items()
+        ]
+    }
+
+
+def test_compare(benchmarks):
+    """Test only slowdowns above the threshold are reported"""
+    baseline = make_results(app_rerun=1.0, serialize_df=1.0, widget_call=1.0)
+    current = make_results(app_rerun=1.5, serialize_df=1.1, new_benchmark=9.0)
+
+    regressions = benchmarks.compare(current, baseline, threshold=1.2)
+
+    assert regressions == ['app_rerun{"widgets": 10}: 1.50x slower']
+
+
+@pytest.mark.benchmark
+def test_quick_run(benchmarks, tmp_path):
+    """Run the quick benchmark suite and check the JSON output."""
+    output = tmp_path / "results.json"
+    assert benchmarks.main(["--quick", "-o", str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    names = {entry["name"] for entry in results["results"]}
+    assert names == {
+        "widget_call",
+        "handler_sync",
+        "to_url_value",
+        "blind_parse_value",
+        "compress_text",
+        "decompress_text",
+        "serialize_df",
+        "app_rerun",
+    }
+    assert all(entry["median"] >= 0 for entry in results["results"])
+    rerun = tmp_path / "rerun.json"
+    assert benchmarks.main(["--quick", "-o", str(rerun), "--compare", str(output), "--threshold", "100"]) == 0
@@ -0,0 +1,213 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.chunking import (
+    ChunkedValue,
+    checksum,
+    escape_url_value,
+    join_url_value,
+    parse_manifest,
+    split_url_value,
+    unescape_url_value,
+)
+from streamlit_permalink.codec import PermalinkCodec, WidgetSpec
+from streamlit_permalink.compression import (
+    compress_with,
+    decompress_any,
+    decompress_chunks,
+)
+from streamlit_permalink.decode_cache import raw_value_key
+from streamlit_permalink.utils import create_url
+
+from .utils import get_query_params, set_query_params
+
+LONG_TEXT = "".join(f"row {i}: héllo wörld {i * i}\n" for i in range(500))
+
+
+def create_chunked_text_area_app():
+    import streamlit_permalink as stp
+
+    stp.enable_chunked_values(chunk_size=200)
+    stp.text_area("Essay", value="short", url_key="essay", compress=True)
+
+
+def create_literal_manifest_app():
+    import streamlit_permalink as stp
+
+    stp.text_input("Text", value="a", url_key="text")
+
+
+def create_chunked_state_blob_app():
+    import streamlit_permalink as stp
+
+    stp.enable_state_blob()
+    stp.enable_chunked_values(chunk_size=50)
+    stp.text_area("Essay", value="short", url_key="essay")
+    stp.text_input("Name", value="name", url_key="name")
+
+
+def test_split_and_join():
+    """Test values are split into numbered chunks and joined back"""
+    params = split_url_value("k", "abcdefghij", 4)
+
+    assert list(params) == ["k", "k.0", "k.1", "k.2"]
+    assert parse_manifest(params["k"])[0] == 3
+    assert params["k.2"] == "ij"
+
+    value = join_url_value("k", params["k"], params.get)
+    assert value == "abcdefghij"
+    assert value.chunks == ["abcd", "efgh", "ij"]
+    assert split_url_value("k", "abcd", 4) == {"k": "abcd"}
+
+
+def test_join_errors():
+    """Test missing chunks and checksum mismatches are detected"""
+    params = split_url_value("k", "abcdefghij", 4)
+
+    with pytest.raises(ValueError, match="Missing chunk"):
+        join_url_value("k", params["k"], {**params, "k.1": None}.get)
+    with pytest.raises(ValueError, match="Checksum"):
+        join_url_value("k", params["k"], {**params, "k.2": "i"}.get)
+
+
+def test_chunks_are_not_joined():
+    """Test checksums and cache keys of chunked values are computed chunk by chunk"""
+    params = split_url_value("k", LONG_TEXT, 64)
+    value = join_url_value("k", params["k"], params.get)
+    value.removeprefix("row").partition(":")
+
+    assert checksum(value) == checksum(LONG_TEXT)
+    assert raw_value_key("k", value, "kind") == raw_value_key("k", LONG_TEXT, "kind")
+    assert len(value) == len(LONG_TEXT)
+    assert value._joined is None
+    assert str(value) == LONG_TEXT
+
+
+def test_partition_keeps_chunks():
+    version, sep, payload = ChunkedValue(["1", ".a", "b.c"]).partition(".")
+
+    assert (version, sep, payload) == ("1", ".", "ab.c")
+    assert payload.chunks == ["a", "b.c"]
+    assert ChunkedValue(["ab", "c"]).partition(".") == ("abc", "", "")
+
+
+def test_escape_literal_manifest():
+    """Test values that look like a manifest or an escaped value are read back literally"""
+    manifest = split_url_value("k", "abcdefghij", 4)["k"]
+    escaped = escape_url_value(manifest)
+
+    assert parse_manifest(escaped) is None
+    assert unescape_url_value(escaped) == manifest
+    assert unescape_url_value(escape_url_value(escaped)) == escaped
+    assert escape_url_value("plain") == "plain"
+    assert split_url_value("k", manifest, 1000) == {"k": escaped}
+
+    codec = PermalinkCodec([WidgetSpec("text_input", "T", url_key="t")])
+    assert codec.decode(codec.encode({"t": manifest})) == {"t": manifest}
+    assert codec.decode(create_url("https://example.com", {"t": manifest})) == {"t": manifest}
+
+
+def test_literal_manifest_app():
+    manifest = split_url_value("k", "abcdefghij", 4)["k"]
+    at = AppTest.from_function(create_literal_manifest_app)
+    at.run()
+    at.text_input[0].input(manifest).run()
+
+    assert get_query_params(at)["text"] == [escape_url_value(manifest)]
+    restored = AppTest.from_function(create_literal_manifest_app)
+    set_query_params(restored, {"text": escape_url_value(manifest)})
+    restored.run()
+    assert not restored.exception
+    assert restored.text_input[0].value == manifest
+
+
+def test_removeprefix_keeps_chunks():
+    value = ChunkedValue(["1.ab", "cd"])
+    stripped = value.removeprefix("1.")
+
+    assert stripped == "abcd"
+    assert stripped.chunks == ["ab", "cd"]
+
+
+@pytest.mark.parametrize("codec", ["zlib", "deflate", "dictionary", "lzma", "none"])
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, 1000])
+def test_decompress_chunks(codec, chunk_size):
+    """Test chunked values decompress like the joined value"""
+    if codec == "dictionary":
+        compressed = compress_with(LONG_TEXT, "zlib", dictionary=b"row hello world")
+    else:
+        compressed = compress_with(LONG_TEXT, codec)
+    chunks = [compressed[i : i + chunk_size] for i in range(0, len(compressed), chunk_size)]
+
+    assert decompress_chunks(chunks) == LONG_TEXT
+    assert decompress_any(ChunkedValue(chunks)) == LONG_TEXT
+
+
+def test_decompress_truncated_chunks():
+    compressed = compress_with(LONG_TEXT, "zlib")
+    with pytest.raises(Exception):
+        decompress_chunks([compressed[:100], compressed[100:200]])
+
+
+def test_chunked_url_init():
+    """Test a long value is written in chunks"""
+    at = AppTest.from_function(create_chunked_text_area_app)
+    at.run()
+    at.text_area[0].input(LONG_TEXT).run()
+
+    params = get_query_params(at)
+    count, _ = parse_manifest(params["essay"][0])
+    assert count > 1
+    assert all(len(params[f"essay.{i}"][0]) <= 200 for i in range(count))
+
+    # shorter values remove the chunks
+    at.text_area[0].input("short again").run()
+    params = get_query_params(at)
+    assert params["essay"] == [compress_with("short again")]
+    assert not any(key.startswith("essay.") for key in params)
+
+
+def test_chunked_url_value():
+    """Test chunked values are reassembled when loading a link"""
+    params = split_url_value("essay", compress_with(LONG_TEXT), 200)
+    at = AppTest.from_function(create_chunked_text_area_app)
+    set_query_params(at, params)
+    at.run()
+
+    assert not at.exception
+    assert at.text_area[0].value == LONG_TEXT
+
+
+def test_truncated_url_value():
+    """Test a link missing a chunk raises an error"""
+    params = split_url_value("essay", compress_with(LONG_TEXT), 200)
+    params.pop("essay.1")
+    at = AppTest.from_function(create_chunked_text_area_app)
+    set_query_params(at, params)
+    at.run()
+
+    assert at.exception
+
+
+def test_chunked_state_blob():
+    """Test the state blob is chunked like any other value"""
+    at = AppTest.from_function(create_chunked_state_blob_app)
+    at.run()
+    at.text_area[0].input(LONG_TEXT).run()
+
+    params = get_query_params(at)
+    assert parse_manifest(params["s"][0]) is not None
+
+    restored = AppTest.from_function(create_chunked_state_blob_app)
+    set_query_params(restored, {k: v[0] for k, v in params.items()})
+    restored.run()
+    assert not restored.exception
+    assert restored.text_area[0].value == LONG_TEXT
+    assert restored.text_input[0].value == "name"
+
+
+def test_create_url_chunks():
+    url = create_url("https://example.com", {"a": "x" * 10, "b": "y"}, chunk_size=4)
+
+    assert "a.2=xx" in url
+    assert "b=y" in url
@@ -0,0 +1,187 @@
+from datetime import date
+import pickle
+import time
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.chunking import split_url_value
+from streamlit_permalink.codec import PermalinkCodec, WidgetSpec
+from streamlit_permalink.compression import compress_with
+from streamlit_permalink.exceptions import UrlParamError
+from streamlit_permalink.query_params import encode_state_blob
+from streamlit_permalink.state_store import MemoryStore
+
+from .utils import get_query_params
+
+
+def create_page_app():
+    import streamlit_permalink as stp
+    from datetime import date
+
+    stp.selectbox("Country", ["FR", "DE", "IT"], url_key="country")
+    stp.slider("Range", 0, 100, (20, 80), url_key="range")
+    stp.multiselect("Tags", ["a", "b", 3], default=["a"], url_key="tags")
+    stp.checkbox("Active", url_key="active")
+    stp.text_area("Notes", url_key="notes", compress=True)
+    stp.date_input("Day", value=date(2024, 1, 1), url_key="day", compact=True)
+
+
+def page_codec(**kwargs):
+    return PermalinkCodec(
+        [
+            WidgetSpec("selectbox", "Country", ["FR", "DE", "IT"], url_key="country"),
+            WidgetSpec("slider", "Range", 0, 100, (20, 80), url_key="range"),
+            WidgetSpec("multiselect", "Tags", ["a", "b", 3], default=["a"], url_key="tags"),
+            WidgetSpec("checkbox", "Active", url_key="active"),
+            WidgetSpec("text_area", "Notes", url_key="notes", compress=True),
+            WidgetSpec("date_input", "Day", value=date(2024, 1, 1), url_key="day", compact=True),
+        ],
+        **kwargs,
+    )
+
+
+VALUES = {
+    "country": "IT",
+    "range": (10, 30),
+    "tags": ["b", 3],
+    "active": True,
+    "notes": "héllo wörld",
+    "day": date(2024, 2, 29),
+}
+
+
+def test_encode_decode():
+    codec = page_codec()
+    query = codec.encode(VALUES)
+
+    assert "day=_dAI8" in query
+    assert codec.decode(query) == VALUES
+    assert codec.decode(f"https://example.com/app?{query}") == VALUES
+
+
+def test_missing_values_are_none():
+    codec = page_codec()
+
+    assert codec.decode("country=DE") == {
+        "country": "DE",
+        "range": None,
+        "tags": None,
+        "active": None,
+        "notes": None,
+        "day": None,
+    }
+
+
+def test_decode_like_app():
+    """Test the codec decodes the URL written by a running app"""
+    at = AppTest.from_function(create_page_app)
+    at.run()
+    at.selectbox[0].select("DE").run()
+    at.slider[0].set_range(5, 15).run()
+    at.text_area[0].input("notes").run()
+
+    query = "&".join(f"{k}={v}" for k, values in get_query_params(at).items() for v in values)
+    assert page_codec().decode(query) == {
+        "country": "DE",
+        "range": (5, 15),
+        "tags": ["a"],
+        "active": False,
+        "notes": "notes",
+        "day": date(2024, 1, 1),
+    }
+
+
+def test_app_loads_encoded_values():
+    """Test a running app reads the values encoded by the codec"""
+    at = AppTest.from_function(create_page_app)
+    codec = page_codec()
+    for url_key, value in VALUES.items():
+        at.query_params[url_key] = codec.widgets[url_key].encode(value)
+    at.run()
+
+    assert not at.exception
+    assert at.selectbox[0].value == "IT"
+    assert at.slider[0].value == (10, 30)
+    assert at.multiselect[0].value == ["b", 3]
+    assert at.text_area[0].value == "héllo wörld"
+    assert at.date_input[0].value == date(2024, 2, 29)
+
+
+def test_errors():
+    codec = page_codec()
+
+    with pytest.raises(UrlParamError):
+        codec.decode("country=XX")
+    assert codec.decode("country=XX&active=True", errors="ignore")["active"] is True
+    with pytest.raises(ValueError, match="Invalid errors"):
+        codec.decode("", errors="coerce")
+    with pytest.raises(KeyError):
+        codec.encode({"unknown": 1})
+    with pytest.raises(ValueError, match="Unsupported widget"):
+        WidgetSpec("data_editor", pd.DataFrame(), url_key="table")
+    with pytest.raises(ValueError, match="compact is not supported"):
+        WidgetSpec("selectbox", "Select", [1], compact=True)
+
+
+def test_chunks_and_state_blob():
+    """Test chunked values and state blobs are read like in an app"""
+    codec = page_codec(state_blob=True)
+    notes = "long notes " * 100
+    chunked = split_url_value("notes", compress_with(notes), 50)
+    blob = encode_state_blob({"country": "FR", "range": ["1", "2"]})
+
+    query = "&".join(f"{k}={v}" for k, v in {**chunked, "s": blob}.items())
+    decoded = codec.decode(query)
+    assert decoded["notes"] == notes
+    assert decoded["country"] == "FR"
+    assert decoded["range"] == (1, 2)
+
+
+def test_pickle_with_store():
+    """Test codecs whose widgets use a state store can be pickled"""
+    store = MemoryStore()
+    codec = PermalinkCodec([WidgetSpec("text_area", "Essay", url_key="essay", store=store)])
+    query = codec.encode({"essay": "x" * 1000})
+    copy = pickle.loads(pickle.dumps(codec))
+
+    assert copy.decode(query) == {"essay": "x" * 1000}
+
+
+def test_decode_many():
+    codec = page_codec()
+    urls = (f"?country=FR&range={i}&range=50" for i in range(25))
+
+    frames = list(codec.decode_many(urls, batch_size=10))
+    assert [len(df) for df in frames] == [10, 10, 5]
+    assert list(frames[0].columns) == list(codec.widgets)
+    assert frames[2]["range"].iloc[-1] == (24, 50)
+
+    df = codec.decode_frame(["country=DE", "country=XX"], errors="ignore")
+    assert df["country"].tolist() == ["DE", None]
+    assert codec.decode_frame([]).empty
+
+
+def test_decode_many_processes():
+    """Test batches decoded in worker processes keep their order"""
+    codec = page_codec()
+    urls = [f"country=IT&range={i}&range=99" for i in range(40)]
+
+    df = codec.decode_frame(urls, batch_size=7, processes=2)
+    assert df["range"].tolist() == [(i, 99) for i in range(40)]
+    assert (df["country"] == "IT").all()
+
+
+@pytest.mark.benchmark
+def test_benchmark_decode_many(benchmark_report):
+    """Measure URLs decoded per second, in process and with a process pool."""
+    codec = page_codec()
+    query = codec.encode(VALUES)
+    urls = [f"https://example.com/?{query}"] * 50_000
+
+    for processes in (None, 4):
+        start = time.perf_counter()
+        rows = sum(len(df) for df in codec.decode_many(urls, processes=processes))
+        elapsed = time.perf_counter() - start
+        benchmark_report(f"processes={processes}: {rows / elapsed:,.0f} URLs/s")
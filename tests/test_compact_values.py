@@ -0,0 +1,183 @@
+from datetime import date, datetime, time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.compact_values import (
+    decode_compact_value,
+    encode_compact_value,
+    is_compact_value,
+    to_compact_url_value,
+)
+from streamlit_permalink.handlers.slider import blind_parse_value
+from streamlit_permalink.utils import to_url_value
+
+from .utils import get_query_params, set_query_params
+
+
+def create_compact_datetime_range_app():
+    import streamlit_permalink as stp
+    from datetime import datetime
+
+    stp.slider(
+        "Range",
+        min_value=datetime(2024, 1, 1),
+        max_value=datetime(2024, 12, 31),
+        value=(datetime(2024, 3, 1, 8, 30), datetime(2024, 6, 1, 17, 45)),
+        url_key="range",
+        compact=True,
+    )
+
+
+def create_compact_inputs_app():
+    import streamlit_permalink as stp
+    from datetime import date
+
+    stp.number_input("Ratio", value=0.1 + 0.2, url_key="ratio", compact=True)
+    stp.date_input(
+        "Dates", value=(date(2024, 1, 1), date(2024, 2, 1)), url_key="dates", compact=True
+    )
+    stp.time_input("Time", value=None, url_key="time", compact=True)
+
+
+def create_compact_form_app():
+    import streamlit_permalink as stp
+    from datetime import date
+
+    with stp.form("form"):
+        stp.date_input("Date", value=date(2024, 1, 1), url_key="date", compact=True)
+        stp.form_submit_button("Submit")
+
+
+def create_compact_selectbox_app():
+    import streamlit_permalink as stp
+
+    stp.selectbox("Select", [1, 2, 3], url_key="select", compact=True)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        0,
+        -1,
+        10**12,
+        -(10**18),
+        0.5,
+        0.1 + 0.2,
+        -1e-300,
+        float("inf"),
+        date(2024, 1, 1),
+        date(1900, 2, 28),
+        datetime(2024, 1, 1, 12, 30),
+        datetime(1969, 12, 31, 23, 59, 59, 999999),
+        time(0, 0),
+        time(23, 59, 59),
+    ],
+)
+def test_round_trip(value):
+    url_value = encode_compact_value(value)
+
+    assert is_compact_value(url_value)
+    decoded = decode_compact_value(url_value)
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+def test_compact_is_shorter():
+    """Test compact values are only used when they're shorter than the readable value"""
+    assert to_compact_url_value(datetime(2024, 1, 1, 12, 30)) == "_t3ieYrI"
+    assert to_compact_url_value(date(2024, 1, 1)) == "_dAGE"
+    assert to_compact_url_value(42) is None
+    assert to_compact_url_value(0.5) is None
+    assert to_compact_url_value(True) is None
+    assert to_compact_url_value("text") is None
+    assert to_url_value([date(2024, 1, 1), 3], compact=True) == ["_dAGE", "3"]
+    assert to_url_value(date(2024, 1, 1)) == "2024-01-01"
+
+
+def test_decode_errors():
+    assert not is_compact_value("_STREAMLIT_PERMALINK_NONE")
+    assert not is_compact_value("2024-01-01")
+    with pytest.raises(ValueError, match="expected date"):
+        decode_compact_value("_t3ieYrI", date)
+    with pytest.raises(ValueError, match="Invalid compact"):
+        decode_compact_value("_d!!")
+    with pytest.raises(ValueError, match="Invalid compact"):
+        decode_compact_value("_hzzzz")
+    assert decode_compact_value("_i4", float) == 2.0
+
+
+def test_blind_parse_value():
+    assert blind_parse_value("_dAGE") == date(2024, 1, 1)
+    assert blind_parse_value("2024-01-01") == date(2024, 1, 1)
+
+
+def test_compact_range_slider():
+    """Test a datetime range slider writes compact values and reads them back"""
+    at = AppTest.from_function(create_compact_datetime_range_app)
+    at.run()
+
+    url_values = get_query_params(at)["range"]
+    assert all(is_compact_value(v) and len(v) < 10 for v in url_values)
+
+    restored = AppTest.from_function(create_compact_datetime_range_app)
+    restored.query_params["range"] = url_values
+    restored.run()
+    assert not restored.exception
+    assert restored.slider[0].value == (datetime(2024, 3, 1, 8, 30), datetime(2024, 6, 1, 17, 45))
+
+
+def test_compact_slider_reads_readable_values():
+    at = AppTest.from_function(create_compact_datetime_range_app)
+    at.query_params["range"] = ["2024-02-01T00:00:00", "2024-04-01T12:00:00"]
+    at.run()
+
+    assert not at.exception
+    assert at.slider[0].value == (datetime(2024, 2, 1), datetime(2024, 4, 1, 12))
+
+
+def test_compact_slider_type_mismatch():
+    at = AppTest.from_function(create_compact_datetime_range_app)
+    at.query_params["range"] = ["_dAGE", "_dAGF"]
+    at.run()
+
+    assert at.exception
+
+
+def test_compact_inputs():
+    """Test number, date range and time inputs with compact values"""
+    at = AppTest.from_function(create_compact_inputs_app)
+    at.run()
+
+    params = get_query_params(at)
+    assert is_compact_value(params["ratio"][0])
+    assert params["dates"] == ["_dAGE", "_dAHE"]
+
+    at.time_input[0].set_value(time(9, 15)).run()
+    assert get_query_params(at)["time"] == ["09:15"]
+
+    restored = AppTest.from_function(create_compact_inputs_app)
+    set_query_params(restored, {"ratio": params["ratio"][0], "time": "_hBi3"})
+    restored.query_params["dates"] = ["_dAGE", "_dAHE"]
+    restored.run()
+    assert not restored.exception
+    assert restored.number_input[0].value == 0.1 + 0.2
+    assert restored.date_input[0].value == (date(2024, 1, 1), date(2024, 2, 1))
+    assert restored.time_input[0].value == time(12, 30, 15)
+
+
+def test_compact_form():
+    at = AppTest.from_function(create_compact_form_app)
+    at.run()
+    at.date_input[0].set_value(date(2024, 1, 2))
+    at.button[0].click().run()
+
+    assert get_query_params(at)["date"] == ["_dAGG"]
+
+
+def test_compact_unsupported_widget():
+    at = AppTest.from_function(create_compact_selectbox_app)
+    at.run()
+
+    assert at.exception
+    assert "compact is not supported by selectbox" in at.exception[0].message
@@ -1,4 +1,23 @@
+import base64
+import json
+import sys
+import threading
+import types
+import zlib
+
+import pytest
 from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.compression as compression
+from streamlit_permalink.compression import (
+    COMPRESSION_CODECS,
+    register_dictionary,
+    set_default_dictionary,
+    train_dictionary,
+    train_dictionary_from_urls,
+)
+from streamlit_permalink.utils import compress_text, decompress_text
+
 from .utils import get_query_params, set_query_params
 
 
@@ -45,3 +64,152 @@ def test_default_compression():
 
     # Verify checkbox correctly decompressed the value
     assert at2.checkbox[0].value is True
+
+
+def create_lzma_text_area_app():
+    import streamlit_permalink as stp
+
+    stp.text_area("Essay", value="lorem ipsum " * 50, url_key="essay", compress="lzma")
+
+
+def test_codec_compression():
+    """Test a named codec is used and tagged in the URL"""
+    at = AppTest.from_function(create_lzma_text_area_app)
+    at.run()
+
+    params = get_query_params(at)
+    assert params["essay"][0].startswith("x.")
+
+    at2 = AppTest.from_function(create_lzma_text_area_app)
+    set_query_params(at2, {"essay": compress_text("from the url", codec="bz2")})
+    at2.run()
+
+    assert at2.text_area[0].value == "from the url"
+
+
+def test_codec_round_trips():
+    """Test every registered codec round trips"""
+    text = "streamlit permalink " * 20 + "äöü"
+    for name in COMPRESSION_CODECS:
+        assert decompress_text(compress_text(text, codec=name)) == text
+
+
+def test_zlib_stays_untagged():
+    """Test zlib output keeps the format of earlier versions"""
+    text = "hello world " * 10
+    legacy = base64.urlsafe_b64encode(zlib.compress(text.encode("utf-8"), level=9))
+    assert compress_text(text) == legacy.decode("utf-8")
+    assert decompress_text(legacy.decode("utf-8")) == text
+
+
+def test_auto_compression():
+    """Test auto picks the smallest output"""
+    short = "1"
+    assert compress_text(short, codec="auto") == "n.1"
+
+    long = "lorem ipsum dolor sit amet " * 100
+    auto = compress_text(long, codec="auto", cpu_budget=1.0)
+    assert len(auto) <= min(len(compress_text(long, codec=c)) for c in COMPRESSION_CODECS)
+    assert decompress_text(auto) == long
+
+
+def test_auto_budget_is_thread_cpu_time(monkeypatch):
+    """Test auto stops trying codecs once the thread's CPU time budget is spent"""
+    clock = iter(range(100))
+    monkeypatch.setattr(compression.time, "thread_time", lambda: next(clock))
+    monkeypatch.setattr(compression.time, "perf_counter", lambda: 0)
+
+    long = "lorem ipsum dolor sit amet " * 100
+    # "none" is tried first, then the budget is spent
+    assert compress_text(long, codec="auto", cpu_budget=0.5) == "n." + long
+
+
+def test_zstd_per_thread(monkeypatch):
+    """Test zstd compressors are not shared across threads"""
+    created = []
+
+    class ZstdCompressor:
+        def __init__(self, level):
+            created.append((threading.get_ident(), level))
+
+        def compress(self, data):
+            return data
+
+    monkeypatch.setitem(sys.modules, "zstandard", types.SimpleNamespace(ZstdCompressor=ZstdCompressor))
+    monkeypatch.setattr(compression, "_zstd_local", threading.local())
+
+    codec = compression._zstd_codec()
+    codec.compress(b"a")
+    codec.compress(b"b")
+    thread = threading.Thread(target=codec.compress, args=(b"c",))
+    thread.start()
+    thread.join()
+
+    assert len(created) == 2
+    assert created[0][0] != created[1][0]
+    assert {level for _, level in created} == {compression.ZSTD_LEVEL}
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        compress_text("text", codec="unknown")
+    with pytest.raises(ValueError):
+        decompress_text("q.abc")
+
+
+def test_dictionary_compression():
+    """Test preset dictionaries shrink small, repetitive values"""
+    samples = [
+        json.dumps([{"widgets": "st.selectbox", "price": i, "favorite": True}] * 2)
+        for i in range(10)
+    ]
+    dict_id = register_dictionary(train_dictionary(samples), "test")
+
+    value = json.dumps([{"widgets": "st.selectbox", "price": 99, "favorite": False}])
+    compressed = compress_text(value, dictionary=dict_id)
+    assert compressed.startswith("Dtest.")
+    assert len(compressed) < len(compress_text(value))
+    assert decompress_text(compressed) == value
+
+    # values that do not shrink are stored as-is
+    assert compress_text("True", dictionary=dict_id) == "n.True"
+
+
+def test_unknown_dictionary():
+    with pytest.raises(ValueError):
+        compress_text("text", dictionary="missing")
+    with pytest.raises(ValueError):
+        decompress_text("Dmissing.abc")
+
+
+def test_train_dictionary_from_urls():
+    urls = [
+        f"https://example.com/?name=option+{i}&essay={compress_text('lorem ipsum dolor')}"
+        for i in range(5)
+    ]
+    dictionary = train_dictionary_from_urls(urls)
+    assert b"lorem" in dictionary
+    assert b"option" in dictionary
+
+
+def create_compressed_text_area_app():
+    import streamlit_permalink as stp
+
+    stp.text_area("Essay", value="lorem ipsum " * 5, url_key="essay", compress=True)
+
+
+def test_default_dictionary():
+    """Test compress=True uses the default dictionary and old links still decode"""
+    legacy = compress_text("dolor sit amet")
+    dict_id = set_default_dictionary(b"lorem ipsum dolor sit amet")
+    try:
+        at = AppTest.from_function(create_compressed_text_area_app)
+        at.run()
+        assert get_query_params(at)["essay"][0].startswith(f"D{dict_id}.")
+
+        at2 = AppTest.from_function(create_compressed_text_area_app)
+        set_query_params(at2, {"essay": legacy})
+        at2.run()
+        assert at2.text_area[0].value == "dolor sit amet"
+    finally:
+        set_default_dictionary(None)
@@ -0,0 +1,187 @@
+import json
+import time as timer
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.utils import merge_data_editor_deltas, update_data_editor
+
+from .utils import get_query_params, set_query_params
+
+DATA_KEY = "STREAMLIT_PERMALINK_DATA_EDITOR_table"
+
+
+def create_delta_data_editor_app():
+    import pandas as pd
+    import streamlit_permalink as stp
+
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    stp.data_editor(df, url_key="table", url_delta=True, num_rows="dynamic")
+
+
+def create_other_data_editor_app():
+    import pandas as pd
+    import streamlit_permalink as stp
+
+    df = pd.DataFrame({"a": [1, 2, 4], "b": ["x", "y", "z"]})
+    stp.data_editor(df, url_key="table", url_delta=True, num_rows="dynamic")
+
+
+def create_edited_delta_app(edits):
+    import pandas as pd
+    import streamlit as st
+    import streamlit_permalink as stp
+    from streamlit_permalink.utils import update_data_editor
+
+    stp.enable_elide_defaults()
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    stp.data_editor(df, url_key="table", url_delta=True, num_rows="dynamic")
+    # the edits the editor would report against the table it shows
+    original = st.session_state["STREAMLIT_PERMALINK_DATA_EDITOR_table"]
+    st.session_state["edited"] = update_data_editor(original, edits)
+
+
+def get_fingerprint():
+    at = AppTest.from_function(create_delta_data_editor_app)
+    at.run()
+    return json.loads(get_query_params(at)["table"][0])["fingerprint"]
+
+
+def test_delta_url_init():
+    """Test the URL only carries an empty delta on first load"""
+    at = AppTest.from_function(create_delta_data_editor_app)
+    at.run()
+
+    assert not at.exception
+    payload = json.loads(get_query_params(at)["table"][0])
+    assert payload["edited_rows"] == {}
+    assert payload["added_rows"] == []
+    assert payload["deleted_rows"] == []
+    assert len(payload["fingerprint"]) == 16
+
+
+def test_delta_url_replay():
+    """Test a delta from the URL is applied to the original data"""
+    delta = {
+        "fingerprint": get_fingerprint(),
+        "edited_rows": {"0": {"a": 10}},
+        "added_rows": [{"a": 4, "b": "w"}],
+        "deleted_rows": [1],
+    }
+    at = AppTest.from_function(create_delta_data_editor_app)
+    set_query_params(at, {"table": json.dumps(delta)})
+    at.run()
+
+    assert not at.exception
+    df = at.session_state[DATA_KEY]
+    assert df["a"].tolist() == [10, 3, 4]
+    assert df["b"].tolist() == ["x", "z", "w"]
+
+
+def test_edit_after_replayed_deletions():
+    """Test rows of a table loaded from a delta with deletions are edited and deleted by position"""
+    delta = {
+        "fingerprint": get_fingerprint(),
+        "edited_rows": {},
+        "added_rows": [],
+        "deleted_rows": [0],
+    }
+    for edits, expected in (
+        ({"edited_rows": {0: {"a": 20}}, "added_rows": [], "deleted_rows": []}, [20, 3]),
+        ({"edited_rows": {}, "added_rows": [], "deleted_rows": [0]}, [3]),
+    ):
+        at = AppTest.from_function(create_edited_delta_app, kwargs={"edits": edits})
+        set_query_params(at, {"table": json.dumps(delta)})
+        at.run()
+
+        assert not at.exception
+        assert at.session_state[DATA_KEY].index.tolist() == [0, 1]
+        assert at.session_state["edited"]["a"].tolist() == expected
+
+
+def test_delta_mode_loads_full_table_url():
+    """Test links holding the full table still load in delta mode"""
+    at = AppTest.from_function(create_delta_data_editor_app)
+    set_query_params(at, {"table": '[{"a":5,"b":"q"}]'})
+    at.run()
+
+    assert not at.exception
+    assert at.session_state[DATA_KEY]["a"].tolist() == [5]
+
+
+def test_delta_fingerprint_mismatch():
+    """Test a delta created for different data is rejected"""
+    delta = {
+        "fingerprint": get_fingerprint(),
+        "edited_rows": {},
+        "added_rows": [],
+        "deleted_rows": [],
+    }
+    at = AppTest.from_function(create_other_data_editor_app)
+    set_query_params(at, {"table": json.dumps(delta)})
+    at.run()
+
+    assert at.exception
+
+
+def test_merge_data_editor_deltas():
+    """Test merged deltas match applying both deltas one after another"""
+    df = pd.DataFrame({"a": [0, 1, 2, 3], "b": ["p", "q", "r", "s"]})
+    first = {
+        "edited_rows": {1: {"a": 10}},
+        "added_rows": [{"a": 4, "b": "t"}, {"a": 5, "b": "u"}],
+        "deleted_rows": [0],
+    }
+    # positions against [1, 2, 3, added 4, added 5]
+    second = {
+        "edited_rows": {0: {"b": "Q"}, 3: {"a": 40}},
+        "added_rows": [{"a": 6, "b": "v"}],
+        "deleted_rows": [1, 4],
+    }
+
+    intermediate = update_data_editor(df.copy(), first).reset_index(drop=True)
+    expected = update_data_editor(intermediate, second)
+
+    merged = merge_data_editor_deltas(len(df), first, second)
+    result = update_data_editor(df.copy(), merged)
+
+    assert merged["deleted_rows"] == [0, 2]
+    assert result.to_dict("records") == expected.to_dict("records")
+
+
+def test_update_data_editor_copy():
+    """Test updates are applied to a copy of the original data"""
+    df = pd.DataFrame({"a": [0, 1, 2], "b": ["p", "q", "r"]})
+    original = df.copy()
+    updates = {
+        "edited_rows": {"0": {"a": 10, "b": "P"}, "2": {"a": None}},
+        "added_rows": [{"a": 3, "b": "s"}, {}],
+        "deleted_rows": [1],
+    }
+
+    result = update_data_editor(df, updates)
+
+    pd.testing.assert_frame_equal(df, original)
+    expected = pd.DataFrame(
+        {"a": [10.0, None, 3.0, None], "b": ["P", "r", "s", float("nan")]}, index=[0, 2, 3, 4]
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.benchmark
+def test_benchmark_update_data_editor(benchmark_report):
+    """Time applying 1,000 pasted rows, 1,000 edits and 500 deletions."""
+    df = pd.DataFrame({"a": range(2000), "b": ["x"] * 2000})
+    updates = {
+        "edited_rows": {i: {"a": -i, "b": "y"} for i in range(0, 2000, 2)},
+        "added_rows": [{"a": i, "b": "z"} for i in range(1000)],
+        "deleted_rows": list(range(1, 1000, 2)),
+    }
+
+    start = timer.perf_counter()
+    result = update_data_editor(df, updates)
+    elapsed = timer.perf_counter() - start
+
+    assert len(result) == 2500
+    benchmark_report(f"update_data_editor: {elapsed:.3f}s")
@@ -0,0 +1,191 @@
+"""Tests for the DataFrame codecs in streamlit_permalink."""
+
+import base64
+from datetime import date, time
+import json
+import struct
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.dataframe_codecs import (
+    ColumnarCodec,
+    decode_dataframe,
+    encode_dataframe,
+)
+from streamlit_permalink.utils import compress_text, to_url_value
+
+from .utils import get_query_params, set_query_params
+
+
+def make_numeric_df(rows=500):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "price": rng.integers(0, 1000, rows),
+            "ratio": np.round(rng.random(rows), 2),
+            "flag": rng.integers(0, 2, rows).astype(bool),
+            "half": np.arange(rows) * 0.5,
+            "missing": np.where(rng.random(rows) < 0.5, np.nan, 1.5),
+            "when": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        }
+    )
+
+
+def make_mixed_df():
+    return pd.DataFrame(
+        {
+            "date": [date(2024, 1, i + 1) for i in range(4)],
+            "time": [time(12, i) for i in range(4)],
+            "text": ["a", "b", None, "d"],
+            "mixed": [None, 1, "x", 2.5],
+            "utc": pd.date_range("2024-01-01", periods=4, tz="UTC"),
+            "nullable": pd.array([1, None, 3, 4], dtype="Int64"),
+            "category": pd.Categorical(["a", "b", "b", "a"]),
+        }
+    )
+
+
+def test_columnar_round_trip_numeric():
+    df = make_numeric_df()
+    result = decode_dataframe(encode_dataframe(df, "columnar"))
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_columnar_round_trip_mixed():
+    df = make_mixed_df()
+    result = decode_dataframe(encode_dataframe(df, "columnar"))
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_columnar_round_trip_empty():
+    df = make_numeric_df().iloc[:0]
+    result = decode_dataframe(encode_dataframe(df, "columnar"))
+    pd.testing.assert_frame_equal(result, df.reset_index(drop=True))
+
+
+def test_columnar_is_smaller_than_json():
+    df = make_numeric_df()
+    assert len(encode_dataframe(df, "columnar")) * 3 < len(encode_dataframe(df))
+    assert len(encode_dataframe(df, "columnar")) * 2 < len(compress_text(encode_dataframe(df)))
+
+
+def test_columnar_column_encodings():
+    """Test delta, scaled and dictionary encoded columns round trip exactly"""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {
+            "city": rng.choice(["Paris", "Berlin", "Rome", None], 300),
+            "small": rng.integers(-5, 5, 300),
+            "unsigned": np.arange(300, dtype=np.uint64),
+            "nat": pd.to_datetime(["2024-01-01", None] * 150),
+            "float32": np.arange(300, dtype=np.float32) / 4,
+            "zero": np.array([-0.0, 0.1] * 150),
+            "extreme": np.array([1e300, -1e-300] * 150),
+        }
+    )
+    result = decode_dataframe(encode_dataframe(df, "columnar"))
+
+    pd.testing.assert_frame_equal(result, df)
+    assert np.signbit(result["zero"].iloc[0])
+
+
+def test_columnar_links_without_encodings():
+    """Test columnar links written before per-column encodings still load"""
+    header = json.dumps(
+        {"rows": 2, "columns": [["a", "int64", "<i1", 2], ["b", "object", None, 10]]}
+    ).encode("utf-8")
+    payload = struct.pack("<I", len(header)) + header + bytes([1, 2]) + b'["x","yz"]'
+    value = ColumnarCodec.tag + base64.urlsafe_b64encode(zlib.compress(payload)).decode()
+
+    result = decode_dataframe(value)
+    assert result.to_dict("list") == {"a": [1, 2], "b": ["x", "yz"]}
+
+
+def test_arrow_without_pyarrow(monkeypatch):
+    value = "arw1." + base64.urlsafe_b64encode(zlib.compress(b"data")).decode()
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError, match="pyarrow is required to decode this link"):
+        decode_dataframe(value)
+    with pytest.raises(ImportError, match="pyarrow is required"):
+        encode_dataframe(make_numeric_df(10), "arrow")
+
+
+def test_arrow_round_trip():
+    pytest.importorskip("pyarrow")
+    df = make_numeric_df()
+    result = decode_dataframe(encode_dataframe(df, "arrow"))
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_decode_json_records():
+    df = pd.DataFrame({"a": [1, 2], "b": [date(2024, 1, 1), date(2024, 1, 2)]})
+    result = decode_dataframe(encode_dataframe(df))
+    assert result["a"].tolist() == [1, 2]
+    assert result["b"].tolist() == df["b"].tolist()
+
+
+def test_to_url_value_codec():
+    df = make_numeric_df(10)
+    assert to_url_value(df, df_codec="columnar").startswith(ColumnarCodec.tag)
+    assert to_url_value(df).startswith("[")
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        encode_dataframe(make_numeric_df(10), "unknown")
+
+
+def create_columnar_data_editor_app():
+    import pandas as pd
+    import streamlit_permalink as stp
+
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [0.5, 1.5, 2.5]})
+    stp.data_editor(df, url_key="table", df_codec="columnar")
+
+
+def test_data_editor_columnar_url():
+    """Test the data editor writes and reads columnar URL values"""
+    at = AppTest.from_function(create_columnar_data_editor_app)
+    at.run()
+    assert get_query_params(at)["table"][0].startswith(ColumnarCodec.tag)
+
+    url_value = encode_dataframe(pd.DataFrame({"a": [7], "b": [8.5]}), "columnar")
+    at = AppTest.from_function(create_columnar_data_editor_app)
+    set_query_params(at, {"table": url_value})
+    at.run()
+
+    assert not at.exception
+    df = at.session_state["STREAMLIT_PERMALINK_DATA_EDITOR_table"]
+    assert df.to_dict("records") == [{"a": 7, "b": 8.5}]
+
+
+def create_compressed_columnar_app():
+    import pandas as pd
+    import streamlit_permalink as stp
+
+    df = pd.DataFrame({"a": [1, 2, 3], "b": [0.5, 1.5, 2.5]})
+    stp.data_editor(df, url_key="table", df_codec="columnar", compress=True)
+
+
+def test_data_editor_columnar_not_compressed_twice():
+    """Test compress=True leaves columnar values alone and still loads links compressed twice"""
+    at = AppTest.from_function(create_compressed_columnar_app)
+    at.run()
+    url_value = get_query_params(at)["table"][0]
+    assert url_value == encode_dataframe(
+        pd.DataFrame({"a": [1, 2, 3], "b": [0.5, 1.5, 2.5]}), "columnar"
+    )
+
+    for value in (url_value, compress_text(url_value)):
+        at = AppTest.from_function(create_compressed_columnar_app)
+        set_query_params(at, {"table": value})
+        at.run()
+        assert not at.exception
+        df = at.session_state["STREAMLIT_PERMALINK_DATA_EDITOR_table"]
+        assert df["b"].tolist() == [0.5, 1.5, 2.5]
@@ -0,0 +1,142 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.handlers.data_editor as data_editor
+import streamlit_permalink.utils as utils
+from streamlit_permalink.decode_cache import (
+    DECODE_CACHE,
+    DEFAULT_MAX_BYTES,
+    DecodeCache,
+    configure_decode_cache,
+)
+
+from .utils import set_query_params
+
+DATA_KEY = "STREAMLIT_PERMALINK_DATA_EDITOR_table"
+
+
+def create_compressed_text_area_app():
+    import streamlit_permalink as stp
+
+    stp.text_area("Essay", url_key="essay", compress=True)
+
+
+def create_data_editor_app():
+    import pandas as pd
+    import streamlit_permalink as stp
+
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    stp.data_editor(df, url_key="table")
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Clear the shared cache and count the decoding calls"""
+    DECODE_CACHE.clear()
+    calls = {"decompress": 0, "dataframe": 0}
+    decompress_any = utils.decompress_any
+    decode_dataframe = data_editor.decode_dataframe
+
+    def counting_decompress_any(value):
+        calls["decompress"] += 1
+        return decompress_any(value)
+
+    def counting_decode_dataframe(value):
+        calls["dataframe"] += 1
+        return decode_dataframe(value)
+
+    monkeypatch.setattr(utils, "decompress_any", counting_decompress_any)
+    monkeypatch.setattr(data_editor, "decode_dataframe", counting_decode_dataframe)
+    yield calls
+    DECODE_CACHE.clear()
+
+
+def test_lru_eviction():
+    """Test the least recently used values are evicted by size"""
+    cache = DecodeCache(max_bytes=30)
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=10)
+    cache.put("c", 3, size=10)
+    assert cache.get("a") == 1
+    cache.put("d", 4, size=10)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.size == 30
+
+
+def test_fifo_eviction():
+    """Test the oldest values are evicted first with the fifo policy"""
+    cache = DecodeCache(max_bytes=30, policy="fifo")
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=10)
+    cache.put("c", 3, size=10)
+    cache.get("a")
+    cache.put("d", 4, size=10)
+
+    assert "a" not in cache
+    assert "b" in cache
+
+
+def test_size_limits():
+    """Test oversized values are skipped and resizing evicts"""
+    cache = DecodeCache(max_bytes=100)
+    cache.put("big", "x", size=101)
+    assert "big" not in cache
+
+    cache.put("a", 1, size=60)
+    cache.put("b", 2, size=40)
+    cache.resize(50)
+    assert list(cache._entries) == ["b"]
+
+    with pytest.raises(ValueError):
+        DecodeCache(policy="random")
+
+
+def test_hits_and_misses():
+    cache = DecodeCache()
+    assert cache.get_or_decode("k", lambda: "value") == "value"
+    assert cache.get_or_decode("k", lambda: "other") == "value"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_compressed_value_decoded_once(counted):
+    """Test reruns and other sessions reuse the decompressed value"""
+    value = utils.compress_text("a long essay " * 100)
+    for _ in range(2):
+        at = AppTest.from_function(create_compressed_text_area_app)
+        set_query_params(at, {"essay": value})
+        at.run()
+        at.run()
+        assert at.text_area[0].value == "a long essay " * 100
+
+    assert counted["decompress"] == 1
+
+
+def test_data_editor_parsed_once(counted):
+    """Test the table is parsed once and sessions get their own copy"""
+    for _ in range(2):
+        at = AppTest.from_function(create_data_editor_app)
+        set_query_params(at, {"table": '[{"a":5,"b":"q"},{"a":6,"b":"r"}]'})
+        at.run()
+        at.run()
+        df = at.session_state[DATA_KEY]
+        assert df["a"].tolist() == [5, 6]
+        df.loc[0, "a"] = 100
+
+    assert counted["dataframe"] == 1
+
+
+def test_disabled_cache(counted):
+    """Test a size limit of 0 disables caching"""
+    configure_decode_cache(max_bytes=0)
+    try:
+        value = utils.compress_text("text")
+        for _ in range(2):
+            at = AppTest.from_function(create_compressed_text_area_app)
+            set_query_params(at, {"essay": value})
+            at.run()
+    finally:
+        configure_decode_cache(max_bytes=DEFAULT_MAX_BYTES)
+
+    assert counted["decompress"] == 2
@@ -0,0 +1,220 @@
+from datetime import date
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.dataframe_codecs import encode_dataframe
+
+from .utils import get_query_params, set_query_params
+
+
+def create_elide_app():
+    import streamlit_permalink as stp
+    from datetime import date
+
+    stp.enable_elide_defaults()
+    stp.slider("Range", 0, 100, (20, 80), url_key="range")
+    stp.selectbox("Country", ["FR", "DE", "IT"], url_key="country")
+    stp.text_area("Notes", value="hello", url_key="notes", compress=True)
+    stp.date_input("Day", value=date(2024, 1, 1), url_key="day", compact=True)
+    stp.checkbox("Kept", url_key="kept", elide_defaults=False)
+
+
+def create_declared_defaults_app():
+    import streamlit_permalink as stp
+    from datetime import date, time
+
+    stp.enable_elide_defaults()
+    stp.checkbox("Checkbox", url_key="checkbox")
+    stp.toggle("Toggle", value=True, url_key="toggle")
+    stp.text_input("Text", url_key="text")
+    stp.text_area("Area", value="hello", url_key="area")
+    stp.color_picker("Color", url_key="color")
+    stp.number_input("Number", url_key="number")
+    stp.number_input("Int", min_value=3, url_key="int")
+    stp.slider("Slider", 0.0, 1.0, url_key="slider")
+    stp.slider("Range", 0, 100, (20, 80), url_key="range")
+    stp.select_slider("Select slider", ["a", "b", "c"], url_key="select_slider")
+    stp.selectbox("Selectbox", ["FR", "DE"], index=1, url_key="selectbox")
+    stp.selectbox("Empty", ["FR", "DE"], index=None, url_key="empty")
+    stp.radio("Radio", [1, 2, 3], url_key="radio")
+    stp.multiselect("Multiselect", ["a", "b"], default="b", url_key="multiselect")
+    stp.pills("Pills", ["a", "b"], selection_mode="multi", url_key="pills")
+    stp.segmented_control("Segmented", ["a", "b"], default="a", url_key="segmented")
+    stp.date_input("Day", value=date(2024, 1, 1), url_key="day", compact=True)
+    stp.date_input("Today", url_key="today")
+    stp.time_input("Time", value=time(12, 30), url_key="time")
+
+
+def create_widget_option_app():
+    import streamlit_permalink as stp
+
+    stp.checkbox("Elided", url_key="elided", elide_defaults=True)
+    stp.checkbox("Written", url_key="written")
+
+
+def create_form_app():
+    import streamlit_permalink as stp
+
+    stp.enable_elide_defaults()
+    with stp.form("form"):
+        stp.number_input("Number", value=5, url_key="number")
+        stp.text_input("Text", value="a", url_key="text")
+        stp.form_submit_button("Submit")
+
+
+def create_data_editor_app(url_delta=False):
+    import pandas as pd
+    import streamlit as st
+    import streamlit_permalink as stp
+    from streamlit_permalink.handlers.data_editor import data_editor_is_default
+
+    stp.enable_elide_defaults()
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    stp.data_editor(df, url_key="table", url_delta=url_delta)
+    st.session_state["is_default"] = data_editor_is_default("table")
+
+
+def test_first_load_writes_nothing():
+    at = AppTest.from_function(create_elide_app)
+    at.run()
+
+    assert not at.exception
+    assert dict(get_query_params(at)) == {"kept": ["False"]}
+
+
+def test_changes_are_written_and_defaults_removed():
+    at = AppTest.from_function(create_elide_app)
+    at.run()
+
+    at.slider[0].set_range(5, 15).run()
+    at.selectbox[0].select("DE").run()
+    at.date_input[0].set_value(date(2024, 2, 29)).run()
+    params = get_query_params(at)
+    assert params["range"] == ["5", "15"]
+    assert params["country"] == ["DE"]
+    assert params["day"] == ["_dAI8"]
+
+    at.slider[0].set_range(20, 80).run()
+    at.selectbox[0].select("FR").run()
+    at.date_input[0].set_value(date(2024, 1, 1)).run()
+    assert dict(get_query_params(at)) == {"kept": ["False"]}
+    assert at.slider[0].value == (20, 80)
+    assert at.selectbox[0].value == "FR"
+
+
+def test_link_values_back_to_default():
+    """Test a page opened from a link removes values set back to their declared default"""
+    at = AppTest.from_function(create_elide_app)
+    set_query_params(at, {"range": ["5", "15"], "country": "DE", "day": "_dAI8"})
+    at.run()
+    assert not at.exception
+
+    at.slider[0].set_range(20, 80).run()
+    at.selectbox[0].select("FR").run()
+    at.date_input[0].set_value(date(2024, 1, 1)).run()
+    assert dict(get_query_params(at)) == {"kept": ["False"]}
+
+
+def test_declared_defaults_match_rendered_defaults():
+    """Test defaults taken from the widget arguments are the values the widgets render"""
+    at = AppTest.from_function(create_declared_defaults_app)
+    at.run()
+    assert not at.exception
+    rendered = dict(at.session_state["STREAMLIT_PERMALINK_DEFAULT_URL_VALUES"])
+
+    # every widget has a non-default value in the link
+    linked = AppTest.from_function(create_declared_defaults_app)
+    set_query_params(
+        linked,
+        {
+            "checkbox": "True",
+            "toggle": "False",
+            "text": "x",
+            "area": "x",
+            "color": "#ffffff",
+            "number": "5.0",
+            "int": "5",
+            "slider": "0.5",
+            "range": ["1", "2"],
+            "select_slider": "b",
+            "selectbox": "FR",
+            "empty": "FR",
+            "radio": "2",
+            "multiselect": "a",
+            "pills": "a",
+            "segmented": "b",
+            "day": "2024-02-29",
+            "today": "2024-02-29",
+            "time": "13:00",
+        },
+    )
+    linked.run()
+    assert not linked.exception
+    assert dict(linked.session_state["STREAMLIT_PERMALINK_DEFAULT_URL_VALUES"]) == rendered
+
+
+def test_compressed_default_is_not_encoded():
+    at = AppTest.from_function(create_elide_app)
+    at.run()
+
+    at.text_area[0].input("changed").run()
+    assert get_query_params(at)["notes"] != ["changed"]
+    at.text_area[0].input("hello").run()
+    assert "notes" not in get_query_params(at)
+
+
+def test_link_values_load():
+    at = AppTest.from_function(create_elide_app)
+    set_query_params(at, {"range": ["1", "2"], "country": "IT"})
+    at.run()
+
+    assert not at.exception
+    assert at.slider[0].value == (1, 2)
+    assert at.selectbox[0].value == "IT"
+    assert at.text_area[0].value == "hello"
+
+
+def test_widget_option():
+    """Test elide_defaults works per widget without the page mode"""
+    at = AppTest.from_function(create_widget_option_app)
+    at.run()
+
+    assert dict(get_query_params(at)) == {"written": ["False"]}
+    at.checkbox[0].check().run()
+    assert get_query_params(at)["elided"] == ["True"]
+    at.checkbox[0].uncheck().run()
+    assert "elided" not in get_query_params(at)
+
+
+def test_form_submit():
+    at = AppTest.from_function(create_form_app)
+    at.run()
+    assert not get_query_params(at)
+
+    at.number_input[0].set_value(7)
+    at.button[0].click().run()
+    assert dict(get_query_params(at)) == {"number": ["7"]}
+
+    at.number_input[0].set_value(5)
+    at.text_input[0].input("b")
+    at.button[0].click().run()
+    assert dict(get_query_params(at)) == {"text": ["b"]}
+
+
+def test_data_editor_compares_content():
+    for url_delta in (False, True):
+        at = AppTest.from_function(create_data_editor_app, kwargs={"url_delta": url_delta})
+        at.run()
+
+        assert not at.exception
+        assert "table" not in get_query_params(at)
+        assert at.session_state["is_default"]
+
+    other = pd.DataFrame({"a": [1, 2, 4], "b": ["x", "y", "z"]})
+    at = AppTest.from_function(create_data_editor_app)
+    set_query_params(at, {"table": encode_dataframe(other)})
+    at.run()
+
+    assert not at.exception
+    assert not at.session_state["is_default"]
@@ -0,0 +1,115 @@
+import logging
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink import instrumentation
+from streamlit_permalink.utils import compress_text
+
+from .utils import set_query_params
+
+LONG_TEXT = "All work and no play makes Jack a dull boy. " * 50
+
+
+def create_instrumented_app():
+    import streamlit_permalink as stp
+
+    stp.enable_instrumentation()
+    stp.text_area("Essay", value="short", url_key="essay", compress=True)
+    stp.selectbox("Letter", ["a", "b", "c"], url_key="letter")
+
+
+def create_uninstrumented_app():
+    import streamlit_permalink as stp
+
+    stp.checkbox("Check", url_key="check")
+
+
+def create_debug_panel_app():
+    import streamlit_permalink as stp
+
+    stp.enable_instrumentation()
+    stp.checkbox("Check", url_key="check")
+    stp.render_debug_panel(expanded=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    instrumentation.reset_metrics()
+    yield
+    instrumentation.disable_instrumentation()
+    instrumentation.reset_metrics()
+
+
+def test_disabled_by_default():
+    """Test nothing is recorded without enable_instrumentation"""
+    at = AppTest.from_function(create_uninstrumented_app)
+    at.run()
+
+    assert instrumentation.get_widget_metrics() == {}
+
+
+def test_widget_metrics():
+    """Test timings, sizes and cache hits are recorded per widget"""
+    at = AppTest.from_function(create_instrumented_app)
+    set_query_params(at, {"essay": compress_text(LONG_TEXT), "letter": "b"})
+    at.run()
+    at.run()
+
+    metrics = instrumentation.get_widget_metrics()
+    essay, letter = metrics["essay"], metrics["letter"]
+    assert (essay.widget, letter.widget) == ("text_area", "selectbox")
+    assert essay.runs == 2 and essay.sync_skips == 1
+    assert essay.counts["decode"] == 1 and essay.counts["validate"] == 1
+    assert essay.counts["render"] == 2
+    assert essay.cache_hits + essay.cache_misses == 1
+    assert letter.cache_hits + letter.cache_misses == 0
+
+    at.text_area[0].input(LONG_TEXT + "!").run()
+    essay = instrumentation.get_widget_metrics()["essay"]
+    assert essay.counts["encode"] == 1
+    assert essay.raw_bytes == len(LONG_TEXT) + 1
+    assert 0 < essay.url_bytes < essay.raw_bytes
+
+
+def test_callback():
+    """Test callbacks receive every recorded metric"""
+    events = []
+    instrumentation.enable_instrumentation(lambda *event: events.append(event))
+    try:
+        at = AppTest.from_function(create_instrumented_app)
+        set_query_params(at, {"letter": "c"})
+        at.run()
+    finally:
+        instrumentation._callbacks.clear()
+
+    names = {(url_key, metric) for url_key, metric, _ in events}
+    assert ("letter", "validate_seconds") in names
+    assert ("letter", "runs") in names
+    assert ("essay", "url_bytes") in names
+
+
+def test_exports(caplog):
+    """Test the logging and OpenMetrics exports"""
+    at = AppTest.from_function(create_instrumented_app)
+    at.run()
+
+    with caplog.at_level(logging.INFO, logger="streamlit_permalink"):
+        instrumentation.log_metrics()
+    assert any("url_key=essay" in r.message for r in caplog.records)
+
+    text = instrumentation.openmetrics_text()
+    assert '# TYPE streamlit_permalink_runs counter' in text
+    assert 'streamlit_permalink_runs_total{url_key="letter"} 1' in text
+    assert 'streamlit_permalink_seconds_count{url_key="essay",step="render"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_debug_panel():
+    at = AppTest.from_function(create_debug_panel_app)
+    at.run()
+    at.run()
+
+    assert not at.exception
+    assert len(at.expander) == 1
+    assert len(at.table) == 1
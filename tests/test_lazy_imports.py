@@ -0,0 +1,90 @@
+"""Tests that pandas, handler modules and streamlit_option_menu are imported on first use."""
+
+import subprocess
+import sys
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.handlers import HANDLERS
+
+
+def run_python(code):
+    """Run code in a fresh interpreter and return its stdout"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def create_checkbox_app():
+    import streamlit_permalink as stp
+
+    stp.checkbox("Test Checkbox", url_key="check")
+
+
+def test_import_skips_pandas():
+    """Test importing the package doesn't import pandas or handler modules"""
+    output = run_python(
+        "import sys\n"
+        "import streamlit_permalink\n"
+        "print('pandas' in sys.modules, 'streamlit_option_menu' in sys.modules,"
+        " 'streamlit_permalink.handlers.checkbox' in sys.modules)"
+    )
+    assert output == "False False False"
+
+
+def test_handlers_load_on_first_use():
+    """Test handlers are imported when they are looked up"""
+    output = run_python(
+        "import sys\n"
+        "from streamlit_permalink.handlers import HANDLERS\n"
+        "HANDLERS['checkbox']\n"
+        "print('streamlit_permalink.handlers.checkbox' in sys.modules,"
+        " 'streamlit_permalink.handlers.data_editor' in sys.modules, 'pandas' in sys.modules)\n"
+        "HANDLERS['data_editor']\n"
+        "print('pandas' in sys.modules)"
+    )
+    assert output.splitlines() == ["True False False", "True"]
+
+
+def test_lazy_names():
+    """Test the lazily imported names resolve to the same objects"""
+    from streamlit_permalink.handlers import CheckboxHandler
+    from streamlit_permalink.handlers.checkbox import CheckboxHandler as Handler
+    from streamlit_permalink.utils import serialize_df
+    from streamlit_permalink.dataframe_codecs import serialize_df as serialize
+
+    assert CheckboxHandler is Handler is HANDLERS["checkbox"]
+    assert serialize_df is serialize
+    assert "checkbox" in HANDLERS
+    with pytest.raises(KeyError):
+        HANDLERS["unknown_widget"]
+
+
+def test_app_without_data_editor():
+    """Test widgets work through the lazy handler registry"""
+    at = AppTest.from_function(create_checkbox_app)
+    at.query_params["check"] = "True"
+    at.run()
+
+    assert not at.exception
+    assert at.checkbox[0].value is True
+
+
+@pytest.mark.benchmark
+def test_benchmark_import_time(benchmark_report):
+    """Compare the cold import time of streamlit and streamlit_permalink."""
+    timer = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import {module}\n"
+        "print(time.perf_counter() - start)"
+    )
+    runs = 5
+    streamlit = min(float(run_python(timer.format(module="streamlit"))) for _ in range(runs))
+    permalink = min(
+        float(run_python(timer.format(module="streamlit_permalink"))) for _ in range(runs)
+    )
+
+    benchmark_report(f"import streamlit: {streamlit:.3f}s, streamlit_permalink: {permalink:.3f}s")
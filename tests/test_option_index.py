@@ -0,0 +1,153 @@
+"""Tests for the cached option indexes of the option widgets."""
+
+import time as timer
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.utils as utils
+from streamlit_permalink.utils import OptionIndex, get_option_index
+
+from .utils import set_query_params
+
+
+class CountingStr(str):
+    """String counting how often it is hashed"""
+
+    hashes = 0
+
+    def __hash__(self):
+        CountingStr.hashes += 1
+        return super().__hash__()
+
+
+def create_duplicate_options_app():
+    import streamlit_permalink as stp
+
+    stp.selectbox("Duplicates", ["a", "b", "a"], url_key="duplicates")
+
+
+def create_large_selectbox_app():
+    import streamlit_permalink as stp
+
+    options = [f"GENE{i:05d}" for i in range(50_000)]
+    stp.selectbox("Gene", options, url_key="gene")
+    stp.multiselect("Genes", options, url_key="genes")
+
+
+def test_option_index_is_cached():
+    """Test equal options share an index"""
+    assert get_option_index(["a", "b"], "selectbox") is get_option_index(
+        ["a", "b"], "radio"
+    )
+
+
+def test_option_index_keeps_types_apart():
+    """Test options that compare equal but cast to different strings get their own index"""
+    assert get_option_index([1, 2], "selectbox").str_options == ["1", "2"]
+    assert get_option_index([True, 2], "selectbox").str_options == ["True", "2"]
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning")
+@pytest.mark.parametrize(
+    "options",
+    [["a", "b", "c"], [3, 1.5, None, "x"], ["a", "b", "a"], [[1], [2]]],
+)
+def test_option_index_matches_list_index(options):
+    """Test lookups match the str -> option map and list.index"""
+    index = get_option_index(options, "selectbox")
+    options_map = {str(v): v for v in options}
+    for str_value, value in options_map.items():
+        assert str_value in index
+        assert index.values[str_value] == value
+        assert index.index(str_value) == options.index(value)
+    assert "missing" not in index
+
+
+def test_option_index_by_identity():
+    """Test the same options object is found without hashing its content"""
+    options = [CountingStr(option) for option in ("x", "y", "z")]
+    index = get_option_index(options, "selectbox")
+    hashes = CountingStr.hashes
+
+    assert get_option_index(options, "selectbox") is index
+    assert CountingStr.hashes == hashes
+
+    # a new object with equal options falls back to the content key
+    assert get_option_index(list(options), "selectbox") is index
+    options.append("w")
+    assert get_option_index(options, "selectbox").str_options == ["x", "y", "z", "w"]
+
+    # replacing an option keeps the length but is noticed as well
+    options[0] = "q"
+    assert get_option_index(options, "selectbox").str_options == ["q", "y", "z", "w"]
+
+
+def test_duplicate_options_warn_once_per_session():
+    """Test each session is warned once about duplicate options, not once per process"""
+    with pytest.warns(UserWarning) as record:
+        for _ in range(2):
+            at = AppTest.from_function(create_duplicate_options_app)
+            at.run()
+            at.run()
+            assert not at.exception
+
+    assert len([w for w in record if "Duplicate values" in str(w.message)]) == 2
+
+
+def test_option_index_validates():
+    """Test invalid options raise the same errors as before"""
+    with pytest.raises(ValueError):
+        get_option_index([], "selectbox")
+    with pytest.raises(ValueError):
+        get_option_index(None, "selectbox")
+    with pytest.raises(ValueError):
+        get_option_index([1, "1"], "selectbox")
+
+
+def test_large_options_are_validated_once(monkeypatch):
+    """Test reruns with the same options skip validation"""
+    calls = []
+    validate = utils._validate_multi_options
+
+    def counting_validate(*args, **kwargs):
+        calls.append(args[1])
+        return validate(*args, **kwargs)
+
+    monkeypatch.setattr(utils, "_validate_multi_options", counting_validate)
+
+    at = AppTest.from_function(create_large_selectbox_app)
+    set_query_params(at, {"gene": "GENE04242", "genes": ["GENE00001", "GENE49999"]})
+    at.run(timeout=30)
+    at.run(timeout=30)
+
+    assert not at.exception
+    assert at.selectbox[0].value == "GENE04242"
+    assert at.multiselect[0].value == ["GENE00001", "GENE49999"]
+    assert len(calls) <= 1
+
+
+@pytest.mark.benchmark
+def test_benchmark_option_index(benchmark_report):
+    """Compare a cached lookup with validating and mapping the options on every rerun."""
+    options = [f"GENE{i:05d}" for i in range(50_000)]
+    value = "GENE49999"
+
+    start = timer.perf_counter()
+    str_options = utils._validate_multi_options(options, "selectbox")
+    assert value in str_options
+    options_map = {str(v): v for v in options}
+    legacy_index = options.index(options_map[value])
+    legacy = timer.perf_counter() - start
+
+    OptionIndex(options, "selectbox")  # warm up
+    get_option_index(options, "selectbox").index(value)
+    start = timer.perf_counter()
+    index = get_option_index(options, "selectbox")
+    assert value in index
+    cached_index = index.index(value)
+    cached = timer.perf_counter() - start
+
+    benchmark_report(f"50k options: {legacy * 1e3:.1f}ms -> {cached * 1e3:.1f}ms ({legacy / cached:.0f}x)")
+    assert cached_index == legacy_index
+    assert cached < legacy
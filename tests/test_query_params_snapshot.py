@@ -0,0 +1,95 @@
+import pytest
+from streamlit.runtime.state.query_params_proxy import QueryParamsProxy
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.query_params as query_params
+
+from .utils import get_query_params, set_query_params
+
+
+def create_many_widgets_app():
+    import streamlit_permalink as stp
+
+    for i in range(20):
+        stp.checkbox(f"Checkbox {i}", url_key=f"check_{i}")
+
+
+def create_direct_write_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    stp.checkbox("First", url_key="first")
+    st.query_params["second"] = "True"
+    stp.checkbox("Second", url_key="second")
+
+
+def create_compare_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    st.session_state["snapshot"] = stp.get_query_params()
+    st.session_state["expected"] = {
+        k: st.query_params.get_all(k) for k in st.query_params.keys()
+    }
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count the query string parses and direct query param lookups"""
+    calls = {"parse": 0, "get_all": 0}
+    parse_qs = query_params.parse_qs
+    get_all = QueryParamsProxy.get_all
+
+    def counting_parse_qs(*args, **kwargs):
+        calls["parse"] += 1
+        return parse_qs(*args, **kwargs)
+
+    def counting_get_all(self, key):
+        calls["get_all"] += 1
+        return get_all(self, key)
+
+    monkeypatch.setattr(query_params, "parse_qs", counting_parse_qs)
+    monkeypatch.setattr(QueryParamsProxy, "get_all", counting_get_all)
+    return calls
+
+
+def test_single_parse_per_run(parses):
+    """Test N widgets cost a single parse of the query string"""
+    at = AppTest.from_function(create_many_widgets_app)
+    set_query_params(at, {f"check_{i}": str(i % 2 == 0) for i in range(20)})
+    at.run()
+
+    assert not at.exception
+    assert [c.value for c in at.checkbox] == [i % 2 == 0 for i in range(20)]
+    assert parses == {"parse": 1, "get_all": 0}
+
+
+def test_snapshot_sees_own_writes():
+    """Test widgets see the values written by earlier widgets"""
+    at = AppTest.from_function(create_many_widgets_app)
+    at.run()
+
+    assert get_query_params(at) == {f"check_{i}": ["False"] for i in range(20)}
+
+
+def test_snapshot_sees_app_writes():
+    """Test writes made with st.query_params invalidate the snapshot"""
+    at = AppTest.from_function(create_direct_write_app)
+    at.run()
+
+    assert not at.exception
+    assert at.checkbox[0].value is False
+    assert at.checkbox[1].value is True
+
+
+def test_snapshot_matches_query_params():
+    """Test the snapshot holds the same values as st.query_params"""
+    at = AppTest.from_function(create_compare_app)
+    set_query_params(
+        at, {"multi": ["a", "b"], "blank": "", "text": "a b&c", "embed": "true"}
+    )
+    at.run()
+
+    assert not at.exception
+    assert at.session_state["snapshot"] == at.session_state["expected"]
+    assert at.session_state["snapshot"]["multi"] == ["a", "b"]
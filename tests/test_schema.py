@@ -0,0 +1,218 @@
+from datetime import date
+import pickle
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.exceptions import UrlParamError
+from streamlit_permalink.schema import Field, PermalinkSchema
+from streamlit_permalink.state_store import MemoryStore
+
+
+def page_schema():
+    return PermalinkSchema(
+        {
+            "country": Field(options=["FR", "DE", "IT"]),
+            "range": Field(int, min_value=0, max_value=100, is_range=True),
+            "tags": Field(options=["a", "b", 3], multiple=True),
+            "active": Field(bool),
+            "notes": Field(str, compress=True),
+            "day": Field(date, compact=True),
+        }
+    )
+
+
+def create_schema_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+    from datetime import date
+
+    schema = stp.PermalinkSchema(
+        {
+            "country": stp.Field(options=["FR", "DE", "IT"]),
+            "range": stp.Field(int, min_value=0, max_value=100, is_range=True),
+            "tags": stp.Field(options=["a", "b", 3], multiple=True),
+            "active": stp.Field(bool),
+            "notes": stp.Field(str, compress=True),
+            "day": stp.Field(date, compact=True),
+        }
+    )
+    schema.activate()
+    st.session_state["values"] = schema.read_all()
+
+    stp.selectbox("Country", ["FR", "DE", "IT"], url_key="country")
+    stp.slider("Range", 0, 100, (20, 80), url_key="range")
+    stp.multiselect("Tags", ["a", "b", 3], default=["a"], url_key="tags")
+    stp.checkbox("Active", url_key="active")
+    stp.text_area("Notes", url_key="notes")
+    stp.date_input("Day", value=date(2024, 1, 1), url_key="day")
+
+
+VALUES = {
+    "country": "IT",
+    "range": (10, 30),
+    "tags": ["b", 3],
+    "active": True,
+    "notes": "héllo wörld",
+    "day": date(2024, 2, 29),
+}
+
+
+def test_encode_decode():
+    schema = page_schema()
+    query = schema.encode(VALUES)
+
+    assert "day=_dAI8" in query
+    assert schema.decode(query) == VALUES
+    assert schema.decode("country=DE")["range"] is None
+
+
+def test_decode_errors():
+    schema = page_schema()
+
+    for query in (
+        "country=XX",
+        "range=50&range=10",
+        "range=10&range=200",
+        "range=10",
+        "tags=c",
+        "active=yes",
+        "country=FR&country=DE",
+        "country=_STREAMLIT_PERMALINK_NONE",
+    ):
+        with pytest.raises(UrlParamError):
+            schema.decode(query)
+
+
+def test_validate():
+    field = Field(int, min_value=0, nullable=True).compile("n")
+
+    assert field.validate(5) == 5
+    assert field.validate(None) is None
+    with pytest.raises(ValueError, match="less than"):
+        field.validate(-1)
+    with pytest.raises(ValueError, match="Expected int"):
+        field.validate(True)
+    with pytest.raises(ValueError, match="Expected int"):
+        field.encode("5")
+    assert Field(float).compile("f").encode(1) == "1"
+    with pytest.raises(ValueError, match="Unsupported field type"):
+        Field(list)
+    with pytest.raises(ValueError, match="both multiple and a range"):
+        Field(int, multiple=True, is_range=True)
+
+
+def test_read_is_cached():
+    field = Field(options=["a", "b"], multiple=True).compile("cached_tags")
+
+    first = field.read(["a", "b"])
+    first.append("c")
+    assert field.read(["a", "b"]) == ["a", "b"]
+
+
+def test_schemas_sharing_a_url_key():
+    """Test cached values of one schema are not returned for another field with the same key"""
+    first = PermalinkSchema({"shared": Field(int)})
+    bounded = PermalinkSchema({"shared": Field(int, max_value=3)})
+    floats = PermalinkSchema({"shared": Field(float)})
+
+    assert first.fields["shared"].read(["5"]) == 5
+    with pytest.raises(UrlParamError):
+        bounded.fields["shared"].read(["5"])
+    value = floats.fields["shared"].read(["5"])
+    assert value == 5.0 and type(value) is float
+    assert PermalinkSchema({"shared": Field(int)}).fields["shared"].read(["5"]) == 5
+
+
+def test_pickle():
+    schema = pickle.loads(pickle.dumps(page_schema()))
+
+    assert schema.decode(page_schema().encode(VALUES)) == VALUES
+    assert schema.fields["day"].url_key == "day"
+
+    stored = PermalinkSchema({"essay": Field(str, store=MemoryStore())})
+    query = stored.encode({"essay": "x" * 1000})
+    assert "essay=~" in query
+    assert pickle.loads(pickle.dumps(stored)).decode(query) == {"essay": "x" * 1000}
+
+
+def test_app_reads_schema_values():
+    """Test widgets and read_all use the schema's fields"""
+    at = AppTest.from_function(create_schema_app)
+    schema = page_schema()
+    for url_key, value in VALUES.items():
+        at.query_params[url_key] = schema.fields[url_key].encode(value)
+    at.run()
+
+    assert not at.exception
+    assert at.session_state["values"] == VALUES
+    assert at.selectbox[0].value == "IT"
+    assert at.slider[0].value == (10, 30)
+    assert at.multiselect[0].value == ["b", 3]
+    assert at.checkbox[0].value is True
+    assert at.text_area[0].value == "héllo wörld"
+    assert at.date_input[0].value == date(2024, 2, 29)
+
+
+def test_app_writes_with_schema_codecs():
+    """Test widgets write their URL values with the codecs of their fields"""
+    at = AppTest.from_function(create_schema_app)
+    at.run()
+
+    assert at.session_state["values"] == dict.fromkeys(VALUES)
+    at.text_area[0].input("notes").run()
+    at.date_input[0].set_value(date(2024, 2, 29)).run()
+
+    assert at.query_params["day"] == ["_dAI8"]
+    assert at.query_params["notes"] != ["notes"]
+    assert page_schema().decode(
+        "&".join(f"{k}={v}" for k, values in at.query_params.items() for v in values)
+    ) == {
+        "country": "FR",
+        "range": (20, 80),
+        "tags": ["a"],
+        "active": False,
+        "notes": "notes",
+        "day": date(2024, 2, 29),
+    }
+
+
+def test_app_invalid_value():
+    at = AppTest.from_function(create_schema_app)
+    at.query_params["range"] = ["10", "200"]
+    at.run()
+
+    assert at.exception
+
+
+def create_bounded_app():
+    import streamlit_permalink as stp
+    from datetime import date
+
+    stp.PermalinkSchema(
+        {
+            "slider": stp.Field(int, min_value=0, max_value=100),
+            "number": stp.Field(float),
+            "day": stp.Field(date),
+        }
+    ).activate()
+    stp.slider("Slider", 0, 50, 10, url_key="slider")
+    stp.number_input("Number", 0.0, 1.0, 0.5, url_key="number")
+    stp.date_input("Day", date(2024, 1, 1), min_value=date(2024, 1, 1), url_key="day")
+
+
+def test_app_checks_widget_bounds():
+    """Test schema values are still checked against the widgets' own bounds"""
+    for params in ({"slider": "80"}, {"number": "2.5"}, {"day": "2023-12-31"}):
+        at = AppTest.from_function(create_bounded_app)
+        at.query_params.update(params)
+        at.run()
+        assert at.exception
+
+    at = AppTest.from_function(create_bounded_app)
+    at.query_params.update({"slider": "40", "number": "0.25", "day": "2024-06-01"})
+    at.run()
+    assert not at.exception
+    assert at.slider[0].value == 40
+    assert at.number_input[0].value == 0.25
+    assert at.date_input[0].value == date(2024, 6, 1)
@@ -0,0 +1,156 @@
+"""Tests for the column-wise data_editor serialization in streamlit_permalink."""
+
+import time as timer
+from datetime import date, datetime, time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_permalink.constants import (
+    DATAEDITOR_DATE_VALUE_PREFIX,
+    DATAEDITOR_DATETIME_VALUE_PREFIX,
+    DATAEDITOR_TIME_VALUE_PREFIX,
+)
+from streamlit_permalink.handlers.data_editor import fix_datetime_columns
+from streamlit_permalink.utils import serialize_df
+
+
+def legacy_serialize_df(df):
+    """Per-cell reference implementation the URL output must stay identical to."""
+    result = df.copy(deep=True)
+    for col in df.columns:
+        for idx in result.index:
+            value = result.at[idx, col]
+            if isinstance(value, date) and not isinstance(value, datetime):
+                result.at[idx, col] = f"{DATAEDITOR_DATE_VALUE_PREFIX}{value.isoformat()}"
+            elif isinstance(value, datetime):
+                result.at[idx, col] = f"{DATAEDITOR_DATETIME_VALUE_PREFIX}{value.isoformat()}"
+            elif isinstance(value, time):
+                result.at[idx, col] = f"{DATAEDITOR_TIME_VALUE_PREFIX}{value.strftime('%H:%M')}"
+    return result.to_json(orient="records")
+
+
+def legacy_fix_datetime_columns(df):
+    """Per-cell reference implementation of fix_datetime_columns."""
+    df = df.copy(deep=True)
+    for col in df.columns:
+        for idx in df.index:
+            value = df.at[idx, col]
+            if isinstance(value, str):
+                if value.startswith(DATAEDITOR_DATE_VALUE_PREFIX):
+                    df.at[idx, col] = pd.to_datetime(
+                        value.replace(DATAEDITOR_DATE_VALUE_PREFIX, "")
+                    ).date()
+                elif value.startswith(DATAEDITOR_DATETIME_VALUE_PREFIX):
+                    df.at[idx, col] = pd.to_datetime(
+                        value.replace(DATAEDITOR_DATETIME_VALUE_PREFIX, "")
+                    )
+                elif value.startswith(DATAEDITOR_TIME_VALUE_PREFIX):
+                    df.at[idx, col] = pd.to_datetime(
+                        value.replace(DATAEDITOR_TIME_VALUE_PREFIX, ""), format="%H:%M"
+                    ).time()
+    return df
+
+
+def make_df(rows):
+    return pd.DataFrame(
+        {
+            "int": np.arange(rows),
+            "float": np.arange(rows) / 3,
+            "str": [f"row {i}" for i in range(rows)],
+            "date": [date(2024, 1, 1 + i % 28) for i in range(rows)],
+            "datetime": pd.date_range("2024-01-01", periods=rows, freq="37min"),
+            "time": [time(i % 24, i % 60) for i in range(rows)],
+            "mixed": [
+                None if i % 3 == 0 else date(2024, 2, 1) if i % 3 == 1 else "x"
+                for i in range(rows)
+            ],
+        }
+    )
+
+
+def make_edge_case_df():
+    df = make_df(20)
+    df.loc[3, "datetime"] = pd.NaT
+    df.loc[4, "datetime"] = pd.Timestamp("2024-01-01 00:00:00.25")
+    df["utc"] = pd.date_range("2024-01-01", periods=20, freq="h", tz="UTC")
+    df["object_nat"] = [pd.NaT if i % 2 else "a" for i in range(20)]
+    df["offsets"] = [
+        pd.Timestamp("2024-01-01", tz="UTC"),
+        pd.Timestamp("2024-01-01", tz="US/Eastern"),
+    ] * 10
+    return df
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_serialize_df_matches_legacy_output():
+    """The URL output is byte-identical to the per-cell implementation."""
+    df = make_edge_case_df()
+    assert serialize_df(df) == legacy_serialize_df(df)
+
+
+def test_serialize_df_does_not_modify_input():
+    df = make_df(5)
+    expected = df.copy(deep=True)
+    serialize_df(df)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_fix_datetime_columns_matches_legacy():
+    """Parsed frames match the per-cell implementation, dtypes included."""
+    raw = pd.read_json(
+        StringIO(legacy_serialize_df(make_edge_case_df())), orient="records"
+    )
+    expected = legacy_fix_datetime_columns(raw)
+    result = fix_datetime_columns(raw)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_round_trip():
+    df = make_df(10)
+    raw = pd.read_json(StringIO(serialize_df(df)), orient="records")
+    result = fix_datetime_columns(raw)
+    assert result["date"].tolist() == df["date"].tolist()
+    assert result["time"].tolist() == df["time"].tolist()
+    assert result["datetime"].tolist() == df["datetime"].tolist()
+    assert result["mixed"].tolist() == df["mixed"].tolist()
+    assert serialize_df(result) == serialize_df(df)
+
+
+@pytest.mark.benchmark
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+@pytest.mark.parametrize("rows", [1_000, 10_000, 100_000])
+def test_benchmark_serialize_df(rows, benchmark_report):
+    """Compare the column-wise engine with the per-cell implementation."""
+    df = make_df(rows)
+
+    start = timer.perf_counter()
+    expected = legacy_serialize_df(df)
+    legacy_encode = timer.perf_counter() - start
+
+    start = timer.perf_counter()
+    result = serialize_df(df)
+    encode = timer.perf_counter() - start
+
+    assert result == expected
+
+    raw = pd.read_json(StringIO(result), orient="records")
+
+    start = timer.perf_counter()
+    legacy_fix_datetime_columns(raw)
+    legacy_decode = timer.perf_counter() - start
+
+    start = timer.perf_counter()
+    fix_datetime_columns(raw)
+    decode = timer.perf_counter() - start
+
+    benchmark_report(
+        f"{rows} rows: serialize_df {legacy_encode:.3f}s -> {encode:.3f}s "
+        f"({legacy_encode / encode:.0f}x), fix_datetime_columns {legacy_decode:.3f}s "
+        f"-> {decode:.3f}s ({legacy_decode / decode:.0f}x)"
+    )
+    assert encode < legacy_encode
+    assert decode < legacy_decode
@@ -0,0 +1,189 @@
+"""Tests for replaying the last sync when the URL value didn't change."""
+
+import time as timer
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.handlers.handler as handler_module
+from streamlit_permalink.handlers.checkbox import CheckboxHandler
+from streamlit_permalink.handlers.handler import WidgetHandler
+from streamlit_permalink.handlers.selectbox import SelectboxHandler
+
+from .utils import get_query_params, set_query_params
+
+
+def create_checkbox_app():
+    import streamlit_permalink as stp
+
+    stp.checkbox("Test Checkbox", url_key="check")
+
+
+def create_selectbox_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    options = list(range(st.session_state.get("n", 3)))
+    stp.selectbox("Test Selectbox", options, url_key="select")
+
+
+def create_shared_options_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    options = st.session_state.setdefault("options", list(range(1000)))
+    if st.session_state.get("mutate"):
+        options.append(len(options))
+    if st.session_state.pop("replace", False):
+        options[0] = -1
+    stp.selectbox("Test Selectbox", options, url_key="select")
+
+
+def create_accept_new_options_app():
+    import streamlit_permalink as stp
+
+    stp.selectbox("Test Selectbox", ["a", "b"], url_key="select", accept_new_options=True)
+
+
+def create_many_widgets_app():
+    import streamlit_permalink as stp
+
+    for i in range(200):
+        stp.selectbox(f"Select {i}", ["a", "b", "c"], url_key=f"select_{i}")
+
+
+def count_syncs(monkeypatch, handler):
+    calls = []
+    sync = handler.sync_query_params
+
+    def counting_sync(self):
+        calls.append(self.url_key)
+        sync(self)
+
+    monkeypatch.setattr(handler, "sync_query_params", counting_sync)
+    return calls
+
+
+def test_rerun_skips_sync(monkeypatch):
+    """Test an unchanged URL value is not parsed again"""
+    syncs = count_syncs(monkeypatch, CheckboxHandler)
+    at = AppTest.from_function(create_checkbox_app)
+    set_query_params(at, {"check": "True"})
+    at.run()
+    at.run()
+    at.run()
+
+    assert not at.exception
+    assert at.checkbox[0].value is True
+    assert len(syncs) == 1
+
+
+def test_changed_url_value_syncs(monkeypatch):
+    """Test a new URL value is parsed"""
+    syncs = count_syncs(monkeypatch, CheckboxHandler)
+    at = AppTest.from_function(create_checkbox_app)
+    set_query_params(at, {"check": "True"})
+    at.run()
+    at.checkbox[0].uncheck().run()
+
+    assert get_query_params(at)["check"] == ["False"]
+    assert at.checkbox[0].value is False
+
+    set_query_params(at, {"check": "True"})
+    at.run()
+    assert len(syncs) == 3
+
+
+def test_changed_arguments_sync(monkeypatch):
+    """Test the URL value is parsed again when the widget arguments change"""
+    syncs = count_syncs(monkeypatch, SelectboxHandler)
+    at = AppTest.from_function(create_selectbox_app)
+    set_query_params(at, {"select": "2"})
+    at.run()
+    at.run()
+    assert len(syncs) == 1
+
+    at.session_state["n"] = 5
+    at.run()
+    assert len(syncs) == 2
+    assert at.selectbox[0].value == 2
+
+
+def test_same_options_are_not_hashed(monkeypatch):
+    """Test options passed as the same object are compared by identity, not content"""
+    freezes = []
+    freeze = handler_module._freeze_arguments
+
+    def counting_freeze(arguments):
+        freezes.append(1)
+        return freeze(arguments)
+
+    monkeypatch.setattr(handler_module, "_freeze_arguments", counting_freeze)
+    syncs = count_syncs(monkeypatch, SelectboxHandler)
+    at = AppTest.from_function(create_shared_options_app)
+    set_query_params(at, {"select": "500"})
+    at.run()
+    at.run()
+    at.run()
+
+    assert at.selectbox[0].value == 500
+    assert len(syncs) == 1
+    assert len(freezes) == 1
+
+    # appending in place changes the length and is noticed
+    at.session_state["mutate"] = True
+    at.run()
+    assert len(syncs) == 2
+
+
+def test_options_replaced_in_place_sync(monkeypatch):
+    """Test replacing an item of the same options list is noticed although the length is unchanged"""
+    syncs = count_syncs(monkeypatch, SelectboxHandler)
+    at = AppTest.from_function(create_shared_options_app)
+    set_query_params(at, {"select": "500"})
+    at.run()
+    at.run()
+    assert len(syncs) == 1
+
+    at.session_state["replace"] = True
+    at.run()
+    assert len(syncs) == 2
+    assert at.selectbox[0].options[0] == "-1"
+    assert at.selectbox[0].value == 500
+
+    at.run()
+    assert len(syncs) == 2
+
+
+def test_side_effects_always_sync(monkeypatch):
+    """Test handlers that add URL options to the widget always sync"""
+    syncs = count_syncs(monkeypatch, SelectboxHandler)
+    at = AppTest.from_function(create_accept_new_options_app)
+    set_query_params(at, {"select": "c"})
+    at.run()
+    at.run()
+
+    assert not at.exception
+    assert at.selectbox[0].value == "c"
+    assert len(syncs) == 2
+
+
+@pytest.mark.benchmark
+def test_benchmark_skip_sync(monkeypatch, benchmark_report):
+    """Compare reruns of a 200-widget page with and without replaying the last sync."""
+
+    def measure():
+        at = AppTest.from_function(create_many_widgets_app)
+        set_query_params(at, {f"select_{i}": "b" for i in range(200)})
+        at.run()
+        start = timer.perf_counter()
+        for _ in range(5):
+            at.run()
+        assert not at.exception
+        return (timer.perf_counter() - start) / 5
+
+    after = measure()
+    monkeypatch.setattr(WidgetHandler, "can_skip_sync", property(lambda self: False))
+    before = measure()
+
+    benchmark_report(f"200-widget rerun: {before:.3f}s -> {after:.3f}s")
@@ -0,0 +1,127 @@
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.query_params as query_params
+from streamlit_permalink.query_params import decode_state_blob, encode_state_blob
+from streamlit_permalink.utils import compress_text
+
+from .utils import get_query_params, set_query_params
+
+
+def create_state_blob_app():
+    import streamlit_permalink as stp
+
+    stp.enable_state_blob()
+    stp.checkbox("Test Checkbox", url_key="check")
+    stp.text_input("Test Text", value="hello", url_key="text")
+    stp.multiselect("Test Multi", options=["a", "b", "c"], default=["a", "b"], url_key="multi")
+
+
+def create_uncompressed_state_blob_app():
+    import streamlit_permalink as stp
+
+    stp.enable_state_blob(param="state", compress=False)
+    stp.checkbox("Test Checkbox", url_key="check")
+
+
+def get_state(at, param="s"):
+    return decode_state_blob(get_query_params(at)[param][0])
+
+
+def test_state_blob_url_init():
+    """Test all widgets of the first load are written to a single parameter when the run ends"""
+    at = AppTest.from_function(create_state_blob_app)
+    at.run()
+
+    assert not at.exception
+    assert list(get_query_params(at)) == ["s"]
+    assert get_state(at) == {"check": "False", "text": "hello", "multi": ["a", "b"]}
+    at.run()
+    assert get_state(at) == {"check": "False", "text": "hello", "multi": ["a", "b"]}
+
+
+def test_state_blob_encoded_once_per_run(monkeypatch):
+    """Test the blob is encoded once per run, not once per widget"""
+    encodes = []
+    encode = query_params.encode_state_blob
+
+    def counting_encode(*args, **kwargs):
+        encodes.append(args)
+        return encode(*args, **kwargs)
+
+    monkeypatch.setattr(query_params, "encode_state_blob", counting_encode)
+    at = AppTest.from_function(create_state_blob_app)
+    at.run()
+    assert len(encodes) == 1
+
+    at.run()
+    assert len(encodes) == 1
+    at.checkbox[0].check().run()
+    assert len(encodes) == 2
+    at.run()
+    assert len(encodes) == 2
+    assert get_state(at)["check"] == "True"
+
+
+def test_state_blob_url_value():
+    """Test widgets are set from the blob"""
+    at = AppTest.from_function(create_state_blob_app)
+    set_query_params(at, {"s": encode_state_blob({"check": "True", "multi": ["c"]})})
+    at.run()
+
+    assert not at.exception
+    assert at.checkbox[0].value is True
+    assert at.text_input[0].value == "hello"
+    assert at.multiselect[0].value == ["c"]
+    at.run()
+    assert get_state(at)["text"] == "hello"
+
+
+def test_state_blob_interaction_updates_url():
+    """Test widget changes are written to the blob"""
+    at = AppTest.from_function(create_state_blob_app)
+    at.run()
+    at.checkbox[0].check().run()
+    at.text_input[0].input("world").run()
+
+    assert at.checkbox[0].value is True
+    assert get_state(at) == {"check": "True", "text": "world", "multi": ["a", "b"]}
+
+
+def test_state_blob_reads_single_params():
+    """Test links with one parameter per widget keep working"""
+    at = AppTest.from_function(create_state_blob_app)
+    set_query_params(at, {"check": "True"})
+    at.run()
+
+    assert at.checkbox[0].value is True
+    at.run()
+    assert get_query_params(at)["check"] == ["True"]
+    assert "check" not in get_state(at)
+
+
+def test_state_blob_uncompressed():
+    """Test the blob parameter name and compression can be changed"""
+    at = AppTest.from_function(create_uncompressed_state_blob_app)
+    at.run()
+    at.run()
+
+    assert get_query_params(at)["state"] == ['1.n.{"check":"False"}']
+
+
+def test_state_blob_invalid():
+    """Test an unreadable blob raises an error"""
+    at = AppTest.from_function(create_state_blob_app)
+    set_query_params(at, {"s": "2.abc"})
+    at.run()
+
+    assert at.exception
+
+
+def test_state_blob_is_smaller():
+    """Test compressing all values together beats compressing each value"""
+    state = {f"option_{i}": ["alpha", "beta", "gamma"] for i in range(20)}
+    blob = encode_state_blob(state, True)
+    separate = sum(
+        len(key) + sum(len(compress_text(v)) for v in values) for key, values in state.items()
+    )
+    assert len(blob) < separate / 4
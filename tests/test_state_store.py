@@ -0,0 +1,237 @@
+import pickle
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.state_store import (
+    TOKEN_PREFIX,
+    MemoryStore,
+    RedisStore,
+    SQLiteStore,
+    escape_inline_value,
+    get_state_store,
+    is_token,
+    make_token,
+    unescape_inline_value,
+)
+from streamlit_permalink.utils import decompress_text
+
+from .utils import get_query_params, set_query_params
+
+LONG_TEXT = "All work and no play makes Jack a dull boy. " * 200
+
+
+def create_stored_text_area_app():
+    import streamlit_permalink as stp
+
+    stp.text_area("Essay", value="short", url_key="essay", store=True)
+
+
+def create_stored_compressed_text_area_app():
+    import streamlit_permalink as stp
+
+    stp.text_area("Essay", value="short", url_key="essay", store=True, compress=True)
+
+
+def create_stored_data_editor_app():
+    import pandas as pd
+    import streamlit_permalink as stp
+
+    df = pd.DataFrame({"a": list(range(100)), "b": ["x"] * 100})
+    stp.data_editor(df, url_key="table", store=True)
+
+
+class FakeRedis:
+    """Minimal Redis client keeping values as bytes, like redis-py"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode("utf-8")
+        self.expiry[key] = ex
+
+
+def test_token():
+    """Test tokens are short, URL-safe and content-addressed"""
+    token = get_state_store(MemoryStore()).save(LONG_TEXT)
+    assert is_token(token)
+    assert len(token) == 17
+    assert token == f"{TOKEN_PREFIX}{make_token(LONG_TEXT)}"
+    assert not is_token(f"{TOKEN_PREFIX}short")
+    assert not is_token(LONG_TEXT)
+
+
+def test_inline_value_escape():
+    """Test values kept in the URL are never read as tokens"""
+    for value in ("~Yk3pQ0m1rT9aZxVe", "~~x", "~", "plain"):
+        escaped = escape_inline_value(value)
+        assert not is_token(escaped)
+        assert unescape_inline_value(escaped) == value
+    assert escape_inline_value("plain") == "plain"
+
+
+def test_memory_store_lru():
+    """Test the in-memory store evicts the least recently used value"""
+    store = MemoryStore(max_items=2)
+    first = store.save("first")
+    second = store.save("second")
+    store.load(first)
+    store.save("third")
+
+    assert len(store) == 2
+    assert store.load(first) == "first"
+    with pytest.raises(ValueError):
+        store.load(second)
+
+
+def test_sqlite_store(tmp_path):
+    """Test values survive reopening the database"""
+    path = str(tmp_path / "state.db")
+    store = SQLiteStore(path)
+    token = store.save(LONG_TEXT)
+    store.save(LONG_TEXT)
+    store.close()
+
+    reopened = SQLiteStore(path)
+    assert reopened.load(token) == LONG_TEXT
+    reopened.close()
+
+
+def test_pickle(tmp_path):
+    """Test stores are rebuilt with their own locks and connection when unpickled"""
+    store = MemoryStore()
+    token = store.save(LONG_TEXT)
+    copy = pickle.loads(pickle.dumps(store))
+    assert copy.load(token) == LONG_TEXT
+    assert copy.save("other") != token
+
+    store = SQLiteStore(str(tmp_path / "state.db"))
+    token = store.save(LONG_TEXT)
+    copy = pickle.loads(pickle.dumps(store))
+    assert copy.load(token) == LONG_TEXT
+    store.close()
+    copy.close()
+
+
+def test_redis_store():
+    """Test the Redis store against a fake client"""
+    client = FakeRedis()
+    store = RedisStore(client, prefix="app:", ttl=60)
+    token = store.save(LONG_TEXT)
+
+    key = f"app:{token[len(TOKEN_PREFIX):]}"
+    assert list(client.values) == [key]
+    assert client.expiry[key] == 60
+    assert RedisStore(client, prefix="app:").load(token) == LONG_TEXT
+
+
+def test_loads_are_cached():
+    """Test repeat loads of a token don't hit the backend"""
+    client = FakeRedis()
+    token = RedisStore(client).save(LONG_TEXT)
+
+    store = RedisStore(client)
+    for _ in range(5):
+        assert store.load(token) == LONG_TEXT
+    assert client.gets == 1
+
+
+def test_stored_widget_url_init():
+    """Test values no longer than a token are kept in the URL"""
+    store = get_state_store(True)
+    stored = len(store)
+    at = AppTest.from_function(create_stored_text_area_app)
+    at.run()
+
+    assert not at.exception
+    assert get_query_params(at)["essay"] == ["short"]
+    assert len(store) == stored
+
+
+def test_stored_widget_url_value():
+    """Test a token in the URL restores the stored value"""
+    token = get_state_store(True).save(LONG_TEXT)
+    at = AppTest.from_function(create_stored_text_area_app)
+    set_query_params(at, {"essay": token})
+    at.run()
+
+    assert not at.exception
+    assert at.text_area[0].value == LONG_TEXT
+
+
+def test_stored_widget_interaction_updates_url():
+    """Test a changed value gets a new token"""
+    at = AppTest.from_function(create_stored_text_area_app)
+    at.run()
+    at.text_area[0].input(LONG_TEXT).run()
+
+    token = get_query_params(at)["essay"][0]
+    assert len(token) == len(TOKEN_PREFIX) + 16
+    assert get_state_store(True).load(token) == LONG_TEXT
+
+
+def test_stored_widget_reads_plain_values():
+    """Test links created before the store was enabled keep working"""
+    at = AppTest.from_function(create_stored_text_area_app)
+    set_query_params(at, {"essay": "plain text"})
+    at.run()
+
+    assert not at.exception
+    assert at.text_area[0].value == "plain text"
+
+
+def test_stored_widget_short_value_like_a_token():
+    """Test a short value shaped like a token is escaped in the URL and read back as it is"""
+    at = AppTest.from_function(create_stored_text_area_app)
+    at.run()
+    at.text_area[0].input("~Yk3pQ0m1rT9aZxVe").run()
+
+    assert get_query_params(at)["essay"] == ["~~Yk3pQ0m1rT9aZxVe"]
+
+    at = AppTest.from_function(create_stored_text_area_app)
+    set_query_params(at, {"essay": "~~Yk3pQ0m1rT9aZxVe"})
+    at.run()
+
+    assert not at.exception
+    assert at.text_area[0].value == "~Yk3pQ0m1rT9aZxVe"
+
+
+def test_stored_widget_unknown_token():
+    """Test an unknown token raises an error"""
+    at = AppTest.from_function(create_stored_text_area_app)
+    set_query_params(at, {"essay": f"{TOKEN_PREFIX}AAAAAAAAAAAAAAAA"})
+    at.run()
+
+    assert at.exception
+
+
+def test_stored_compressed_value():
+    """Test compressed values are compressed before they are stored"""
+    at = AppTest.from_function(create_stored_compressed_text_area_app)
+    at.run()
+
+    stored = get_state_store(True).load(get_query_params(at)["essay"][0])
+    assert decompress_text(stored) == "short"
+
+
+def test_stored_data_editor():
+    """Test a data editor table is kept in the store"""
+    at = AppTest.from_function(create_stored_data_editor_app)
+    at.run()
+
+    assert not at.exception
+    token = get_query_params(at)["table"][0]
+    assert is_token(token)
+    assert get_state_store(True).load(token).startswith('[{"a":0,"b":"x"}')
+
+    at = AppTest.from_function(create_stored_data_editor_app)
+    set_query_params(at, {"table": token})
+    at.run()
+    assert not at.exception
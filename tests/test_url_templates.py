@@ -0,0 +1,106 @@
+from datetime import date
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from streamlit_permalink.compression import decompress_any
+from streamlit_permalink.url_templates import url_template
+from streamlit_permalink.utils import create_url
+
+ROWS = [
+    {"country": "FR", "year": 2024, "tags": ["a", "b"], "day": date(2024, 1, 1)},
+    {"country": "Côte d'Ivoire", "year": 1999, "tags": [], "day": None},
+    {"country": "a+b=c", "year": True, "tags": ["x"], "day": date(2000, 2, 29)},
+]
+
+
+@pytest.mark.parametrize("base_url", ["https://example.com", "https://example.com/app?lang=en&x=1"])
+def test_same_as_create_url(base_url):
+    """Test rendered URLs match create_url"""
+    template = url_template(base_url, ["country", "year", "tags", "day"])
+
+    for row in ROWS:
+        assert template.render(row) == create_url(base_url, row)
+    assert list(template.render_many(ROWS)) == [create_url(base_url, row) for row in ROWS]
+
+
+def test_missing_keys():
+    template = url_template("https://example.com?lang=en", ["a", "b"])
+
+    assert template.render({"b": 1, "c": 2}) == "https://example.com?b=1&lang=en"
+    assert template.render({}) == "https://example.com?lang=en"
+    assert url_template("https://example.com", ["a"]).render({}) == "https://example.com"
+
+
+def test_render_many_dataframe():
+    df = pd.DataFrame(
+        {
+            "country": ["FR", "DE", "FR"],
+            "year": [2023, 2024, 2025],
+            "other": [1, 2, 3],
+        }
+    )
+    template = url_template("https://example.com", ["country", "year", "missing"])
+
+    urls = template.render_many(df)
+    assert next(urls) == "https://example.com?country=FR&year=2023"
+    assert list(urls) == [
+        "https://example.com?country=DE&year=2024",
+        "https://example.com?country=FR&year=2025",
+    ]
+    assert list(url_template("https://example.com", ["missing"]).render_many(df)) == [
+        "https://example.com"
+    ] * 3
+
+
+def test_compress_and_compact():
+    """Test values are written like widgets with compress and compact write them"""
+    template = url_template(
+        "https://example.com",
+        ["notes", "day"],
+        compress={"notes": "lzma"},
+        compact=True,
+    )
+    url = template.render({"notes": "hello " * 50, "day": date(2024, 1, 1)})
+    params = parse_qs(urlsplit(url).query)
+
+    assert decompress_any(params["notes"][0]) == "hello " * 50
+    assert params["day"] == ["_dAGE"]
+
+
+def test_cache_is_typed():
+    template = url_template("https://example.com", ["v"])
+
+    assert template.render({"v": 1}) == "https://example.com?v=1"
+    assert template.render({"v": True}) == "https://example.com?v=True"
+    assert template.render({"v": 1.0}) == "https://example.com?v=1.0"
+
+
+@pytest.mark.benchmark
+def test_benchmark_render_many(benchmark_report):
+    """Compare render_many with create_url for one link per row."""
+    rows = 100_000
+    df = pd.DataFrame(
+        {
+            "country": ["FR", "DE", "IT", "ES"] * (rows // 4),
+            "year": range(rows),
+            "day": [date(2024, 1, 1)] * rows,
+        }
+    )
+    base_url = "https://example.com/report?lang=en"
+
+    start = time.perf_counter()
+    urls = list(url_template(base_url, df.columns).render_many(df))
+    template_seconds = time.perf_counter() - start
+
+    records = df.to_dict("records")
+    start = time.perf_counter()
+    expected = [create_url(base_url, row) for row in records]
+    create_url_seconds = time.perf_counter() - start
+
+    assert urls == expected
+    benchmark_report(
+        f"{rows} links: render_many {template_seconds:.3f}s, create_url {create_url_seconds:.3f}s"
+    )
@@ -0,0 +1,172 @@
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import streamlit_permalink.url_updates as url_updates
+
+from .utils import get_query_params
+
+
+def create_debounce_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    def count_compressor(value):
+        st.session_state["encodes"] = st.session_state.get("encodes", 0) + 1
+        return value[::-1]
+
+    stp.slider("Value", 0, 100, 10, url_key="value", url_update="debounce", debounce_seconds=0.2)
+    stp.text_area(
+        "Notes",
+        url_key="notes",
+        compress=True,
+        compressor=count_compressor,
+        decompressor=lambda value: value[::-1],
+        url_update="debounce",
+        debounce_seconds=0.2,
+    )
+
+
+def create_on_submit_app():
+    import streamlit as st
+    import streamlit_permalink as stp
+
+    stp.text_input("Text", value="a", url_key="text", url_update="on_submit")
+    stp.checkbox("Flag", url_key="flag", url_update="on_submit")
+    stp.checkbox("Now", url_key="now")
+    st.session_state["pending"] = stp.pending_url_updates()
+    st.button("Save link", on_click=stp.flush_deferred_url_updates)
+
+
+def create_invalid_app(url_update="debounce", debounce_seconds=0.5, in_form=False):
+    import streamlit_permalink as stp
+
+    if in_form:
+        with stp.form("form"):
+            stp.checkbox("A", url_key="a", url_update=url_update)
+            stp.form_submit_button("Submit")
+    else:
+        stp.checkbox("A", url_key="a", url_update=url_update, debounce_seconds=debounce_seconds)
+
+
+def test_debounce_coalesces_changes():
+    at = AppTest.from_function(create_debounce_app)
+    at.run()
+    assert get_query_params(at)["value"] == ["10"]
+    encodes = at.session_state["encodes"] if "encodes" in at.session_state else 0
+
+    at.slider[0].set_value(20).run()
+    at.slider[0].set_value(30).run()
+    at.text_area[0].input("a").run()
+    at.text_area[0].input("ab").run()
+    at.text_area[0].input("abc").run()
+    assert not at.exception
+    assert get_query_params(at)["value"] == ["10"]
+
+    time.sleep(0.25)
+    at.run()
+    params = get_query_params(at)
+    assert params["value"] == ["30"]
+    assert params["notes"] == ["cba"]
+    assert at.session_state["encodes"] == encodes + 1
+    assert at.slider[0].value == 30
+    assert at.text_area[0].value == "abc"
+
+
+def test_debounce_waits_for_quiet_period():
+    at = AppTest.from_function(create_debounce_app)
+    at.run()
+
+    at.slider[0].set_value(20).run()
+    time.sleep(0.15)
+    at.slider[0].set_value(40).run()
+    time.sleep(0.05)
+    at.run()
+    # the second change restarted the quiet period
+    assert get_query_params(at)["value"] == ["10"]
+
+    time.sleep(0.25)
+    at.run()
+    assert get_query_params(at)["value"] == ["40"]
+
+
+def test_single_flush_timer(monkeypatch):
+    """Test debounced widgets share one page-level timer and due updates are flushed once per run"""
+    timers = []
+    fragment = st.fragment
+
+    def counting_fragment(func, **kwargs):
+        timers.append(kwargs["run_every"])
+        return fragment(func, **kwargs)
+
+    flushes = []
+    flush_due = url_updates.flush_due_url_updates
+
+    def counting_flush_due():
+        flushes.append(1)
+        flush_due()
+
+    monkeypatch.setattr(st, "fragment", counting_fragment)
+    monkeypatch.setattr(url_updates, "flush_due_url_updates", counting_flush_due)
+    at = AppTest.from_function(create_debounce_app)
+    at.run()
+    assert not timers
+    assert len(flushes) == 1
+
+    at.slider[0].set_value(20)
+    at.text_area[0].input("a")
+    at.run()
+    assert timers == [0.2]
+    # once for the run, once when the timer is rendered
+    assert len(flushes) == 3
+
+    # every full run stops the timer of the previous one
+    at.text_area[0].input("ab").run()
+    assert timers == [0.2, 0.2]
+
+
+def test_flush_timer_stops(monkeypatch):
+    """Test the timer reruns the app once no debounced update is pending"""
+    reruns = []
+    monkeypatch.setattr(st, "rerun", lambda: reruns.append(1))
+    monkeypatch.setitem(st.session_state, "STREAMLIT_PERMALINK_FLUSH_TIMER", True)
+    monkeypatch.setattr(url_updates, "flush_due_url_updates", lambda: None)
+
+    monkeypatch.setattr(url_updates, "_has_debounced_updates", lambda: True)
+    url_updates._flush_timer()
+    assert not reruns
+    monkeypatch.setattr(url_updates, "_has_debounced_updates", lambda: False)
+    url_updates._flush_timer()
+    assert reruns == [1]
+
+
+def test_on_submit():
+    at = AppTest.from_function(create_on_submit_app)
+    at.run()
+
+    at.text_input[0].input("b").run()
+    at.checkbox[0].check().run()
+    at.checkbox[1].check().run()
+    params = get_query_params(at)
+    assert params["text"] == ["a"]
+    assert params["flag"] == ["False"]
+    assert params["now"] == ["True"]
+    assert sorted(at.session_state["pending"]) == ["flag", "text"]
+
+    at.button[0].click().run()
+    params = get_query_params(at)
+    assert params["text"] == ["b"]
+    assert params["flag"] == ["True"]
+    assert at.session_state["pending"] == []
+
+
+def test_invalid_options():
+    for kwargs in (
+        {"url_update": "later"},
+        {"debounce_seconds": 0},
+        {"in_form": True},
+    ):
+        at = AppTest.from_function(create_invalid_app, kwargs=kwargs)
+        at.run()
+        assert at.exception
@@ -0,0 +1,130 @@
+from datetime import date, datetime, time
+import timeit
+
+import pytest
+
+from streamlit_permalink.value_parsing import (
+    VALID_TYPES,
+    blind_parse_value,
+    classify_value,
+    parse_number,
+    parse_value,
+)
+
+READABLE_VALUES = [
+    "0",
+    "-42",
+    "+7",
+    " 42",
+    "42 ",
+    "\t7\n",
+    "1_000",
+    "-1_000_000",
+    "1.5",
+    "-0.25",
+    "1e5",
+    " 1.5",
+    "1_000.5",
+    "inf",
+    "2024-01-01",
+    "2024-1-9",
+    "2024-01-01T12:30:00",
+    "2024-02-29T0:0:0",
+    "12:30",
+    "9:05",
+]
+
+
+def strptime_blind_parse(value):
+    """The strptime based parsing that was used before classify_value"""
+    formats = {
+        datetime: lambda v: datetime.strptime(v, "%Y-%m-%dT%H:%M:%S"),
+        date: lambda v: datetime.strptime(v, "%Y-%m-%d").date(),
+        time: lambda v: datetime.strptime(v, "%H:%M").time(),
+    }
+    for value_type in VALID_TYPES:
+        try:
+            return formats.get(value_type, value_type)(value)
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+@pytest.mark.parametrize("value", READABLE_VALUES)
+def test_same_as_strptime(value):
+    """Test values parse to the same value and type as with strptime"""
+    expected = strptime_blind_parse(value)
+    parsed = blind_parse_value(value)
+
+    assert parsed == expected
+    assert type(parsed) is type(expected)
+    assert parse_value(type(expected), value) == expected
+
+
+def test_classify_value():
+    assert classify_value("42") is int
+    assert classify_value("4.2") is float
+    assert classify_value("2024-01-01") is date
+    assert classify_value("2024-01-01T00:00:00") is datetime
+    assert classify_value("23:59") is time
+    assert classify_value("hello") is float
+    assert classify_value(" 42 ") is int
+    assert classify_value("1_000") is int
+
+
+@pytest.mark.parametrize("value", ["1__000", "1_", "_1000x", " 2024-01-01", "12:30 "])
+def test_same_errors_as_strptime(value):
+    """Test values that strptime based parsing rejected are still rejected"""
+    with pytest.raises(ValueError):
+        strptime_blind_parse(value)
+    with pytest.raises(ValueError):
+        blind_parse_value(value)
+
+
+@pytest.mark.parametrize(
+    "value_type, value",
+    [
+        (int, "1.5"),
+        (date, "2024-13-01"),
+        (date, "2024-01-01T00:00:00"),
+        (datetime, "2024-01-01"),
+        (time, "24:00"),
+        (time, "12:30:00"),
+    ],
+)
+def test_parse_value_errors(value_type, value):
+    with pytest.raises(ValueError):
+        parse_value(value_type, value)
+
+
+def test_blind_parse_errors():
+    with pytest.raises(ValueError, match="Could not parse value"):
+        blind_parse_value("hello")
+    with pytest.raises(ValueError, match="Unsupported value type"):
+        parse_value(str, "hello")
+
+
+def test_parse_number():
+    assert parse_number("3") == 3 and type(parse_number("3")) is int
+    assert parse_number("3", float) == 3.0 and type(parse_number("3", float)) is float
+    assert parse_number("3.5") == 3.5
+    assert parse_number(" 42") == 42 and type(parse_number(" 42")) is int
+    assert parse_number("1_000") == 1000 and type(parse_number("1_000")) is int
+    assert parse_number("_i2BLnMW") == 10**9
+    with pytest.raises(ValueError):
+        parse_number("3.5", int)
+    with pytest.raises(ValueError):
+        parse_number("_dAGE")
+
+
+@pytest.mark.benchmark
+def test_benchmark_blind_parse_value(benchmark_report):
+    """Compare blind parsing with the classifier and with strptime."""
+    number = 20_000
+    for value in ("42", "1.5", "2024-01-01", "2024-01-01T12:30:00", "12:30"):
+        old = timeit.timeit(lambda: strptime_blind_parse(value), number=number)
+        new = timeit.timeit(lambda: blind_parse_value(value), number=number)
+        benchmark_report(
+            f"{value}: strptime {old / number * 1e6:.2f}us, "
+            f"classifier {new / number * 1e6:.2f}us ({old / new:.1f}x)"
+        )
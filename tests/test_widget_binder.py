@@ -0,0 +1,96 @@
+"""Tests for the cached argument binding of URL-aware widgets."""
+
+import inspect
+import time as timer
+
+import pytest
+import streamlit as st
+from packaging.version import parse as V
+from streamlit.testing.v1 import AppTest
+
+from streamlit_permalink.widgets import _get_binder
+
+
+def create_many_widgets_app():
+    import streamlit_permalink as stp
+
+    for i in range(200):
+        stp.checkbox(f"Checkbox {i}", key=f"check_{i}")
+
+
+@pytest.mark.parametrize(
+    "widget, args, kwargs",
+    [
+        (st.checkbox, ("Label",), {}),
+        (st.checkbox, ("Label", True), {"key": "k"}),
+        (st.selectbox, ("Label", ["a", "b"]), {"index": 1, "on_change": print}),
+        (st.slider, (), {"label": "Label", "min_value": 0, "max_value": 10}),
+        (st.text_input, ("Label",), {"value": "x", "max_chars": 3}),
+    ],
+)
+def test_binder_matches_bind_partial(widget, args, kwargs):
+    """Test the fast path binds the same arguments as inspect"""
+    expected = inspect.signature(widget).bind_partial(*args, **kwargs)
+    bound = _get_binder(widget).bind_partial(args, kwargs)
+    assert bound.arguments == expected.arguments
+    assert bound.args == expected.args
+    assert bound.kwargs == expected.kwargs
+
+
+@pytest.mark.parametrize(
+    "args, kwargs",
+    [
+        (("Label",), {"label": "Other"}),
+        (("Label",), {"not_an_argument": 1}),
+        (tuple(range(100)), {}),
+    ],
+)
+def test_binder_errors_match_bind_partial(args, kwargs):
+    """Test calls that can't be bound raise the same error as inspect"""
+    with pytest.raises(TypeError) as expected:
+        inspect.signature(st.checkbox).bind_partial(*args, **kwargs)
+    with pytest.raises(TypeError) as error:
+        _get_binder(st.checkbox).bind_partial(args, kwargs)
+    assert str(error.value) == str(expected.value)
+
+
+def test_binder_is_shared_across_containers():
+    """Test bound methods of other containers reuse the widget's binder"""
+    assert _get_binder(st.sidebar.checkbox) is _get_binder(st.checkbox)
+
+
+@pytest.mark.benchmark
+def test_benchmark_widget_overhead(benchmark_report):
+    """Compare per-widget binding overhead with inspecting on every call on a 200-widget page."""
+    calls = [(("Checkbox",), {"key": f"check_{i}", "value": True}) for i in range(200)]
+
+    def legacy():
+        for args, kwargs in calls:
+            V(st.__version__) < V("1.30")
+            V(st.__version__) < V("1.30")
+            inspect.signature(st.checkbox).bind_partial(*args, **kwargs)
+
+    def cached():
+        for args, kwargs in calls:
+            _get_binder(st.checkbox).bind_partial(args, kwargs)
+
+    def measure(func, repeat=20):
+        start = timer.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (timer.perf_counter() - start) / repeat / len(calls)
+
+    before = measure(legacy)
+    after = measure(cached)
+
+    at = AppTest.from_function(create_many_widgets_app)
+    start = timer.perf_counter()
+    at.run()
+    page = timer.perf_counter() - start
+
+    benchmark_report(
+        f"per widget: {before * 1e6:.1f}us -> {after * 1e6:.1f}us "
+        f"({before / after:.0f}x), 200-widget page run: {page:.3f}s"
+    )
+    assert not at.exception
+    assert after < before